@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Sync pull agent – runs on a lab client and converges it to the desired
+software state its lab has on the controller.
+
+    python3 sync_agent.py --controller http://10.20.9.154:8765
+    python3 sync_agent.py --controller http://10.20.9.154:8765 --once
+    python3 sync_agent.py --controller http://10.20.9.154:8765 --token <SYNC_PULL_TOKEN>
+
+Every poll: GET /state -> install missing "present" packages, remove
+installed "absent" ones (Chocolatey on Windows, apt on Debian/Ubuntu),
+then POST /report so the result shows up in the GUI's Operation Results.
+Machines that were powered off during a push catch up on their next poll.
+
+Standard library only; run as root / SYSTEM (e.g. a systemd unit or a
+scheduled task at startup).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+IS_WINDOWS = platform.system().lower() == "windows"
+OS_NAME = "windows" if IS_WINDOWS else "linux"
+CHOCO = os.path.join(os.environ.get("ProgramData", r"C:\ProgramData"), "chocolatey", "bin", "choco.exe")
+CHOCO_LIB = os.path.join(os.environ.get("ProgramData", r"C:\ProgramData"), "chocolatey", "lib")
+
+
+def local_ip(controller: str) -> str:
+    """The address this machine uses to reach the controller (= its inventory IP)."""
+    host = urllib.parse.urlparse(controller).hostname or "8.8.8.8"
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.connect((host, 9))
+        return s.getsockname()[0]
+
+
+def _run(cmd: list) -> tuple:
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        return proc.returncode, proc.stdout[-1000:]
+    except OSError as e:
+        return 1, str(e)
+
+
+# ── package backends ──────────────────────────────────────────────────────────
+
+def is_installed(pkg: str) -> bool:
+    if IS_WINDOWS:
+        return os.path.isdir(os.path.join(CHOCO_LIB, pkg))
+    rc, out = _run(["dpkg-query", "-W", "-f=${Status}", pkg])
+    return rc == 0 and "install ok installed" in out
+
+
+def install(pkg: str) -> tuple:
+    if IS_WINDOWS:
+        return _run([CHOCO, "install", pkg, "-y", "--no-progress"])
+    env_cmd = ["env", "DEBIAN_FRONTEND=noninteractive"]
+    return _run(env_cmd + ["apt-get", "install", "-y", pkg])
+
+
+def remove(pkg: str) -> tuple:
+    if IS_WINDOWS:
+        return _run([CHOCO, "uninstall", pkg, "-y", "--no-progress"])
+    env_cmd = ["env", "DEBIAN_FRONTEND=noninteractive"]
+    return _run(env_cmd + ["apt-get", "remove", "-y", pkg])
+
+
+# ── one convergence pass ──────────────────────────────────────────────────────
+
+def converge(state: dict) -> dict:
+    results, details = {}, []
+    missing = [p for p in state.get("present", []) if not is_installed(p)]
+    extra   = [p for p in state.get("absent", []) if is_installed(p)]
+
+    if missing and not IS_WINDOWS:
+        _run(["apt-get", "update"])
+
+    for pkg in missing:
+        rc, out = install(pkg)
+        results[pkg] = "installed" if rc == 0 else f"install failed ({rc})"
+        if rc != 0:
+            details.append(out)
+    for pkg in extra:
+        rc, out = remove(pkg)
+        results[pkg] = "removed" if rc == 0 else f"remove failed ({rc})"
+        if rc != 0:
+            details.append(out)
+
+    return {
+        "ok":      all(v in ("installed", "removed") for v in results.values()),
+        "results": results,
+        "detail":  "\n".join(details),
+    }
+
+
+def poll_once(controller: str, host: str, token: str = "") -> int:
+    """Returns the poll interval the controller asked for (seconds)."""
+    headers = {"X-Sync-Token": token} if token else {}
+    query = urllib.parse.urlencode({"host": host, "os": OS_NAME})
+    req = urllib.request.Request(f"{controller}/state?{query}", headers=headers)
+    with urllib.request.urlopen(req, timeout=15) as resp:
+        state = json.load(resp)
+
+    report = converge(state)
+    report.update({"host": host, "os": OS_NAME})
+    req = urllib.request.Request(
+        f"{controller}/report",
+        data=json.dumps(report).encode("utf-8"),
+        headers={"Content-Type": "application/json", **headers},
+        method="POST",
+    )
+    urllib.request.urlopen(req, timeout=15).close()
+    print(f"[AGENT] {state.get('lab')}: {report['results'] or 'in desired state'}")
+    return int(state.get("interval", 300))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sync pull agent")
+    parser.add_argument("--controller", required=True, help="e.g. http://10.20.9.154:8765")
+    parser.add_argument("--host", help="inventory IP of this machine (auto-detected)")
+    parser.add_argument("--once", action="store_true", help="converge once and exit")
+    parser.add_argument("--token", default=os.environ.get("SYNC_PULL_TOKEN", ""),
+                        help="shared token if the controller sets SYNC_PULL_TOKEN")
+    args = parser.parse_args()
+
+    controller = args.controller.rstrip("/")
+    host = args.host or local_ip(controller)
+    interval = 300
+
+    # Spread a lab's first polls so a room booting together doesn't stampede
+    if not args.once:
+        time.sleep(random.uniform(0, 30))
+
+    while True:
+        try:
+            interval = poll_once(controller, host, args.token)
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            print(f"[AGENT] Poll failed: {e}")
+            if args.once:
+                return 1
+        if args.once:
+            return 0
+        time.sleep(interval * random.uniform(0.9, 1.1))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Ad-hoc commands – one shell / PowerShell line across the selected PCs.
+
+Runs ``ansible <group> -m raw|win_shell -a <cmd> -o`` instead of a playbook:
+no play parsing, no fact gathering, one round trip per host.  ``-o`` (one
+line per host, newlines escaped) keeps each host's result atomic even when
+several worker processes stream into the same log.
+
+After the run, summary_lines() groups hosts with identical output and adds
+a PLAY RECAP block, so the results page works just as it does for playbooks.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+ADHOC_ACTION = "command"
+
+MODULES = {
+    "linux":   "raw",        # no python needed on the client, no module transfer
+    "windows": "win_shell",  # PowerShell, exit code reported as rc
+}
+
+# host | CHANGED | rc=0 | (stdout) ...        raw / win_shell result
+# host | FAILED | rc=1 | (stdout) ... (stderr) ...
+# host | FAILED! => {...}                     module failure (JSON)
+# host | UNREACHABLE!: msg
+_LINE_RE = re.compile(
+    r"^(?P<host>\S+) \| (?P<state>SUCCESS|CHANGED|FAILED!?|UNREACHABLE!|SKIPPED)(?P<rest>.*)$"
+)
+_RC_RE = re.compile(r"^ \| rc=(-?\d+) \| \(stdout\) ?(.*)$")
+
+
+@dataclass
+class HostResult:
+    host: str
+    ok: bool
+    unreachable: bool
+    rc: Optional[int]
+    output: str
+
+
+def _unescape(text: str) -> str:
+    return text.replace("\\r", "").replace("\\n", "\n").strip()
+
+
+def parse_line(line: str) -> Optional[HostResult]:
+    m = _LINE_RE.match(line.strip())
+    if not m:
+        return None
+    host, state, rest = m.group("host"), m.group("state"), m.group("rest")
+
+    if state == "UNREACHABLE!":
+        return HostResult(host, False, True, None, rest.lstrip(": ").strip())
+
+    rc_m = _RC_RE.match(rest)
+    if rc_m:
+        rc = int(rc_m.group(1))
+        stdout, _, stderr = rc_m.group(2).partition(" (stderr) ")
+        output = _unescape(stdout) + (("\n" + _unescape(stderr)) if stderr else "")
+        return HostResult(host, state in ("SUCCESS", "CHANGED") and rc == 0, False, rc, output.strip())
+
+    output = rest.lstrip(" =>").strip()
+    try:
+        data = json.loads(output)
+        output = str(data.get("msg") or data.get("stdout") or output)
+    except (ValueError, AttributeError):
+        pass
+    return HostResult(host, state in ("SUCCESS", "CHANGED", "SKIPPED"), False, None, output)
+
+
+def collect_results(lines: Iterable[str]) -> Dict[str, HostResult]:
+    results: Dict[str, HostResult] = {}
+    for line in lines:
+        result = parse_line(line)
+        if result:
+            results[result.host] = result
+    return results
+
+
+def summary_lines(results: Dict[str, HostResult]) -> List[str]:
+    """Hosts grouped by identical (status, output), largest group first,
+    followed by a PLAY RECAP block."""
+    groups: Dict[tuple, List[str]] = {}
+    for r in results.values():
+        groups.setdefault((r.ok, r.output), []).append(r.host)
+
+    lines = ["", "OUTPUT BY GROUP " + "*" * 56]
+    for (ok, output), hosts in sorted(groups.items(), key=lambda g: -len(g[1])):
+        mark = "✓" if ok else "✗"
+        lines.append(f"{mark} {len(hosts)} host(s): {', '.join(hosts)}")
+        for out_line in (output or "(no output)").splitlines():
+            lines.append(f"    {out_line}")
+
+    return lines + recap_lines(results)
+
+
+def recap_lines(results: Dict[str, HostResult]) -> List[str]:
+    """A PLAY RECAP block, as ansible-playbook prints it, for the results page."""
+    lines = ["", "PLAY RECAP " + "*" * 60]
+    for r in results.values():
+        lines.append(
+            f"{r.host} : ok={int(r.ok)} changed=0 "
+            f"unreachable={int(r.unreachable)} failed={int(not r.ok and not r.unreachable)}"
+        )
+    return lines
@@ -1,11 +1,70 @@
+from __future__ import annotations
+
 import os
+import signal
 import subprocess
+import threading
 from PySide6.QtCore import QThread, Signal
 
+from . import journal
+from .config import CANCEL_GRACE, CANCEL_POLICY
+from .executors import remove_container
+
+
+# Emitted as a log line when a job runs past its wall-clock deadline;
+# SoftwarePage uses it to mark hosts without a final result as timed out.
+TIMEOUT_MARKER = "[TIMEOUT]"
+# Emitted when the user cancels; hosts without a final result are "cancelled"
+CANCEL_MARKER = "[CANCELLED]"
+
+ABORT_GRACE = 5.0   # seconds between SIGTERM and SIGKILL when aborting
+
+# Ansible and docker are started in their own session so a stop reaches the
+# whole process tree (ansible forks, ssh connections), not just the parent
+POPEN_SESSION = {"start_new_session": True} if hasattr(os, "killpg") else {}
+
+
+def _signal_tree(process: subprocess.Popen, sig: int):
+    try:
+        if POPEN_SESSION:
+            os.killpg(process.pid, sig)
+        else:
+            process.send_signal(sig)
+    except (OSError, ValueError):
+        pass
+
+
+def stop_process(process: subprocess.Popen, grace: float = 10.0,
+                 container: str | None = None, interrupt: bool = False):
+    """
+    SIGTERM first – `docker run` forwards it to ansible-playbook inside the
+    container, which then exits cleanly – and SIGKILL if it is still alive
+    after `grace` seconds. interrupt=True sends SIGINT instead (ansible's
+    Ctrl-C handling). A named container is removed afterwards in case the
+    docker client died before it could pass the signal on.
+    """
+    if process.poll() is None:
+        _signal_tree(process, signal.SIGINT if interrupt else signal.SIGTERM)
+        try:
+            process.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            _signal_tree(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+            process.kill()
+    if container:
+        remove_container(container)
+
+
+def cancel_args(policy: str) -> dict:
+    """stop_process() keyword arguments for a cancel policy."""
+    if policy == "abort":
+        return {"grace": ABORT_GRACE}
+    return {"grace": CANCEL_GRACE, "interrupt": True}
+
 
 class AnsibleWorker(QThread):
     """
-    Runs Docker + Ansible command in a background thread.
+    Runs an Ansible command (Docker or local, see core.executors) in a
+    background thread.
     Emits live output lines.
     Does NOT block UI.
     """
@@ -13,7 +72,8 @@ class AnsibleWorker(QThread):
     output_received = Signal(str)
     finished = Signal(bool)  # True if success
 
-    def __init__(self, command_args: list):
+    def __init__(self, command_args: list, cwd: str | None = None, env: dict | None = None,
+                 deadline: int = 0, container: str | None = None):
         """
         command_args must be a LIST, not string.
         Example:
@@ -22,18 +82,59 @@ class AnsibleWorker(QThread):
             "-v", "...:/app",
             ...
         ]
+        cwd / env are passed straight to Popen (used by the local executor).
+        deadline: wall-clock seconds before the job is stopped (0 = none).
+        container: docker container name, removed when the job is stopped.
         """
         super().__init__()
         self.command_args = command_args
+        self.cwd = cwd
+        self.env = env
+        self.deadline = deadline
+        self.container = container
+        self.timed_out = False
+        self.cancelled = False
+        self._process: subprocess.Popen | None = None
+
+    def _on_deadline(self, process: subprocess.Popen):
+        self.timed_out = True
+        self.output_received.emit(
+            f"{TIMEOUT_MARKER} Job deadline of {self.deadline}s exceeded – stopping remaining hosts."
+        )
+        stop_process(process, container=self.container)
+
+    def cancel(self, policy: str = CANCEL_POLICY):
+        """Stop the job without blocking the caller (see config.CANCEL_POLICY)."""
+        self.cancelled = True
+        self.output_received.emit(f"{CANCEL_MARKER} Cancelled by user ({policy}).")
+        if self._process is not None:
+            threading.Thread(
+                target=stop_process, args=(self._process,),
+                kwargs={"container": self.container, **cancel_args(policy)}, daemon=True,
+            ).start()
 
     def run(self):
+        watchdog = None
         try:
             process = subprocess.Popen(
                 self.command_args,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True
+                text=True,
+                cwd=self.cwd,
+                env=self.env,
+                **POPEN_SESSION,
             )
+            self._process = process
+            if self.cancelled:   # cancelled while the process was starting
+                threading.Thread(
+                    target=stop_process, args=(process,),
+                    kwargs={"container": self.container, **cancel_args("abort")}, daemon=True,
+                ).start()
+            if self.deadline > 0:
+                watchdog = threading.Timer(self.deadline, self._on_deadline, [process])
+                watchdog.daemon = True
+                watchdog.start()
 
             for line in iter(process.stdout.readline, ""):
                 if line:
@@ -42,8 +143,67 @@ class AnsibleWorker(QThread):
             process.stdout.close()
             process.wait()
 
-            self.finished.emit(process.returncode == 0)
+            self.finished.emit(process.returncode == 0 and not (self.timed_out or self.cancelled))
 
         except Exception as e:
             self.output_received.emit(f"[ERROR] {str(e)}")
-            self.finished.emit(False)
\ No newline at end of file
+            self.finished.emit(False)
+        finally:
+            if watchdog:
+                watchdog.cancel()
+
+
+class JournalTailWorker(QThread):
+    """
+    Follows a detached job's journal (see core.journal) from the start and
+    replays it with AnsibleWorker's signals, so SoftwareController treats a
+    detached or reattached run like any other. Finishes when the job does.
+    """
+
+    output_received = Signal(str)
+    finished = Signal(bool)
+    caught_up = Signal()   # replay reached what an earlier session had shown
+
+    POLL_MS = 500
+
+    def __init__(self, job_id: str, mark: int = 0):
+        super().__init__()
+        self.job_id = job_id
+        self.mark = mark
+        self.offset = 0
+        self.timed_out = False
+        self.cancelled = False
+
+    def cancel(self, policy: str = CANCEL_POLICY):
+        """Ask the runner to stop; its own marker line arrives through the journal."""
+        self.cancelled = True
+        journal.request_cancel(self.job_id, policy)
+        if policy == "abort":
+            # The controller stops listening right away – mark the log now
+            self.output_received.emit(f"{CANCEL_MARKER} Cancelled by user ({policy}).")
+
+    def run(self):
+        record = None
+        while True:
+            record = journal.load(self.job_id)
+            lines, offset = journal.read_from(self.job_id, self.offset)
+            for line in lines:
+                self.output_received.emit(line)
+            if offset != self.offset:
+                self.offset = offset
+                journal.mark_seen(self.job_id, offset)
+            if self.mark and self.offset >= self.mark:
+                self.mark = 0
+                self.caught_up.emit()
+            if record is None or record.state != "running":
+                break
+            self.msleep(self.POLL_MS)
+
+        status = record.status if record else {}
+        if record is None or record.state == "lost":
+            self.output_received.emit(
+                f"[ERROR] Job {self.job_id} stopped without finishing (runner or controller died)."
+            )
+        self.timed_out = bool(status.get("timed_out"))
+        self.cancelled = self.cancelled or bool(status.get("cancelled"))
+        self.finished.emit(bool(status.get("ok")) and record.state == "done")
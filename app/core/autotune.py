@@ -0,0 +1,390 @@
+"""
+Concurrency autotuning – choose ansible ``forks`` for every run from what the
+controller and the lab can take right now, instead of a fixed number.
+
+Ansible fixes forks for the lifetime of a process, so tuning happens at
+admission time (just before a run or shard starts):
+
+    decide()   controller CPU / memory headroom  ->  hard cap (admission control)
+               TCP probe of the targets           ->  reachable hosts, latency
+                 (probe_async(), run off the GUI thread when the lab page's
+                 selection settles; decide() only reads its results)
+               history of the previous run        ->  AIMD step (+STEP healthy,
+                                                      halve on errors / thrashing)
+    RunMonitor samples controller load and per-host failures while the run
+               is going; record() stores them so the next run adjusts.
+
+run_benchmark() (``main.py --benchmark <lab>``) drives a no-op ping over a lab
+at increasing fork counts and prints the throughput curve; the best point
+seeds the history for that lab.
+"""
+
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import AUTOTUNE_FILE, FIXED_FORKS, MAX_FORKS
+from .executors import get_executor
+from .job_builder import (
+    deadline_env, get_project_root, inventory_rel_path, vault_pass_path, write_temp_inventory,
+)
+from .transports import needs_password, profile_vars
+
+
+MIN_FORKS = 2
+STEP = 5                       # additive increase after a healthy run
+ERROR_BACKOFF = 0.10           # failure rate that halves forks next time
+THRASH_LOAD = 1.5              # 1-min load per CPU considered thrashing
+PROBE_PORT = 22                # both groups are managed over SSH
+PROBE_TIMEOUT = 0.8            # seconds
+PROBE_TTL = 120                # seconds a background probe result stays usable
+
+# Per-OS cost of one fork on the controller. Windows (SSH + PowerShell,
+# larger module payloads) is noticeably heavier than Linux.
+_PROFILE = {
+    "linux":   {"start": 20, "per_cpu": 8, "fork_mb": 60},
+    "windows": {"start": 10, "per_cpu": 4, "fork_mb": 120},
+}
+
+
+# =============================================================================
+# Measurements
+# =============================================================================
+@dataclass
+class ControllerLoad:
+    cpus: int
+    load1: Optional[float]          # None where getloadavg() is unavailable
+    mem_available_mb: Optional[int]
+
+    @property
+    def load_per_cpu(self) -> float:
+        return (self.load1 or 0.0) / max(1, self.cpus)
+
+
+def _mem_available_mb() -> Optional[int]:
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def sample_controller() -> ControllerLoad:
+    try:
+        load1 = os.getloadavg()[0]
+    except (AttributeError, OSError):
+        load1 = None
+    return ControllerLoad(os.cpu_count() or 1, load1, _mem_available_mb())
+
+
+def _probe(ip: str, port: int, timeout: float) -> Optional[float]:
+    start = time.monotonic()
+    try:
+        with socket.create_connection((ip, port), timeout=timeout):
+            return (time.monotonic() - start) * 1000.0
+    except OSError:
+        return None
+
+
+def probe_hosts(targets: Sequence[str], port: int = PROBE_PORT,
+                timeout: float = PROBE_TIMEOUT) -> Dict[str, Optional[float]]:
+    """TCP connect latency in ms per host (None = unreachable)."""
+    if not targets:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(64, len(targets))) as pool:
+        latencies = pool.map(lambda ip: _probe(ip, port, timeout), targets)
+        return dict(zip(targets, latencies))
+
+
+_probe_lock = threading.Lock()
+_probed: Dict[str, Tuple[float, Optional[float]]] = {}   # ip -> (monotonic time, ms)
+
+
+def probe_async(targets: Sequence[str]):
+    """probe_hosts() on a background thread; decide() picks the results up."""
+    targets = list(targets)
+
+    def run():
+        latencies = probe_hosts(targets)
+        now = time.monotonic()
+        with _probe_lock:
+            for ip, ms in latencies.items():
+                _probed[ip] = (now, ms)
+
+    if targets:
+        threading.Thread(target=run, daemon=True).start()
+
+
+def cached_probes(targets: Sequence[str], ttl: float = PROBE_TTL) -> Dict[str, Optional[float]]:
+    """Latencies from recent probe_async() runs, for the targets that have one."""
+    now = time.monotonic()
+    with _probe_lock:
+        return {
+            ip: _probed[ip][1] for ip in targets
+            if ip in _probed and now - _probed[ip][0] <= ttl
+        }
+
+
+class RunMonitor:
+    """Samples controller load during a run and counts failed hosts from the
+    ansible output (fed line by line by the controller)."""
+
+    _RECAP_RE = re.compile(r"^(\S+)\s*:\s+.*\bunreachable=(\d+)\b.*\bfailed=(\d+)\b")
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self.started = time.monotonic()
+        self.peak_load_per_cpu = 0.0
+        self.min_mem_mb: Optional[int] = None
+        self.hosts_done: set = set()
+        self.hosts_failed: set = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            load = sample_controller()
+            self.peak_load_per_cpu = max(self.peak_load_per_cpu, load.load_per_cpu)
+            if load.mem_available_mb is not None:
+                self.min_mem_mb = min(self.min_mem_mb or load.mem_available_mb, load.mem_available_mb)
+            if self._stop.wait(self.interval):
+                return
+
+    def feed(self, line: str):
+        m = self._RECAP_RE.match(line.strip())
+        if m:
+            self.hosts_done.add(m.group(1))
+            if int(m.group(2)) or int(m.group(3)):
+                self.hosts_failed.add(m.group(1))
+
+    def stop(self) -> float:
+        """Stop sampling; returns the run's duration in seconds."""
+        self._stop.set()
+        return time.monotonic() - self.started
+
+
+# =============================================================================
+# Decision
+# =============================================================================
+@dataclass
+class TuneDecision:
+    forks: int
+    reasons: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return f"{self.forks} ({'; '.join(self.reasons)})"
+
+
+class AutoTuner:
+    """History-backed forks chooser, keyed per lab and OS."""
+
+    def __init__(self, path: str = AUTOTUNE_FILE):
+        self.path = path
+        self.history = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.history, f, indent=2)
+
+    @staticmethod
+    def key(lab: Optional[str], os_name: str) -> str:
+        return f"{lab or '-'}/{os_name}"
+
+    def decide(self, lab: Optional[str], os_name: str, targets: Sequence[str],
+               probe: bool = True) -> TuneDecision:
+        if FIXED_FORKS:
+            return TuneDecision(FIXED_FORKS, ["fixed by SYNC_FORKS"])
+
+        profile = _PROFILE.get(os_name, _PROFILE["linux"])
+        reasons: List[str] = []
+
+        # ── AIMD step from the previous run ───────────────────────────────────
+        last = self.history.get(self.key(lab, os_name))
+        if not last:
+            forks = profile["start"]
+            reasons.append("no history")
+        elif last["error_rate"] > ERROR_BACKOFF or last["peak_load_per_cpu"] > THRASH_LOAD:
+            forks = last["forks"] // 2
+            reasons.append(
+                f"backing off (errors {last['error_rate']:.0%}, "
+                f"load/cpu {last['peak_load_per_cpu']:.1f})"
+            )
+        else:
+            forks = last["forks"] + STEP
+            reasons.append(f"last run healthy at {last['forks']}")
+
+        # ── Admission control: never exceed what the controller can carry ─────
+        load = sample_controller()
+        cpu_cap = load.cpus * profile["per_cpu"]
+        if load.load_per_cpu > 1.0:
+            cpu_cap = int(cpu_cap / load.load_per_cpu)
+            reasons.append(f"controller busy (load/cpu {load.load_per_cpu:.1f})")
+        if forks > cpu_cap:
+            forks = cpu_cap
+            reasons.append(f"cpu cap {cpu_cap}")
+        if load.mem_available_mb is not None:
+            mem_cap = load.mem_available_mb // profile["fork_mb"]
+            if forks > mem_cap:
+                forks = mem_cap
+                reasons.append(f"memory cap {mem_cap} ({load.mem_available_mb} MB free)")
+
+        # ── Lab side: no point in forks for hosts that are not there ──────────
+        # Never probes here (this runs on the GUI thread): hosts without a
+        # recent background probe count as reachable and get one for next time.
+        if probe and targets:
+            latencies = cached_probes(targets)
+            probe_async([ip for ip in targets if ip not in latencies])
+            alive = [ms for ms in latencies.values() if ms is not None]
+            unprobed = len(targets) - len(latencies)
+            if alive:
+                reasons.append(f"{len(alive)}/{len(latencies)} probed reachable, "
+                               f"median {statistics.median(alive):.0f} ms")
+            if latencies:
+                forks = min(forks, max(len(alive) + unprobed, MIN_FORKS))
+        forks = min(forks, len(targets) or forks)
+
+        forks = max(MIN_FORKS, min(forks, MAX_FORKS))
+        return TuneDecision(forks, reasons)
+
+    def record(self, lab: Optional[str], os_name: str, forks: int, monitor: RunMonitor,
+               hosts: Optional[Sequence[str]] = None):
+        """hosts limits the counts to one job of a multi-job run."""
+        duration = monitor.stop()
+        done, failed = monitor.hosts_done, monitor.hosts_failed
+        if hosts is not None:
+            done, failed = done & set(hosts), failed & set(hosts)
+        if not done:
+            return
+        self.history[self.key(lab, os_name)] = {
+            "forks": forks,
+            "hosts": len(done),
+            "error_rate": len(failed) / len(done),
+            "throughput": len(done) / max(duration, 0.001),
+            "peak_load_per_cpu": round(monitor.peak_load_per_cpu, 2),
+            "min_mem_mb": monitor.min_mem_mb,
+            "at": int(time.time()),
+        }
+        try:
+            self._save()
+        except OSError as e:
+            print(f"[AUTOTUNE] Could not save history: {e}")
+
+    def seed(self, lab: str, os_name: str, forks: int, throughput: float):
+        """Benchmark result becomes the starting point for real runs."""
+        self.history[self.key(lab, os_name)] = {
+            "forks": forks, "hosts": 0, "error_rate": 0.0, "throughput": throughput,
+            "peak_load_per_cpu": 0.0, "min_mem_mb": None, "at": int(time.time()),
+        }
+        self._save()
+
+
+# =============================================================================
+# Offline benchmark
+# =============================================================================
+def _ping_once(executor, project_root: str, os_name: str, targets: List[str],
+               forks: int, transport: str = "") -> dict:
+    group = "windows_clients" if os_name == "windows" else "linux_clients"
+    filename = f"_sync_tmp_inventory_bench_{os.getpid()}.ini"
+    tmp_inv = write_temp_inventory(
+        project_root, targets, group, filename, group_vars=profile_vars(os_name, transport),
+    )
+    needs_vault = os_name == "linux" or needs_password(transport)
+    vault = vault_pass_path() if needs_vault and os.path.exists(vault_pass_path()) else None
+    cmd = executor.build(
+        ["ansible", "-i", inventory_rel_path(filename), group,
+         "-m", "win_ping" if os_name == "windows" else "ping", "-f", str(forks)],
+        project_root,
+        vault_pass=vault,
+        ansible_env=deadline_env(),
+    )
+    monitor = RunMonitor(interval=1.0)
+    ok = failed = 0
+    try:
+        proc = subprocess.run(cmd.args, cwd=cmd.cwd, env=cmd.env,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        for line in proc.stdout.splitlines():
+            if " | SUCCESS" in line:
+                ok += 1
+            elif " | UNREACHABLE!" in line or " | FAILED!" in line:
+                failed += 1
+    finally:
+        duration = monitor.stop()
+        if tmp_inv:
+            try:
+                os.remove(tmp_inv)
+            except OSError:
+                pass
+    return {
+        "forks": forks, "seconds": duration, "ok": ok, "failed": failed,
+        "throughput": (ok + failed) / max(duration, 0.001),
+        "load_per_cpu": monitor.peak_load_per_cpu,
+    }
+
+
+def run_benchmark(lab: str, forks_steps: Sequence[int] = (5, 10, 20, 40, 80),
+                  os_filter: Optional[str] = None) -> int:
+    """Print hosts/second for each forks value; returns a process exit code."""
+    from .inventory_manager import InventoryManager
+
+    inventory = InventoryManager()
+    pcs = inventory.get_pcs_for_lab(lab)
+    if not pcs:
+        print(f"[BENCH] No PCs in lab '{lab}'.")
+        return 1
+
+    executor = get_executor()
+    available, reason = executor.is_available()
+    if not available:
+        print(f"[BENCH] Executor '{executor.name}' unavailable: {reason}")
+        return 1
+
+    project_root = get_project_root()
+    tuner = AutoTuner()
+    for os_name in ("linux", "windows"):
+        if os_filter and os_filter != os_name:
+            continue
+        targets = [pc["ip"] for pc in pcs if pc.get("os") == os_name]
+        if not targets:
+            continue
+
+        print(f"\n[BENCH] {lab} / {os_name}: {len(targets)} host(s), executor {executor.name}")
+        print(f"  {'forks':>5}  {'seconds':>8}  {'hosts/s':>8}  {'ok':>4}  {'failed':>6}  {'load/cpu':>8}")
+        points = []
+        for forks in sorted(set(forks_steps)):
+            if forks > len(targets) and points:
+                break
+            point = _ping_once(executor, project_root, os_name, targets, forks,
+                               inventory.get_lab_transport(lab))
+            points.append(point)
+            print(f"  {point['forks']:>5}  {point['seconds']:>8.1f}  {point['throughput']:>8.2f}"
+                  f"  {point['ok']:>4}  {point['failed']:>6}  {point['load_per_cpu']:>8.1f}")
+
+        healthy = [p for p in points if p["failed"] <= ERROR_BACKOFF * len(targets)
+                   and p["load_per_cpu"] <= THRASH_LOAD]
+        if healthy:
+            best = max(healthy, key=lambda p: p["throughput"])
+            print(f"  → recommended forks: {best['forks']}")
+            tuner.seed(lab, os_name, best["forks"], best["throughput"])
+        else:
+            print("  → every step overloaded the controller or failed hosts; keeping defaults")
+    return 0
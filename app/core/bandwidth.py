@@ -0,0 +1,371 @@
+"""
+Bandwidth budgets – rate limits for installer transfers from the controller,
+so a lab-wide push leaves room for teaching traffic on the building uplink.
+
+Budgets (Mbit/s, 0 = unlimited)
+    global    SYNC_BW_GLOBAL – everything the controller sends
+    lab       labs[<lab>]["bandwidth"]["lab"] in the inventory
+    section   labs[<lab>]["bandwidth"]["sections"]["<n>"]
+
+win_copy pushes over the ansible connection and cannot be paced. When a
+budget applies, prepare_jobs() gives every Windows host a ``transfer_url`` and
+the transfer / stage steps fetch the installer with win_get_url from the
+controller's transfer server instead:
+
+    GET http://<controller>:<BW_PORT>/repo/<file>
+
+The server looks the client up in the inventory and sends each chunk only
+when every budget on its path (global → lab → section) has room. Budgets
+hand out room in request order, so the hosts in flight share a budget evenly
+and a host that finishes or stalls leaves its share to the others – a
+transfer uses whatever the budgets leave spare. ``GET /rates`` returns the
+current per-host, per-lab and total rates; the Software Manager shows them
+while a job runs.
+
+The server starts on demand (``main.py --serve-transfers``, detached like a
+journal runner, so it outlives the GUI) and exits after BW_IDLE seconds
+without a transfer; polling /rates does not keep it alive.  It listens on
+BW_ADDRESS (all interfaces if unset), sends installers only to PCs in the
+inventory and answers /rates only locally.
+
+Linux content sync (rsync over ssh) is paced by rsync itself: each host gets
+``transfer_kbps`` (--bwlimit), its share of the tightest budget over the
+hosts in flight. Chocolatey and apt download from their own repositories and
+are not covered.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlparse
+from urllib.request import urlopen
+
+from .config import BW_ADDRESS, BW_GLOBAL, BW_IDLE, BW_PORT, CONTENT_PARALLEL, INVENTORY_FILE
+
+CHUNK = 64 * 1024
+BURST = 0.25          # seconds of budget an idle limit may bank
+RATE_WINDOW = 3.0     # seconds the live rates are averaged over
+
+
+def _bytes_per_s(mbit: float) -> float:
+    return mbit * 1_000_000 / 8
+
+
+def lab_budgets(inventory_manager, lab: Optional[str]) -> Tuple[float, Dict[str, float]]:
+    """(lab Mbit/s, {section: Mbit/s}) from the inventory – 0 / {} = none."""
+    if not inventory_manager or not lab:
+        return 0, {}
+    budgets = inventory_manager.get_lab_bandwidth(lab)
+    sections = {str(k): float(v) for k, v in (budgets.get("sections") or {}).items() if v}
+    return float(budgets.get("lab") or 0), sections
+
+
+# =============================================================================
+# Job side (prepare_jobs)
+# =============================================================================
+def controller_address(ip: str) -> str:
+    """The controller's address as `ip` reaches it (no packet is sent)."""
+    if BW_ADDRESS:
+        return BW_ADDRESS
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.connect((ip, 9))
+        return s.getsockname()[0]
+
+
+def _share_kbps(job, lab_mbit: float, sections: Dict[str, float], inventory_manager) -> Dict[str, int]:
+    """Each host's --bwlimit: tightest budget / hosts of that budget in flight."""
+    section_of = {}
+    for ip in job.targets:
+        found = inventory_manager.find_pc(ip) if inventory_manager else None
+        section_of[ip] = str(found[1].get("section", "")) if found else ""
+    in_flight = lambda n: max(1, min(n, CONTENT_PARALLEL))
+    limits = {}
+    for ip in job.targets:
+        rates = []
+        if BW_GLOBAL:
+            rates.append(_bytes_per_s(BW_GLOBAL) / in_flight(len(job.targets)))
+        if lab_mbit:
+            rates.append(_bytes_per_s(lab_mbit) / in_flight(len(job.targets)))
+        sec = section_of[ip]
+        if sections.get(sec):
+            peers = sum(1 for s in section_of.values() if s == sec)
+            rates.append(_bytes_per_s(sections[sec]) / in_flight(peers))
+        if rates:
+            limits[ip] = max(1, int(min(rates) / 1024))
+    return limits
+
+
+def apply_budgets(job, lab: Optional[str], inventory_manager) -> bool:
+    """Route the job's transfers through the budgets. True if any apply."""
+    lab_mbit, sections = lab_budgets(inventory_manager, lab)
+    if not (BW_GLOBAL or lab_mbit or sections):
+        return False
+
+    if job.os_name == "linux" and job.extra.get("content_src"):
+        for ip, kbps in _share_kbps(job, lab_mbit, sections, inventory_manager).items():
+            job.host_vars.setdefault(ip, {})["transfer_kbps"] = str(kbps)
+        return True
+
+    file_name = job.extra.get("file_name")
+    if job.os_name != "windows" or not file_name or job.extra.get("choco_package"):
+        return False
+    if not ensure_server():
+        print("[BW] Transfer server did not start – transfers are not rate-limited")
+        return False
+    for ip in job.targets:
+        try:
+            base = f"http://{controller_address(ip)}:{BW_PORT}"
+        except OSError:
+            continue   # no route: this host keeps win_copy
+        job.host_vars.setdefault(ip, {})["transfer_url"] = f"{base}/repo/{quote(file_name)}"
+    return True
+
+
+def _local_address() -> str:
+    """Where this machine reaches its own transfer server."""
+    return BW_ADDRESS or "127.0.0.1"
+
+
+def _port_open(port: int) -> bool:
+    try:
+        with socket.create_connection((_local_address(), port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def ensure_server() -> bool:
+    """
+    Start the detached transfer server unless one is already listening.
+    Does not wait for it to come up (this runs on the GUI thread): the
+    download tasks retry while it starts. False if it could not be spawned.
+    """
+    if _port_open(BW_PORT):
+        return True
+    from .distributed import entry_command
+    from .journal import DETACH
+
+    try:
+        subprocess.Popen(
+            entry_command("--serve-transfers"),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            **DETACH,
+        )
+    except OSError as e:
+        print(f"[BW] Could not start the transfer server: {e}")
+        return False
+    return True
+
+
+def fetch_rates() -> Optional[Dict]:
+    """Live rates from the transfer server, None if it is not running."""
+    try:
+        with urlopen(f"http://{_local_address()}:{BW_PORT}/rates", timeout=0.5) as resp:
+            return json.load(resp)
+    except (OSError, ValueError):
+        return None
+
+
+# =============================================================================
+# Transfer server
+# =============================================================================
+class Budget:
+    """One rate limit, shared by every transfer below it."""
+
+    def __init__(self, mbit: float):
+        self.rate = _bytes_per_s(mbit)
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def reserve(self, n: int) -> float:
+        """Book `n` bytes; returns the monotonic time they may be sent at."""
+        with self._lock:
+            start = max(self._next, time.monotonic() - BURST)
+            self._next = start + n / self.rate
+            return start
+
+
+class _Transfer:
+    def __init__(self, ip: str, lab: str, section: str, name: str, size: int):
+        self.ip, self.lab, self.section, self.name, self.size = ip, lab, section, name, size
+        self.sent = 0
+        self._samples: deque = deque()
+
+    def add(self, n: int):
+        now = time.monotonic()
+        self.sent += n
+        self._samples.append((now, n))
+        while self._samples and self._samples[0][0] < now - RATE_WINDOW:
+            self._samples.popleft()
+
+    def rate(self) -> float:
+        """Bytes per second over the last RATE_WINDOW seconds."""
+        since = time.monotonic() - RATE_WINDOW
+        return sum(n for t, n in list(self._samples) if t >= since) / RATE_WINDOW
+
+
+class TransferServer:
+    """Rate-limited installer downloads (see module doc)."""
+
+    def __init__(self, port: int = BW_PORT, repo_dir: Optional[str] = None):
+        from .job_builder import get_project_root
+
+        self.port = port
+        self.repo_dir = repo_dir or os.path.join(get_project_root(), "software_repo")
+        self._lock = threading.Lock()
+        self._budgets: Dict[tuple, Budget] = {}
+        self._transfers: Dict[int, _Transfer] = {}
+        self._inventory = None
+        self._mtime = None
+        self.last_active = time.time()
+        handler = type("TransferHandler", (_Handler,), {"server_ref": self})
+        self._httpd = ThreadingHTTPServer((BW_ADDRESS or "0.0.0.0", port), handler)
+        self._httpd.daemon_threads = True
+
+    def _budget(self, key: tuple, mbit: float) -> Optional[Budget]:
+        if not mbit:
+            self._budgets.pop(key, None)
+            return None
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = Budget(mbit)
+        budget.rate = _bytes_per_s(mbit)   # picks up edits to the inventory
+        return budget
+
+    def chain(self, ip: str) -> Tuple[str, str, List[Budget]]:
+        """(lab, section, budgets from global down) for a client."""
+        from .inventory_manager import InventoryManager
+
+        with self._lock:
+            mtime = os.path.getmtime(INVENTORY_FILE) if os.path.exists(INVENTORY_FILE) else None
+            if self._inventory is None or mtime != self._mtime:
+                self._inventory = InventoryManager()
+                self._mtime = mtime
+            found = self._inventory.find_pc(ip)
+            lab, section = (found[0], str(found[1].get("section", ""))) if found else ("", "")
+            lab_mbit, sections = lab_budgets(self._inventory, lab)
+            budgets = [
+                self._budget(("global",), BW_GLOBAL),
+                self._budget(("lab", lab), lab_mbit),
+                self._budget(("section", lab, section), sections.get(section, 0)),
+            ]
+        return lab, section, [b for b in budgets if b is not None]
+
+    def known(self, ip: str) -> bool:
+        return bool(self.chain(ip)[0])
+
+    def send(self, handler: "_Handler", path: str, name: str):
+        ip = handler.client_address[0]
+        lab, section, budgets = self.chain(ip)
+        size = os.path.getsize(path)
+        transfer = _Transfer(ip, lab, section, name, size)
+        with self._lock:
+            self._transfers[id(transfer)] = transfer
+        try:
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/octet-stream")
+            handler.send_header("Content-Length", str(size))
+            handler.end_headers()
+            with open(path, "rb") as f:
+                while True:
+                    data = f.read(CHUNK)
+                    if not data:
+                        break
+                    if budgets:
+                        wait = max(b.reserve(len(data)) for b in budgets) - time.monotonic()
+                        if wait > 0:
+                            time.sleep(wait)
+                    handler.wfile.write(data)
+                    transfer.add(len(data))
+            print(f"[BW] {ip} {name}: {size / 1e6:.1f} MB sent")
+        except (ConnectionError, OSError) as e:
+            print(f"[BW] {ip} {name}: aborted after {transfer.sent / 1e6:.1f} MB ({e})")
+        finally:
+            with self._lock:
+                self._transfers.pop(id(transfer), None)
+                self.last_active = time.time()
+
+    def rates(self) -> Dict:
+        with self._lock:
+            transfers = list(self._transfers.values())
+        hosts, labs = {}, {}
+        for t in transfers:
+            rate = t.rate()
+            hosts[t.ip] = {"lab": t.lab, "section": t.section, "file": t.name,
+                           "sent": t.sent, "size": t.size, "bps": rate}
+            labs[t.lab] = labs.get(t.lab, 0) + rate
+        return {"total": sum(labs.values()), "labs": labs, "hosts": hosts, "global_limit": BW_GLOBAL}
+
+    @property
+    def busy(self) -> bool:
+        with self._lock:
+            return bool(self._transfers)
+
+    def serve(self, idle: int = BW_IDLE) -> int:
+        """Serve until nothing was transferred for `idle` seconds (headless mode)."""
+        print(f"[BW] Transfer server listening on :{self.port}, serving {self.repo_dir}")
+        thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            while self.busy or time.time() - self.last_active < idle:
+                time.sleep(5)
+        except KeyboardInterrupt:
+            pass
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        print("[BW] Transfer server idle – exiting")
+        return 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_ref: TransferServer = None
+
+    def do_GET(self):
+        srv = self.server_ref
+        ip = self.client_address[0]
+        url = urlparse(self.path)
+        if url.path == "/rates":
+            # The GUI's poll: local only, and it does not count as activity
+            if ip not in ("127.0.0.1", "::1", BW_ADDRESS):
+                self.send_error(403)
+                return
+            data = json.dumps(srv.rates()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        # Installers go to inventory PCs only
+        if not srv.known(ip):
+            self.send_error(403)
+            return
+        name = unquote(url.path[len("/repo/"):]) if url.path.startswith("/repo/") else ""
+        path = os.path.join(srv.repo_dir, name)
+        # Flat repo only: no sub-paths, no dot files
+        if not name or os.path.basename(name) != name or name.startswith(".") or not os.path.isfile(path):
+            self.send_error(404)
+            return
+        srv.send(self, path, name)
+
+    def log_message(self, fmt, *args):
+        pass   # send() prints one line per transfer
+
+
+def run_transfer_server() -> int:
+    """Entry point for ``main.py --serve-transfers``."""
+    try:
+        server = TransferServer()
+    except OSError as e:
+        print(f"[BW] Could not listen on :{BW_PORT}: {e}")
+        return 1
+    return server.serve()
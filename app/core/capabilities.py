@@ -0,0 +1,80 @@
+"""
+Host capability registry – what each PC already has, so runs can skip the
+bootstrap and probing work on hosts known to be ready.
+
+The probe step (ansible/steps/<os>/probe.yml) runs first in every install /
+remove / update job. On hosts without a fresh record it gathers minimal facts
+and the capabilities below, then drops one record per host on the controller:
+    data/capabilities/<ip>.json
+build_job() reads those records and passes them as host vars (``caps_*``);
+a host whose record is younger than SYNC_CAPS_TTL gets ``caps_fresh=true``
+and skips fact gathering and the probe entirely, and the Chocolatey bootstrap
+is skipped when ``caps_choco`` is true.
+
+Refresh is incremental: only hosts with a missing or stale record are probed,
+and a host's record is deleted whenever a run changes what it describes
+(e.g. the bootstrap installs Chocolatey), so the next run re-probes just it.
+
+Record fields
+    os_family      "Windows" / "Debian" (replaces the fact gathering for the OS guard)
+    choco          Chocolatey present (Windows)
+    choco_version  Chocolatey version, "" when absent
+    ps_version     PowerShell version (Windows)
+    python         Python version, "" when absent
+    free_gb        free space on the system drive, GB
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+from .config import CAPS_TTL
+
+CAPS_DIR = os.path.join("data", "capabilities")
+CAPS_FIELDS = ("os_family", "choco", "choco_version", "ps_version", "python", "free_gb")
+
+# Actions whose playbooks start with the probe step
+PROBED_ACTIONS = ("install", "remove", "update")
+
+
+def _record_path(project_root: str, ip: str) -> str:
+    return os.path.join(project_root, CAPS_DIR, f"{ip}.json")
+
+
+def load_record(project_root: str, ip: str) -> Optional[Dict]:
+    """A host's record with its age in seconds (``age``), or None."""
+    path = _record_path(project_root, ip)
+    try:
+        with open(path, "r") as f:
+            record = json.load(f)
+        record["age"] = time.time() - os.path.getmtime(path)
+    except (OSError, ValueError):
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _as_var(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def capability_host_vars(project_root: str, targets: List[str],
+                         ttl: int = CAPS_TTL) -> Dict[str, Dict[str, str]]:
+    """``caps_*`` host vars for every target with a fresh record."""
+    os.makedirs(os.path.join(project_root, CAPS_DIR), exist_ok=True)
+    host_vars: Dict[str, Dict[str, str]] = {}
+    if ttl <= 0:
+        return host_vars
+    for ip in targets:
+        record = load_record(project_root, ip)
+        if not record or record["age"] > ttl or not record.get("os_family"):
+            continue
+        hv = {"caps_fresh": "true"}
+        for key in CAPS_FIELDS:
+            if key in record:
+                hv[f"caps_{key}"] = _as_var(record[key])
+        host_vars[ip] = hv
+    return host_vars
+
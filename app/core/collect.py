@@ -0,0 +1,59 @@
+"""
+File collection – pull a path / glob back from every selected PC.
+
+Each client packs its matches into one deterministic archive (``tar | gzip -n``
+on Linux, Compress-Archive on Windows) and the controller fetches it with
+ansible's ``fetch``, which skips the transfer when the local copy already has
+the same checksum.  Re-running a collection under the same name therefore
+only moves what changed or what did not arrive the first time.
+
+Archives are laid out like the lab itself:
+
+    collected/<job>/<lab>/section-<s>/row-<r>/<pc-name>_<ip>/files.(tar.gz|zip)
+
+The per-host sub-directory is passed to the playbook as an inventory host
+var (``collect_subdir``); ``throttle`` on the fetch task bounds how many hosts
+upload at the same time.
+"""
+
+import os
+import re
+import time
+from typing import Dict, List
+
+from .config import COLLECT_DIR_NAME
+
+COLLECT_ACTION = "collect"
+
+
+def slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("._-") or "files"
+
+
+def default_job_name(path: str) -> str:
+    """'C:\\ExamLogs\\*.log' -> 'ExamLogs_log_20260301'"""
+    parts = [p for p in path.replace("\\", "/").split("/") if p and not p.endswith(":")]
+    base = re.sub(r"[^A-Za-z0-9-]+", "_", "_".join(parts[-2:])).strip("_") or "files"
+    return f"{base}_{time.strftime('%Y%m%d')}"
+
+
+def output_dir(project_root: str, job_name: str) -> str:
+    return os.path.join(project_root, COLLECT_DIR_NAME, job_name)
+
+
+def host_subdirs(inventory_manager, targets: List[str]) -> Dict[str, str]:
+    """{ip: "<lab>/section-<s>/row-<r>/<name>_<ip>"} from the lab layout."""
+    subdirs: Dict[str, str] = {}
+    for ip in targets:
+        found = inventory_manager.find_pc(ip) if inventory_manager else None
+        if not found:
+            subdirs[ip] = f"unassigned/{slug(ip)}"
+            continue
+        lab, pc = found
+        subdirs[ip] = "/".join([
+            slug(lab),
+            f"section-{pc.get('section', 0)}",
+            f"row-{pc.get('row', 0)}",
+            slug(f"{pc.get('name', 'pc')}_{ip}"),
+        ])
+    return subdirs
@@ -0,0 +1,128 @@
+"""
+Composite jobs – several package actions ("remove jdk8, install jdk17,
+update googlechrome") compiled into one ansible-playbook run.
+
+The generated playbook imports the ordinary per-action playbooks (or their
+runbooks) in order, so each step behaves exactly like a single-action job,
+but the container starts once, SSH connections persist across the plays and
+the probe step only runs in the first play (it marks the host probed).
+A host that fails a step is dropped by Ansible and skips the later steps.
+
+Per-step results
+    Before every step a tiny marker play emits, per host, one line:
+        ok: [10.20.9.1] => (item=composite step 2/3)
+    step_results() follows each host through those markers, so output from
+    several worker shards may interleave freely.
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List
+
+from .runbook import get_runbook, write_playbook
+
+COMPOSITE_ACTION = "composite"
+STEP_ACTIONS = ("remove", "install", "update")
+
+_MARKER_RE = re.compile(
+    r"^(?:ok|changed):\s*\[([^\]]+)\]\s*=>\s*\(item=composite step (\d+)/\d+\)"
+)
+_STATE_RE = re.compile(r"^(fatal|failed|unreachable):\s*\[([^\]]+)\]", re.IGNORECASE)
+
+
+def render(steps: List[Dict]) -> str:
+    """steps: [{"action", "playbook", "extra"}, ...] – playbooks relative to ansible/."""
+    lines = [
+        "---",
+        "# Generated by app/core/composite.py – do not edit, changes are overwritten.",
+    ]
+    n = len(steps)
+    for i, step in enumerate(steps, 1):
+        lines += [
+            "",
+            f"- name: {json.dumps(f'Composite step {i}/{n} - {describe(step)}')}",
+            "  hosts: all",
+            "  gather_facts: no",
+            "  tasks:",
+            f"    - name: composite | step {i}/{n}",
+            "      ansible.builtin.set_fact:",
+            "        composite_step: \"{{ item }}\"",
+            f"      loop: [\"composite step {i}/{n}\"]",
+            "",
+            f"- import_playbook: {os.path.basename(step['playbook'])}",
+            # JSON is valid YAML and keeps paths / quotes intact
+            f"  vars: {json.dumps(step['extra'])}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def playbook_name(steps: List[Dict]) -> str:
+    digest = hashlib.sha1(render(steps).encode("utf-8")).hexdigest()[:10]
+    return f"playbooks/_sync_composite_{digest}.yml"
+
+
+def write(project_root: str, os_name: str, steps: List[Dict]) -> str:
+    """Write the composite playbook (and any runbook it imports) into
+    ansible/playbooks/. Returns the playbook path relative to ansible/."""
+    for step in steps:
+        if step.get("runbook"):
+            get_runbook(os_name, step["action"]).write(project_root)
+    rel = playbook_name(steps)
+    write_playbook(os.path.join(project_root, "ansible", rel), render(steps))
+    return rel
+
+
+def step_results(lines: List[str], n_steps: int, targets: List[str]) -> List[Dict[str, str]]:
+    """Per step, {host: "ok" | "failed" | "unreachable" | "skipped"}."""
+    current: Dict[str, int] = {}
+    results: List[Dict[str, str]] = [{} for _ in range(n_steps)]
+    for line in lines:
+        line = line.strip()
+        m = _MARKER_RE.match(line)
+        if m:
+            host, step = m.group(1), int(m.group(2)) - 1
+            if 0 <= step < n_steps:
+                current[host] = step
+                results[step][host] = "ok"
+            continue
+        m = _STATE_RE.match(line)
+        if m and m.group(2) in current:
+            state = "unreachable" if m.group(1).lower() == "unreachable" else "failed"
+            results[current[m.group(2)]][m.group(2)] = state
+    for step in results:
+        for host in targets:
+            step.setdefault(host, "skipped")
+    return results
+
+
+def describe(step: Dict) -> str:
+    what = step["extra"].get("choco_package") or step["extra"].get("package_name") or ""
+    return f"{step['action']} {what}".strip()
+
+
+def summary_lines(steps: List[Dict], results: List[Dict[str, str]]) -> List[str]:
+    """One line per step for the log panel."""
+    lines = []
+    for i, (step, hosts) in enumerate(zip(steps, results), 1):
+        counts: Dict[str, List[str]] = {}
+        for host, state in sorted(hosts.items()):
+            counts.setdefault(state, []).append(host)
+        parts = [f"{len(counts[s])} {s}" for s in ("ok", "failed", "unreachable", "skipped") if s in counts]
+        bad = counts.get("failed", []) + counts.get("unreachable", [])
+        line = f"Step {i}/{len(steps)}  {describe(step)}: {', '.join(parts)}"
+        if bad:
+            line += f"  ({', '.join(bad)})"
+        lines.append(line)
+    return lines
+
+
+def host_notes(steps: List[Dict], results: List[Dict[str, str]]) -> Dict[str, str]:
+    """Per host, its step-by-step outcome (shown as the PC card tooltip)."""
+    marks = {"ok": "✓", "failed": "✗", "unreachable": "✗", "skipped": "–"}
+    notes: Dict[str, List[str]] = {}
+    for i, (step, hosts) in enumerate(zip(steps, results), 1):
+        for host, state in hosts.items():
+            notes.setdefault(host, []).append(f"{marks[state]} {i}. {describe(step)}")
+    return {host: "\n".join(parts) for host, parts in notes.items()}
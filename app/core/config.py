@@ -9,4 +9,164 @@ SOFTWARE_INVENTORY = {
 }
 ACTIONS = ["install", "uninstall", "update", "verify", "rollback", "health"]
 LABS = []  # Default labs
-OS_OPTIONS = ["windows", "linux"]
\ No newline at end of file
+OS_OPTIONS = ["windows", "linux"]
+
+# ── Execution backend ─────────────────────────────────────────────────────────
+# "docker" runs ansible-playbook inside the sync-ansible image (default),
+# "local" runs it straight from a local Ansible install / virtualenv.
+EXECUTOR_BACKEND = os.environ.get("SYNC_EXECUTOR", "docker").lower()
+ANSIBLE_IMAGE = os.environ.get("SYNC_ANSIBLE_IMAGE", "sync-ansible:latest")
+# Virtualenv (or any prefix with a bin/ or Scripts/ dir) holding ansible-playbook.
+# Empty means "whatever is on PATH".
+LOCAL_ANSIBLE_ENV = os.environ.get("SYNC_ANSIBLE_VENV", "")
+
+# ── Distributed execution ─────────────────────────────────────────────────────
+# Number of worker processes a job's targets are sharded across (1 = off).
+WORKER_COUNT = int(os.environ.get("SYNC_WORKERS", "1") or 1)
+# Optional comma separated SSH destinations; workers are spread over them
+# round-robin instead of running as local processes.
+WORKER_NODES = [n.strip() for n in os.environ.get("SYNC_WORKER_NODES", "").split(",") if n.strip()]
+# Entry point on the worker nodes (same main.py, started with --worker).
+WORKER_REMOTE_ENTRY = os.environ.get("SYNC_WORKER_ENTRY", "python3 sync/app/main.py")
+
+# ── Pull mode ─────────────────────────────────────────────────────────────────
+# When enabled the GUI records every install/remove as the lab's desired state
+# and serves it to client pull agents (agent/sync_agent.py) over HTTP.
+# An agent only gets and reports the state of the address it connects from;
+# PULL_TOKEN, when set, must be sent by every agent (X-Sync-Token) and lets a
+# token holder name another host (agents behind NAT, --host).
+PULL_MODE = os.environ.get("SYNC_PULL_MODE", "0") == "1"
+STATE_SERVER_PORT = int(os.environ.get("SYNC_STATE_PORT", "8765") or 8765)
+PULL_TOKEN = os.environ.get("SYNC_PULL_TOKEN", "")
+PULL_INTERVAL = int(os.environ.get("SYNC_PULL_INTERVAL", "300") or 300)
+AGENT_REPORTS_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../data/agent_reports.json"))
+
+# ── Runbooks ──────────────────────────────────────────────────────────────────
+# Run install jobs as per-host step pipelines (core/runbook.py, strategy: free)
+# instead of the hand-chained playbooks.
+USE_RUNBOOKS = os.environ.get("SYNC_RUNBOOKS", "1") == "1"
+
+# ── Async long-running installs ───────────────────────────────────────────────
+# Local-file installers (win_package) and dist-upgrades are launched with
+# async/poll: 0 and polled, instead of holding a fork for their whole runtime.
+ASYNC_LONG_TASKS = os.environ.get("SYNC_ASYNC", "1") == "1"
+ASYNC_POLL_INTERVAL = int(os.environ.get("SYNC_ASYNC_POLL", "15") or 15)   # seconds
+ASYNC_TIMEOUT = int(os.environ.get("SYNC_ASYNC_TIMEOUT", "3600") or 3600)  # per host
+
+# ── Deadlines ─────────────────────────────────────────────────────────────────
+# Per task and host: a host whose task runs longer fails that task, is dropped
+# from the rest of the play and shows as "timed out"; everyone else carries on.
+# 0 = disabled (no task deadline; ansible's own connect timeout).
+TASK_TIMEOUT = int(os.environ.get("SYNC_TASK_TIMEOUT", "1800") or 0)         # seconds
+CONNECT_TIMEOUT = int(os.environ.get("SYNC_CONNECT_TIMEOUT", "30") or 0)     # seconds
+# Hard wall-clock budget for a whole job; the run is stopped when it expires
+# and hosts without a final result are marked timed out. 0 = no limit.
+JOB_DEADLINE = int(os.environ.get("SYNC_JOB_DEADLINE", "7200") or 0)         # seconds
+
+# ── Connection pre-warming ────────────────────────────────────────────────────
+# PCs selected on the lab page get an SSH master connection in the background
+# (core/prewarm.py) that ansible reuses. A master closes after PREWARM_IDLE
+# idle seconds; at most PREWARM_MAX are held at once.
+PREWARM = os.environ.get("SYNC_PREWARM", "1") == "1"
+PREWARM_IDLE = int(os.environ.get("SYNC_PREWARM_IDLE", "600") or 600)     # seconds
+PREWARM_MAX = int(os.environ.get("SYNC_PREWARM_MAX", "64") or 64)
+PREWARM_PARALLEL = int(os.environ.get("SYNC_PREWARM_PARALLEL", "8") or 8)  # handshakes at once
+
+# ── Concurrency autotuning ────────────────────────────────────────────────────
+# Forks are chosen per run by core/autotune.py from controller headroom, target
+# reachability and the previous run's error rate. SYNC_FORKS pins a value.
+AUTOTUNE = os.environ.get("SYNC_AUTOTUNE", "1") == "1"
+FIXED_FORKS = int(os.environ.get("SYNC_FORKS", "0") or 0)
+MAX_FORKS = int(os.environ.get("SYNC_MAX_FORKS", "100") or 100)
+AUTOTUNE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../data/autotune.json"))
+
+# ── File collection ───────────────────────────────────────────────────────────
+# Collected files land in <project>/collected/<job>/<lab>/section-N/row-N/<pc>/.
+COLLECT_DIR_NAME = "collected"
+# Hosts fetching at the same time (keeps one lab's uplink from saturating).
+COLLECT_PARALLEL = int(os.environ.get("SYNC_COLLECT_PARALLEL", "5") or 5)
+
+# ── Content sync ──────────────────────────────────────────────────────────────
+# PCs receiving content at the same time during a sync.
+CONTENT_PARALLEL = int(os.environ.get("SYNC_CONTENT_PARALLEL", "10") or 10)
+
+# ── Installer pre-staging ─────────────────────────────────────────────────────
+# PCs receiving a staged payload at the same time (kept low: staging is meant
+# to trickle through a lab while it is in use).
+STAGE_PARALLEL = int(os.environ.get("SYNC_STAGE_PARALLEL", "3") or 3)
+
+# ── Peer-assisted staging ─────────────────────────────────────────────────────
+# The controller seeds FANOUT_SEEDS PCs per section; every PC holding the
+# payload then serves up to FANOUT_DEGREE neighbours over HTTP on FANOUT_PORT.
+FANOUT_SEEDS = int(os.environ.get("SYNC_FANOUT_SEEDS", "2") or 2)
+FANOUT_DEGREE = int(os.environ.get("SYNC_FANOUT_DEGREE", "3") or 3)
+FANOUT_PORT = int(os.environ.get("SYNC_FANOUT_PORT", "8099") or 8099)
+FANOUT_TTL = int(os.environ.get("SYNC_FANOUT_TTL", "3600") or 3600)   # seconds a peer keeps serving
+
+# ── Coordinated reboots ───────────────────────────────────────────────────────
+# Hosts with a pending reboot restart in waves of REBOOT_WAVE, REBOOT_STAGGER
+# seconds apart (Linux rounds down to whole minutes); each host then has
+# REBOOT_TIMEOUT seconds to answer on its management port again.
+REBOOT_WAVE = int(os.environ.get("SYNC_REBOOT_WAVE", "10") or 10)
+REBOOT_STAGGER = int(os.environ.get("SYNC_REBOOT_STAGGER", "60") or 60)
+REBOOT_TIMEOUT = int(os.environ.get("SYNC_REBOOT_TIMEOUT", "900") or 900)
+
+# ── Power management ──────────────────────────────────────────────────────────
+# Wake-on-LAN magic packets go to WOL_BROADCAST:WOL_PORT (empty = each PC's /24
+# broadcast address), WOL_REPEAT copies per PC, in batches of WOL_BATCH PCs
+# WOL_STAGGER seconds apart so a lab does not power up on one breaker at once.
+# Woken PCs get WOL_TIMEOUT seconds to open their management port.
+WOL_BROADCAST = os.environ.get("SYNC_WOL_BROADCAST", "")
+WOL_PORT = int(os.environ.get("SYNC_WOL_PORT", "9") or 9)
+WOL_REPEAT = int(os.environ.get("SYNC_WOL_REPEAT", "3") or 3)
+WOL_BATCH = int(os.environ.get("SYNC_WOL_BATCH", "10") or 10)
+WOL_STAGGER = float(os.environ.get("SYNC_WOL_STAGGER", "2") or 0)
+WOL_TIMEOUT = int(os.environ.get("SYNC_WOL_TIMEOUT", "300") or 300)
+
+# ── Fleet health ──────────────────────────────────────────────────────────────
+# Health snapshots (data/health/<ip>.json) older than HEALTH_TTL seconds show
+# as stale on the lab grid. A PC is flagged when free disk is below
+# HEALTH_MIN_DISK GB, free memory below HEALTH_MIN_MEM % or CPU load above
+# HEALTH_MAX_CPU %.
+HEALTH_TTL = int(os.environ.get("SYNC_HEALTH_TTL", "900") or 900)
+HEALTH_MIN_DISK = float(os.environ.get("SYNC_HEALTH_MIN_DISK", "5") or 0)
+HEALTH_MIN_MEM = int(os.environ.get("SYNC_HEALTH_MIN_MEM", "10") or 0)
+HEALTH_MAX_CPU = int(os.environ.get("SYNC_HEALTH_MAX_CPU", "90") or 100)
+
+# ── Host capability registry ──────────────────────────────────────────────────
+# Seconds a probed host record (data/capabilities/<ip>.json) is trusted before
+# the host is probed again. 0 = always probe.
+CAPS_TTL = int(os.environ.get("SYNC_CAPS_TTL", "86400") or 0)
+
+# ── Cancellation ──────────────────────────────────────────────────────────────
+# "finish": interrupt ansible like Ctrl-C and give it CANCEL_GRACE seconds to
+# wind down (a second Cancel click aborts). "abort": stop everything at once.
+CANCEL_POLICY = os.environ.get("SYNC_CANCEL_POLICY", "finish").lower()
+CANCEL_GRACE = int(os.environ.get("SYNC_CANCEL_GRACE", "120") or 120)   # seconds
+
+# ── Detached jobs ─────────────────────────────────────────────────────────────
+# 1 = runs execute in a background runner that journals its output under
+# data/jobs/<id>/, so closing (or crashing) the GUI does not stop them and the
+# next start reattaches. Off by default: runs stay inside the GUI process.
+DETACHED_JOBS = os.environ.get("SYNC_DETACHED", "0") == "1"
+JOURNAL_KEEP = int(os.environ.get("SYNC_JOURNAL_KEEP", "50") or 50)   # finished journals kept
+
+# ── Bandwidth budgets ─────────────────────────────────────────────────────────
+# Controller-wide cap in Mbit/s for installer transfers (0 = none); per-lab and
+# per-section budgets live in the inventory. Budgeted transfers are served by a
+# rate-limited HTTP server on BW_PORT that exits after BW_IDLE idle seconds.
+# BW_ADDRESS overrides the controller address clients download from; when set,
+# the server listens on that address only.
+BW_GLOBAL = float(os.environ.get("SYNC_BW_GLOBAL", "0") or 0)
+BW_PORT = int(os.environ.get("SYNC_BW_PORT", "8097") or 8097)
+BW_IDLE = int(os.environ.get("SYNC_BW_IDLE", "300") or 300)
+BW_ADDRESS = os.environ.get("SYNC_BW_ADDRESS", "")
+
+# ── Scheduler ─────────────────────────────────────────────────────────────────
+# `main.py --scheduler` checks data/schedules.json every SCHED_POLL seconds.
+# Hosts offline when a schedule starts are retried every SCHED_RETRY seconds
+# until the lab's maintenance window closes, or for SCHED_DEFER_MAX seconds
+# when the schedule ignores windows.
+SCHED_POLL = int(os.environ.get("SYNC_SCHED_POLL", "30") or 30)
+SCHED_RETRY = int(os.environ.get("SYNC_SCHED_RETRY", "300") or 300)
+SCHED_DEFER_MAX = int(os.environ.get("SYNC_SCHED_DEFER_MAX", "14400") or 14400)
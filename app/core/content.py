@@ -0,0 +1,18 @@
+"""
+Content sync – mirror a controller folder (course files, datasets) to a path
+on the selected PCs, sending only what changed.
+
+Linux    ansible.posix.synchronize (rsync over the same SSH connection):
+         unchanged files are skipped by size/mtime and changed files are
+         patched with rsync's rolling-checksum delta, so a small edit to a
+         large file moves a few blocks, not the file.
+Windows  ansible.windows.win_copy on the directory: the client reports a
+         checksum per file and only the files that differ are zipped and
+         sent. Extra files are removed against a manifest when mirroring.
+
+Parallel uploads are bounded with ``throttle`` (SYNC_CONTENT_PARALLEL).
+With the Docker executor the source folder is bind-mounted at CONTENT_MOUNT.
+"""
+
+CONTENT_ACTION = "sync"
+CONTENT_MOUNT = "/sync_content"
@@ -0,0 +1,298 @@
+"""
+Distributed execution – shard one job's targets across N worker processes.
+
+Coordinator side (GUI)
+    ShardedAnsibleWorker splits the targets into contiguous shards, starts one
+    worker per shard and merges their streamed output into a single log.
+    It also runs several jobs side by side (a mixed Windows/Linux selection
+    becomes one job per OS), each sharded on its own. The coordination itself
+    lives in the Qt-free ShardRunner, which detached jobs (core.journal) run
+    in a background process.
+    Each shard's PLAY RECAP is held back and re-emitted as one combined recap
+    at the end, so SoftwarePage's recap parser builds a single results map.
+
+Worker side
+    The same entry point (``main.py --worker``) reads a JSON job spec on
+    stdin, writes its own temp inventory, runs the playbook through the
+    configured executor and streams ansible's stdout back unchanged.
+
+Workers are local processes by default; with SYNC_WORKER_NODES set they are
+launched over SSH on other controller machines instead.
+"""
+
+import json
+import os
+import queue
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+from typing import Callable, List, Optional, Union
+
+from PySide6.QtCore import QThread, Signal
+
+from .ansible_worker import (
+    CANCEL_MARKER, POPEN_SESSION, TIMEOUT_MARKER, cancel_args, stop_process,
+)
+from .config import CANCEL_POLICY, WORKER_NODES, WORKER_REMOTE_ENTRY
+from .executors import get_executor
+from .job_builder import (
+    Job, get_project_root, inventory_rel_path, write_temp_inventory,
+)
+
+
+def shard_targets(targets: List[str], n: int) -> List[List[str]]:
+    """Split targets into at most n contiguous, evenly sized shards."""
+    n = max(1, min(n, len(targets)))
+    size, rest = divmod(len(targets), n)
+    shards, start = [], 0
+    for i in range(n):
+        end = start + size + (1 if i < rest else 0)
+        shards.append(targets[start:end])
+        start = end
+    return [s for s in shards if s]
+
+
+def entry_command(*args: str) -> List[str]:
+    """Command that re-enters this app (main.py or the frozen build) with `args`."""
+    if getattr(sys, "frozen", False):
+        return [sys.executable, *args]
+    main_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    return [sys.executable, main_py, *args]
+
+
+def worker_command(index: int) -> List[str]:
+    """Command that starts worker number `index` (local process or SSH node)."""
+    if WORKER_NODES:
+        node = WORKER_NODES[index % len(WORKER_NODES)]
+        return ["ssh", "-o", "BatchMode=yes", node, *shlex.split(WORKER_REMOTE_ENTRY), "--worker"]
+    return entry_command("--worker")
+
+
+# =============================================================================
+# Worker side
+# =============================================================================
+def run_worker(stdin=None, stdout=None) -> int:
+    """Entry point for ``main.py --worker``. Returns the process exit code."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+
+    def emit(line: str):
+        stdout.write(line + "\n")
+        stdout.flush()
+
+    try:
+        spec = json.load(stdin)
+        job = Job.from_dict(spec["job"])
+    except (ValueError, KeyError) as e:
+        emit(f"[ERROR] Invalid worker job spec: {e}")
+        return 2
+
+    shard = spec.get("shard", 0)
+    project_root = get_project_root()
+    executor = get_executor(spec.get("executor"))
+    available, reason = executor.is_available()
+    if not available:
+        emit(f"[ERROR] Executor '{executor.name}' unavailable: {reason}")
+        return 1
+
+    filename = f"_sync_tmp_inventory_w{shard}_{os.getpid()}.ini"
+    tmp_inv = write_temp_inventory(
+        project_root, job.targets, job.group, filename, job.host_vars, job.inventory_vars(),
+    )
+    if tmp_inv is None:
+        emit("[ERROR] Could not write temporary inventory.")
+        return 1
+
+    cmd = job.command(executor, project_root, inventory_rel_path(filename))
+    try:
+        process = subprocess.Popen(
+            cmd.args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            cwd=cmd.cwd,
+            env=cmd.env,
+            **POPEN_SESSION,
+        )
+
+        # Coordinator stops us with SIGTERM (deadline / abort) or SIGINT
+        # (cancel, let ansible wind down) – pass it on to ansible's process tree
+        def on_stop(policy):
+            threading.Thread(
+                target=stop_process, args=(process,),
+                kwargs={"container": cmd.container, **cancel_args(policy)}, daemon=True,
+            ).start()
+
+        signal.signal(signal.SIGTERM, lambda *_: on_stop("abort"))
+        signal.signal(signal.SIGINT, lambda *_: on_stop("finish"))
+        for line in iter(process.stdout.readline, ""):
+            emit(line.rstrip("\n"))
+        process.stdout.close()
+        return process.wait()
+    except OSError as e:
+        emit(f"[ERROR] {e}")
+        return 1
+    finally:
+        try:
+            os.remove(tmp_inv)
+        except OSError:
+            pass
+
+
+# =============================================================================
+# Coordinator side
+# =============================================================================
+class ShardRunner:
+    """
+    Qt-free coordinator: starts one worker per shard, merges their output
+    through `emit` and returns True if every shard succeeded. Used by
+    ShardedAnsibleWorker in the GUI and by detached jobs (core.journal).
+    """
+
+    def __init__(self, jobs: Union[Job, List[Job]], workers: int,
+                 executor_name: Optional[str] = None, deadline: int = 0):
+        jobs = jobs if isinstance(jobs, list) else [jobs]
+        # Worker budget is split across jobs by host count, at least one each
+        total = sum(len(job.targets) for job in jobs) or 1
+        self.shards: List[Job] = []
+        for job in jobs:
+            share = max(1, round(workers * len(job.targets) / total))
+            self.shards += [job.with_targets(s) for s in shard_targets(job.targets, share)]
+        self.executor_name = executor_name
+        self.deadline = deadline
+        self.timed_out = False
+        self.cancelled = False
+        self._processes: List[subprocess.Popen] = []
+        self._emit: Callable[[str], None] = print
+
+    def cancel(self, policy: str = CANCEL_POLICY):
+        """Stop every shard without blocking the caller (see config.CANCEL_POLICY)."""
+        self.cancelled = True
+        self._emit(f"{CANCEL_MARKER} Cancelled by user ({policy}).")
+        kwargs = cancel_args(policy)
+        kwargs["grace"] += 10   # workers first tear down their own ansible / container
+        for process in list(self._processes):
+            threading.Thread(target=stop_process, args=(process,), kwargs=kwargs, daemon=True).start()
+
+    def _on_deadline(self, processes: List[subprocess.Popen]):
+        self.timed_out = True
+        self._emit(
+            f"{TIMEOUT_MARKER} Job deadline of {self.deadline}s exceeded – stopping remaining hosts."
+        )
+        for process in processes:
+            stop_process(process)
+
+    def _pump(self, index: int, stream, lines: "queue.Queue"):
+        for line in iter(stream.readline, ""):
+            lines.put((index, line.rstrip("\n")))
+        stream.close()
+        lines.put((index, None))
+
+    def run(self, emit: Callable[[str], None]) -> bool:
+        self._emit = emit
+        lines: queue.Queue = queue.Queue()
+        processes = self._processes
+        try:
+            for i, shard in enumerate(self.shards):
+                if self.cancelled:
+                    break
+                spec = {
+                    "job": shard.to_dict(),
+                    "shard": i,
+                    "executor": self.executor_name,
+                }
+                cmd = worker_command(i)
+                emit(
+                    f"[worker {i + 1}/{len(self.shards)}] {shard.os_name} {shard.action}:"
+                    f" {len(shard.targets)} host(s) via {cmd[0]}"
+                )
+                process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    **POPEN_SESSION,
+                )
+                process.stdin.write(json.dumps(spec))
+                process.stdin.close()
+                processes.append(process)
+                threading.Thread(
+                    target=self._pump, args=(i, process.stdout, lines), daemon=True
+                ).start()
+        except OSError as e:
+            emit(f"[ERROR] {str(e)}")
+            for process in processes:
+                process.kill()
+            return False
+
+        watchdog = None
+        if self.deadline > 0:
+            watchdog = threading.Timer(self.deadline, self._on_deadline, [processes])
+            watchdog.daemon = True
+            watchdog.start()
+
+        # Live lines go straight through; each shard's recap is held back
+        in_recap = [False] * len(processes)
+        recap_lines: List[str] = []
+        open_streams = len(processes)
+        while open_streams:
+            index, line = lines.get()
+            if line is None:
+                open_streams -= 1
+                continue
+            if "play recap" in line.lower():
+                in_recap[index] = True
+                continue
+            if in_recap[index]:
+                if line.strip():
+                    recap_lines.append(line)
+                continue
+            emit(line)
+
+        # Reap every shard before judging the run (all() would stop at the first failure)
+        codes = [process.wait() for process in processes]
+        ok = all(code == 0 for code in codes) and not (self.timed_out or self.cancelled)
+        if watchdog:
+            watchdog.cancel()
+        if recap_lines:
+            emit("")
+            emit("PLAY RECAP " + "*" * 60)
+            for line in recap_lines:
+                emit(line)
+        return ok
+
+
+class ShardedAnsibleWorker(QThread):
+    """
+    Drop-in replacement for AnsibleWorker that fans one or more jobs out over
+    several worker processes. Same signals, so SoftwareController can use either.
+    """
+
+    output_received = Signal(str)
+    finished = Signal(bool)  # True if every shard succeeded
+
+    def __init__(self, jobs: Union[Job, List[Job]], workers: int,
+                 executor_name: Optional[str] = None, deadline: int = 0):
+        super().__init__()
+        self.runner = ShardRunner(jobs, workers, executor_name, deadline)
+
+    @property
+    def shards(self) -> List[Job]:
+        return self.runner.shards
+
+    @property
+    def timed_out(self) -> bool:
+        return self.runner.timed_out
+
+    @property
+    def cancelled(self) -> bool:
+        return self.runner.cancelled
+
+    def cancel(self, policy: str = CANCEL_POLICY):
+        self.runner.cancel(policy)
+
+    def run(self):
+        self.finished.emit(self.runner.run(self.output_received.emit))
@@ -0,0 +1,185 @@
+"""
+Executor backends – decide *where* an ansible command runs.
+
+Every backend receives the same ansible argv, written as if the current
+directory were ``<project>/ansible`` (relative inventory / playbook paths),
+and turns it into a ready-to-spawn :class:`ExecCommand`.  AnsibleWorker
+then runs that command and streams its stdout exactly as before, so the
+GUI never needs to know which backend is active.
+
+Backend  | Runs ansible-playbook ...
+---------|------------------------------------------------------------------
+docker   | inside the sync-ansible image (``docker run --rm``)   – default
+local    | from a local Ansible install / virtualenv, no container at all
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import ANSIBLE_IMAGE, EXECUTOR_BACKEND, LOCAL_ANSIBLE_ENV
+
+
+@dataclass
+class ExecCommand:
+    args: List[str]
+    cwd: Optional[str] = None
+    env: Optional[Dict[str, str]] = None
+    container: Optional[str] = None   # docker container name, removed on cancel
+
+
+def remove_container(name: str):
+    """Force-remove a (possibly still running) container; missing is fine."""
+    try:
+        subprocess.run(["docker", "rm", "-f", name], capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"[Executor] Could not remove container {name}: {e}")
+
+
+@dataclass
+class Executor:
+    """Base class – subclasses implement is_available() and build()."""
+
+    name: str = "base"
+
+    def is_available(self) -> Tuple[bool, str]:
+        raise NotImplementedError
+
+    def build(
+        self,
+        argv: Sequence[str],
+        project_root: str,
+        vault_pass: Optional[str] = None,
+        mounts: Sequence[Tuple[str, str]] = (),
+        ansible_env: Optional[Dict[str, str]] = None,
+    ) -> ExecCommand:
+        """
+        argv         : ansible command, e.g. ["ansible-playbook", "-i", "inventory/x.ini", ...]
+        project_root : repository root (contains ansible/ and software_repo/)
+        vault_pass   : host path of the vault password file, if any
+        mounts       : extra (host_path, container_path) pairs – Docker only
+        ansible_env  : ANSIBLE_* settings for the ansible process (timeouts etc.)
+        """
+        raise NotImplementedError
+
+    def path_for(self, host_path: str, container_path: str) -> str:
+        """Where ansible sees a mounted host path (same path when not containerised)."""
+        return host_path
+
+
+# =============================================================================
+# Docker – today's behaviour
+# =============================================================================
+@dataclass
+class DockerExecutor(Executor):
+    name: str = "docker"
+    image: str = ANSIBLE_IMAGE
+
+    def is_available(self) -> Tuple[bool, str]:
+        if shutil.which("docker") is None:
+            return False, "docker executable not found on PATH"
+        return True, ""
+
+    def build(self, argv, project_root, vault_pass=None, mounts=(), ansible_env=None):
+        ssh_dir = os.path.expanduser("~/.ssh")
+        # Named so a cancelled job's container can be removed even if the
+        # docker client was killed before it could forward the signal; --init
+        # so ansible-playbook (not PID 1) actually receives SIGTERM / SIGINT
+        name = f"sync-ansible-{uuid.uuid4().hex[:12]}"
+        cmd = [
+            "docker", "run", "--rm", "--init", "--name", name,
+            "-v", f"{project_root}:/app",
+            "-v", f"{ssh_dir}:/root/.ssh:ro",
+        ]
+        for host_path, container_path in mounts:
+            cmd += ["-v", f"{host_path}:{container_path}"]
+        if vault_pass:
+            cmd += ["-v", f"{vault_pass}:/vault_pass:ro"]
+        for key, value in (ansible_env or {}).items():
+            cmd += ["-e", f"{key}={value}"]
+
+        cmd += ["-w", "/app/ansible", self.image, *argv]
+
+        if vault_pass:
+            cmd += ["--vault-password-file=/vault_pass"]
+        return ExecCommand(args=cmd, container=name)
+
+    def path_for(self, host_path, container_path):
+        return container_path
+
+
+# =============================================================================
+# Local – ansible from a configured environment, no container
+# =============================================================================
+@dataclass
+class LocalExecutor(Executor):
+    name: str = "local"
+    env_dir: str = LOCAL_ANSIBLE_ENV
+    extra_env: Dict[str, str] = field(default_factory=dict)
+
+    def _bin_dir(self) -> Optional[str]:
+        if not self.env_dir:
+            return None
+        root = os.path.expanduser(self.env_dir)
+        for sub in ("bin", "Scripts"):
+            candidate = os.path.join(root, sub)
+            if os.path.isdir(candidate):
+                return candidate
+        return root
+
+    def _which(self, program: str) -> Optional[str]:
+        bin_dir = self._bin_dir()
+        if bin_dir:
+            return shutil.which(program, path=bin_dir)
+        return shutil.which(program)
+
+    def is_available(self) -> Tuple[bool, str]:
+        if sys.platform.startswith("win"):
+            return False, "Ansible cannot run natively on a Windows controller"
+        if self._which("ansible-playbook") is None:
+            where = self._bin_dir() or "PATH"
+            return False, f"ansible-playbook not found in {where}"
+        return True, ""
+
+    def build(self, argv, project_root, vault_pass=None, mounts=(), ansible_env=None):
+        args = list(argv)
+        resolved = self._which(args[0])
+        if resolved:
+            args[0] = resolved
+        if vault_pass:
+            args.append(f"--vault-password-file={vault_pass}")
+
+        env = dict(os.environ)
+        bin_dir = self._bin_dir()
+        if bin_dir:
+            env["PATH"] = bin_dir + os.pathsep + env.get("PATH", "")
+        cfg = os.path.join(project_root, "ansible.cfg")
+        if os.path.exists(cfg):
+            env.setdefault("ANSIBLE_CONFIG", cfg)
+        # Line-buffered output so the log panel streams like the container does
+        env["PYTHONUNBUFFERED"] = "1"
+        env.update(ansible_env or {})
+        env.update(self.extra_env)
+
+        return ExecCommand(
+            args=args,
+            cwd=os.path.join(project_root, "ansible"),
+            env=env,
+        )
+
+
+# ── factory ───────────────────────────────────────────────────────────────────
+
+_EXECUTORS = {
+    "docker": DockerExecutor,
+    "local":  LocalExecutor,
+}
+
+
+def get_executor(name: Optional[str] = None) -> Executor:
+    cls = _EXECUTORS.get((name or EXECUTOR_BACKEND).lower(), DockerExecutor)
+    return cls()
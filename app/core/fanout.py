@@ -0,0 +1,85 @@
+"""
+Peer-assisted distribution – a payload spreads through a lab as a tree
+instead of every PC pulling it from the controller.
+
+plan_tree() builds the tree from the lab layout: the controller seeds the
+first few PCs of every section (wave 0); in each following wave every PC
+that already holds the payload serves it to one neighbour in its section
+(next in row/column order), up to ``degree`` children.  The number of
+holders roughly doubles per wave, so a lab of N PCs is covered in
+about log2(N / seeds) waves rather than N / parallelism.
+
+The plan is handed to playbooks/windows_stage_peer.yml as host vars:
+    fanout_parent    "controller" or the parent's IP
+    fanout_wave      wave in which this host receives the payload
+    fanout_children  how many peers will pull from it
+Each hop is verified against the payload's sha256; a host whose parent
+fails falls back to the controller.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+CONTROLLER = "controller"
+
+
+@dataclass
+class FanoutNode:
+    ip: str
+    parent: str
+    wave: int
+    children: int = 0
+
+    def host_vars(self) -> Dict[str, str]:
+        return {
+            "fanout_parent":   self.parent,
+            "fanout_wave":     str(self.wave),
+            "fanout_children": str(self.children),
+        }
+
+
+def plan_tree(pcs: List[dict], seeds_per_section: int = 2, degree: int = 3) -> Dict[str, FanoutNode]:
+    """
+    pcs: inventory PC dicts (ip, section, row, col). Returns {ip: FanoutNode}.
+    Trees never cross sections, which usually map to one switch each.
+    """
+    sections: Dict[int, List[dict]] = {}
+    for pc in pcs:
+        sections.setdefault(pc.get("section", 0), []).append(pc)
+
+    plan: Dict[str, FanoutNode] = {}
+    for members in sections.values():
+        members.sort(key=lambda pc: (pc.get("row", 0), pc.get("col", 0)))
+        pending = [pc["ip"] for pc in members]
+        holders: List[FanoutNode] = []
+
+        for ip in pending[:max(1, seeds_per_section)]:
+            node = FanoutNode(ip, CONTROLLER, 0)
+            plan[ip] = node
+            holders.append(node)
+        pending = pending[max(1, seeds_per_section):]
+
+        wave = 0
+        while pending:
+            wave += 1
+            new_holders = []
+            for holder in holders:
+                if not pending:
+                    break
+                if holder.children >= degree or holder.wave >= wave:
+                    continue
+                node = FanoutNode(pending.pop(0), holder.ip, wave)
+                holder.children += 1
+                plan[node.ip] = node
+                new_holders.append(node)
+            if not new_holders:
+                # every holder is at its degree limit – seed one more from the controller
+                node = FanoutNode(pending.pop(0), CONTROLLER, wave)
+                plan[node.ip] = node
+                new_holders.append(node)
+            holders += new_holders
+    return plan
+
+
+def wave_count(plan: Dict[str, FanoutNode]) -> int:
+    return max((node.wave for node in plan.values()), default=-1) + 1
@@ -0,0 +1,210 @@
+"""
+Fleet health – a quick snapshot of every selected PC before a big rollout.
+
+The ``health`` action is an ad-hoc run (core.adhoc) of one short command per
+OS: no playbook, no fact gathering, no module transfer on Linux (raw).  Each
+PC prints a single line:
+    health up=<s> cpu=<%> mem=<MB free> memt=<MB total> disk=<MB free> reboot=<0|1> user=<name|->
+cpu is the CPU load in percent (Linux: 1-minute load average per core).
+
+Results are kept per host with a timestamp,
+    data/health/<ip>.json
+and the lab page shows them as an overlay on the PC grid, so readiness is
+visible at a glance before anything runs; snapshots older than HEALTH_TTL
+are shown as stale.  assess() applies the HEALTH_* thresholds.
+"""
+
+import json
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import adhoc
+from .config import HEALTH_MAX_CPU, HEALTH_MIN_DISK, HEALTH_MIN_MEM, HEALTH_TTL
+
+HEALTH_ACTION = "health"
+HEALTH_DIR = os.path.join("data", "health")
+
+COMMANDS = {
+    "linux": (
+        "printf 'health up=%s cpu=%s mem=%s memt=%s disk=%s reboot=%s user=%s\\n' "
+        "\"$(cut -d. -f1 /proc/uptime)\" "
+        "\"$(awk -v n=\"$(nproc)\" '{printf \"%d\", $1 * 100 / n}' /proc/loadavg)\" "
+        "\"$(awk '/^MemAvailable:/ {print int($2 / 1024)}' /proc/meminfo)\" "
+        "\"$(awk '/^MemTotal:/ {print int($2 / 1024)}' /proc/meminfo)\" "
+        "\"$(df -Pm / | awk 'NR == 2 {print $4}')\" "
+        "\"$(test -f /var/run/reboot-required && echo 1 || echo 0)\" "
+        "\"$(who | awk '{print $1}' | sort -u | paste -sd, - | grep . || echo -)\""
+    ),
+    "windows": (
+        "$os = Get-CimInstance Win32_OperatingSystem; "
+        "$disk = Get-CimInstance Win32_LogicalDisk -Filter \"DeviceID='$env:SystemDrive'\"; "
+        "$cpu = (Get-CimInstance Win32_Processor | Measure-Object LoadPercentage -Average).Average; "
+        "$reboot = (Test-Path 'HKLM:\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Component Based Servicing\\RebootPending') -or "
+        "(Test-Path 'HKLM:\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\WindowsUpdate\\Auto Update\\RebootRequired'); "
+        "$user = (Get-CimInstance Win32_ComputerSystem).UserName; "
+        "if ($user) { $user = $user.Split('\\')[-1] } else { $user = '-' }; "
+        "\"health up=$([int]((Get-Date) - $os.LastBootUpTime).TotalSeconds) cpu=$([int]$cpu) "
+        "mem=$([int]($os.FreePhysicalMemory / 1024)) memt=$([int]($os.TotalVisibleMemorySize / 1024)) "
+        "disk=$([int]($disk.FreeSpace / 1MB)) reboot=$([int]$reboot) user=$user\""
+    ),
+}
+
+_LINE_RE = re.compile(r"\bhealth ((?:\w+=\S*\s*)+)")
+_INT_FIELDS = {"up": "uptime", "cpu": "cpu", "mem": "mem_free", "memt": "mem_total", "disk": "disk_free"}
+
+
+def adhoc_extra(os_name: str) -> Dict[str, str]:
+    return {"command": COMMANDS[os_name]}
+
+
+def parse_output(text: str) -> Optional[Dict]:
+    """The fields of a host's ``health ...`` line, or None."""
+    m = _LINE_RE.search(text or "")
+    if not m:
+        return None
+    values = dict(pair.split("=", 1) for pair in m.group(1).split())
+    record: Dict = {}
+    for key, name in _INT_FIELDS.items():
+        try:
+            record[name] = int(values.get(key, ""))
+        except ValueError:
+            pass
+    record["reboot"] = values.get("reboot") == "1"
+    record["user"] = "" if values.get("user", "-") == "-" else values["user"]
+    return record
+
+
+def collect(lines: Iterable[str]) -> Tuple[Dict[str, Dict], Dict[str, adhoc.HostResult]]:
+    """({host: record}, adhoc results) from an ad-hoc health run's output."""
+    results = adhoc.collect_results(lines)
+    records: Dict[str, Dict] = {}
+    now = time.time()
+    for host, r in results.items():
+        record = parse_output(r.output) if r.ok else None
+        if record is None:
+            record = {"error": r.output.splitlines()[0] if r.output else "no output"}
+        record["ts"] = now
+        record["reachable"] = not r.unreachable
+        records[host] = record
+    return records, results
+
+
+# =============================================================================
+# Snapshot cache
+# =============================================================================
+def save_snapshot(project_root: str, records: Dict[str, Dict]):
+    os.makedirs(os.path.join(project_root, HEALTH_DIR), exist_ok=True)
+    for ip, record in records.items():
+        path = os.path.join(project_root, HEALTH_DIR, f"{ip}.json")
+        try:
+            with open(path, "w") as f:
+                json.dump(record, f)
+        except OSError as e:
+            print(f"[HEALTH] Could not save {ip}: {e}")
+
+
+def load_snapshot(project_root: str, ips: Iterable[str]) -> Dict[str, Dict]:
+    """{ip: record with ``age`` in seconds} for the hosts that have one."""
+    snapshot: Dict[str, Dict] = {}
+    for ip in ips:
+        try:
+            with open(os.path.join(project_root, HEALTH_DIR, f"{ip}.json"), "r") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(record, dict):
+            record["age"] = time.time() - record.get("ts", 0)
+            snapshot[ip] = record
+    return snapshot
+
+
+# =============================================================================
+# Presentation
+# =============================================================================
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 86400:
+        return f"{seconds // 86400}d {seconds % 86400 // 3600}h"
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    return f"{seconds // 60}m" if seconds >= 60 else "<1m"
+
+
+def issues(record: Dict) -> List[str]:
+    """What needs attention on a reachable host (empty = ready)."""
+    found = []
+    if record.get("reboot"):
+        found.append("reboot pending")
+    if "disk_free" in record and record["disk_free"] < HEALTH_MIN_DISK * 1024:
+        found.append(f"{record['disk_free'] / 1024:.1f} GB disk free")
+    if record.get("mem_total") and record.get("mem_free", 0) * 100 < HEALTH_MIN_MEM * record["mem_total"]:
+        found.append(f"{record['mem_free'] * 100 // record['mem_total']}% memory free")
+    if record.get("cpu", 0) > HEALTH_MAX_CPU:
+        found.append(f"CPU {record['cpu']}%")
+    return found
+
+
+def assess(record: Optional[Dict], ttl: int = HEALTH_TTL) -> str:
+    """"ready", "attention", "down", "stale" or "" (no snapshot)."""
+    if not record:
+        return ""
+    if record.get("age", 0) > ttl:
+        return "stale"
+    if "error" in record:
+        return "down"
+    return "attention" if issues(record) else "ready"
+
+
+def describe(record: Dict) -> str:
+    """Multi-line text for a PC card's tooltip."""
+    age = f"{_duration(record.get('age', 0))} ago"
+    if "error" in record:
+        state = "unreachable" if not record.get("reachable") else "failed"
+        return f"Health ({age}): {state}\n{record['error']}"
+    lines = [f"Health ({age})"]
+    if "uptime" in record:
+        lines.append(f"Up {_duration(record['uptime'])} · CPU {record.get('cpu', '?')}%")
+    if "mem_free" in record:
+        lines.append(f"Memory {record['mem_free'] / 1024:.1f} of {record.get('mem_total', 0) / 1024:.1f} GB free")
+    if "disk_free" in record:
+        lines.append(f"Disk {record['disk_free'] / 1024:.1f} GB free")
+    lines.append(f"User: {record.get('user') or 'nobody logged in'}")
+    lines += [f"⚠ {issue}" for issue in issues(record)]
+    return "\n".join(lines)
+
+
+def lab_summary(snapshot: Dict[str, Dict], ips: List[str]) -> str:
+    """One line for the lab page, e.g. "28 ready · 2 need attention · 1 down"."""
+    counts: Dict[str, int] = {}
+    for ip in ips:
+        state = assess(snapshot.get(ip)) or "no data"
+        counts[state] = counts.get(state, 0) + 1
+    labels = [("ready", "ready"), ("attention", "need attention"), ("down", "down"),
+              ("stale", "stale"), ("no data", "no data")]
+    parts = [f"{counts[key]} {label}" for key, label in labels if counts.get(key)]
+    ages = [snapshot[ip].get("age", 0) for ip in ips if ip in snapshot]
+    when = f" (newest {_duration(min(ages))} ago)" if ages else ""
+    return "Health" + when + ": " + " · ".join(parts)
+
+
+def summary_lines(records: Dict[str, Dict], results: Dict[str, adhoc.HostResult]) -> List[str]:
+    """Per-host table, then a PLAY RECAP block for the results page."""
+    lines = ["", "HEALTH " + "*" * 64,
+             f"{'host':<16} {'up':>8} {'cpu':>5} {'mem free':>9} {'disk free':>10}  reboot  user"]
+    for host, record in sorted(records.items()):
+        if "error" in record:
+            lines.append(f"{host:<16} {'unreachable' if not record['reachable'] else 'failed'}: {record['error']}")
+            continue
+        lines.append(
+            f"{host:<16} {_duration(record.get('uptime', 0)):>8} {record.get('cpu', 0):>4}% "
+            f"{record.get('mem_free', 0) / 1024:>7.1f}GB {record.get('disk_free', 0) / 1024:>8.1f}GB  "
+            f"{'yes' if record.get('reboot') else 'no':<6}  {record.get('user') or '-'}"
+        )
+    states = [assess(record) for record in records.values()]
+    lines.append(
+        f"{states.count('ready')} ready, {states.count('attention')} need attention, "
+        f"{states.count('down')} down"
+    )
+    return lines + adhoc.recap_lines(results)
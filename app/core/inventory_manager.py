@@ -1,10 +1,42 @@
 import json
 import os
 import ipaddress
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 from .config import INVENTORY_FILE, LABS
 
+# Actions whose packages become a lab's desired state in pull mode
+DESIRED_STATE_ACTIONS = ("install", "update", "remove")
+
+
+def read_pull_index(path: str = INVENTORY_FILE) -> Tuple[Dict[str, str], Dict[str, dict]]:
+    """
+    ({ip: lab}, {lab: desired state}) read straight from inventory.json, for
+    the pull-agent endpoint (core.state_server): no seeding, no migration,
+    no console output. Missing or unreadable file -> empty index.
+    """
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}, {}
+    if not isinstance(data, dict):
+        return {}, {}
+    new_format = isinstance(data.get("labs"), dict)
+    hosts: Dict[str, str] = {}
+    desired: Dict[str, dict] = {}
+    for lab_name, rec in (data["labs"] if new_format else data).items():
+        if new_format and isinstance(rec, dict):
+            pcs = rec.get("pcs", [])
+            if isinstance(rec.get("desired"), dict):
+                desired[lab_name] = rec["desired"]
+        else:
+            pcs = rec if isinstance(rec, list) else []
+        for pc in pcs:
+            if isinstance(pc, dict) and pc.get("ip"):
+                hosts.setdefault(pc["ip"], lab_name)
+    return hosts, desired
+
 
 class InventoryManager:
     """
@@ -277,3 +309,151 @@ class InventoryManager:
                 return True
 
         return False
+
+    # -----------------------------------------------------------------------
+    # Pull-mode desired state
+    #
+    # Stored per lab next to layout/pcs:
+    #   "desired": {
+    #     "windows": {"present": ["vlc", ...], "absent": ["skype", ...]},
+    #     "linux":   {"present": [...],        "absent": [...]}
+    #   }
+    # -----------------------------------------------------------------------
+    def find_pc(self, ip: str) -> Optional[tuple]:
+        """Return (lab_name, pc_dict) for an IP, or None. Does not log."""
+        if self._is_new_format():
+            for lab_name, rec in self.data["labs"].items():
+                for pc in (rec or {}).get("pcs", []) if isinstance(rec, dict) else []:
+                    if pc.get("ip") == ip:
+                        return lab_name, pc
+        else:
+            for lab_name, pcs in self.data.items():
+                for pc in pcs if isinstance(pcs, list) else []:
+                    if pc.get("ip") == ip:
+                        return lab_name, pc
+        return None
+
+    def set_pcs_os(self, detected: Dict[str, str]) -> int:
+        """Store detected OSes ({ip: os}) in one write so later runs don't have
+        to probe those hosts again. Returns how many changed."""
+        changed = 0
+        for ip, os_name in detected.items():
+            found = self.find_pc(ip)
+            if not found:
+                continue
+            _, pc = found
+            if pc.get("os") == os_name and pc.get("os_detected"):
+                continue
+            pc["os"] = os_name
+            pc["os_detected"] = True
+            changed += 1
+        if changed:
+            self._save(self.data)
+            print(f"[INVENTORY] Detected OS for {changed} PC(s)")
+        return changed
+
+    def set_pc_macs(self, macs: Dict[str, str]) -> int:
+        """Store MAC addresses (for Wake-on-LAN, core.power). Returns how many changed."""
+        changed = 0
+        for ip, mac in macs.items():
+            found = self.find_pc(ip)
+            if found and found[1].get("mac") != mac:
+                found[1]["mac"] = mac
+                changed += 1
+        if changed:
+            self._save(self.data)
+            print(f"[INVENTORY] Learnt {changed} MAC address(es)")
+        return changed
+
+    def get_lab_transport(self, lab_name: str) -> str:
+        """The lab's connection profile (core.transports), "" = hosts.ini as is."""
+        if self._is_new_format():
+            rec = self.data["labs"].get(lab_name)
+            if isinstance(rec, dict):
+                return rec.get("transport") or ""
+        return ""
+
+    def set_lab_transport(self, lab_name: str, transport: str) -> bool:
+        self._migrate_old_to_new_if_needed()
+        rec = self.data["labs"].get(lab_name)
+        if not isinstance(rec, dict):
+            return False
+        rec["transport"] = transport
+        self._save(self.data)
+        print(f"[INVENTORY] Transport for {lab_name}: {transport or 'hosts.ini'}")
+        return True
+
+    def get_lab_bandwidth(self, lab_name: str) -> Dict[str, Any]:
+        """{"lab": Mbit/s, "sections": {"<n>": Mbit/s}} (core.bandwidth), {} = unlimited."""
+        if self._is_new_format():
+            rec = self.data["labs"].get(lab_name)
+            if isinstance(rec, dict) and isinstance(rec.get("bandwidth"), dict):
+                return rec["bandwidth"]
+        return {}
+
+    def set_lab_bandwidth(self, lab_name: str, lab_mbit: float, sections: Dict[str, float]) -> bool:
+        self._migrate_old_to_new_if_needed()
+        rec = self.data["labs"].get(lab_name)
+        if not isinstance(rec, dict):
+            return False
+        rec["bandwidth"] = {"lab": lab_mbit, "sections": {str(k): v for k, v in sections.items() if v}}
+        self._save(self.data)
+        print(f"[INVENTORY] Bandwidth for {lab_name}: {lab_mbit or 'unlimited'} Mbit/s, "
+              f"{len(rec['bandwidth']['sections'])} section budget(s)")
+        return True
+
+    def get_maintenance_windows(self, lab_name: str) -> List[str]:
+        """The lab's maintenance windows (core.scheduler), e.g. "Mon-Fri 22:00-06:00"."""
+        if self._is_new_format():
+            rec = self.data["labs"].get(lab_name)
+            if isinstance(rec, dict) and isinstance(rec.get("maintenance"), list):
+                return rec["maintenance"]
+        return []
+
+    def set_maintenance_windows(self, lab_name: str, windows: List[str]) -> bool:
+        self._migrate_old_to_new_if_needed()
+        rec = self.data["labs"].get(lab_name)
+        if not isinstance(rec, dict):
+            return False
+        rec["maintenance"] = list(windows)
+        self._save(self.data)
+        print(f"[INVENTORY] Maintenance windows for {lab_name}: {', '.join(windows) or 'none'}")
+        return True
+
+    def get_desired_state(self, lab_name: str) -> Dict[str, Dict[str, List[str]]]:
+        if self._is_new_format():
+            rec = self.data["labs"].get(lab_name)
+            if isinstance(rec, dict) and isinstance(rec.get("desired"), dict):
+                return rec["desired"]
+        return {}
+
+    def record_desired_packages(self, lab_name: str, os_name: str, action: str, packages: List[str]) -> bool:
+        """install/update adds packages to 'present', remove moves them to 'absent'.
+        Any other action (stage, verify, ...) leaves the desired state alone."""
+        if action not in DESIRED_STATE_ACTIONS:
+            return False
+        self._migrate_old_to_new_if_needed()
+        rec = self.data["labs"].get(lab_name)
+        if not isinstance(rec, dict) or not packages:
+            return False
+
+        desired = rec.setdefault("desired", {})
+        state = desired.setdefault(os_name, {"present": [], "absent": []})
+        present, absent = state.setdefault("present", []), state.setdefault("absent", [])
+
+        for pkg in packages:
+            if action == "remove":
+                if pkg in present:
+                    present.remove(pkg)
+                if pkg not in absent:
+                    absent.append(pkg)
+            else:
+                if pkg in absent:
+                    absent.remove(pkg)
+                if pkg not in present:
+                    present.append(pkg)
+
+        self._save(self.data)
+        print(f"[INVENTORY] Desired state for {lab_name}/{os_name}: "
+              f"{len(present)} present, {len(absent)} absent")
+        return True
@@ -0,0 +1,636 @@
+"""
+Job building – turns a Software Manager payload into a runnable ansible job.
+
+Kept free of Qt so the same job definition can be executed by the GUI,
+by headless worker processes (core.distributed) and by anything else that
+needs to run "what the Software Manager would have run".
+"""
+
+import json
+import os
+import shutil
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import (
+    ASYNC_LONG_TASKS, ASYNC_POLL_INTERVAL, ASYNC_TIMEOUT, COLLECT_PARALLEL, CONNECT_TIMEOUT,
+    CONTENT_PARALLEL, FANOUT_DEGREE, FANOUT_PORT, FANOUT_SEEDS, FANOUT_TTL, REBOOT_STAGGER,
+    REBOOT_TIMEOUT, REBOOT_WAVE, STAGE_PARALLEL, TASK_TIMEOUT, USE_RUNBOOKS, WORKER_COUNT,
+)
+from .adhoc import ADHOC_ACTION, MODULES as ADHOC_MODULES
+from .capabilities import PROBED_ACTIONS, capability_host_vars
+from . import composite
+from .composite import COMPOSITE_ACTION, STEP_ACTIONS
+from .collect import COLLECT_ACTION, default_job_name, host_subdirs, slug
+from .content import CONTENT_ACTION, CONTENT_MOUNT
+from .fanout import plan_tree, wave_count
+from .staging import STAGE_ACTION, payload_hash, staged_hosts
+from .executors import ExecCommand, Executor
+from .runbook import get_runbook
+from . import bandwidth, prewarm, reboot, transports
+from .power import POWER_ACTION, adhoc_extra as power_extra, MODES as POWER_MODES
+from .health import HEALTH_ACTION, adhoc_extra as health_extra
+from .verify import VERIFY_ACTION, adhoc_extra as verify_extra
+from .transports import BENCH_SAMPLE, TRANSPORT_BENCH_ACTION
+
+
+# Playbook routing map — (os, action) -> playbook filename
+PLAYBOOK_MAP = {
+    ("windows", "install"): "playbooks/windows_install.yml",
+    ("windows", "remove"):  "playbooks/windows_remove.yml",
+    ("windows", "update"):  "playbooks/windows_update.yml",
+    ("linux",   "install"): "playbooks/linux_install.yml",
+    ("linux",   "remove"):  "playbooks/linux_remove.yml",
+    ("linux",   "update"):  "playbooks/linux_update.yml",
+    ("windows", "collect"): "playbooks/windows_collect.yml",
+    ("linux",   "collect"): "playbooks/linux_collect.yml",
+    ("windows", "sync"):    "playbooks/windows_sync.yml",
+    ("linux",   "sync"):    "playbooks/linux_sync.yml",
+    ("windows", "stage"):   "playbooks/windows_stage.yml",
+    ("linux",   "stage"):   "playbooks/linux_stage.yml",
+}
+
+# Peer-assisted variant of windows/stage (tree plan from core/fanout.py)
+FANOUT_PLAYBOOK = "playbooks/windows_stage_peer.yml"
+
+TMP_INVENTORY_NAME = "_sync_tmp_inventory.ini"
+
+
+class JobError(Exception):
+    pass
+
+
+def get_project_root() -> str:
+    if getattr(sys, "frozen", False):
+        exe_dir = os.path.dirname(sys.executable)
+        project_root = os.path.abspath(os.path.join(exe_dir, ".."))
+    else:
+        here = os.path.dirname(os.path.abspath(__file__))
+        project_root = os.path.abspath(os.path.join(here, "..", ".."))
+
+    ansible_dir = os.path.join(project_root, "ansible")
+    if not os.path.exists(ansible_dir):
+        print(f"[WARNING] ansible/ folder not found at: {project_root}")
+
+    return project_root
+
+
+def vault_pass_path() -> str:
+    return os.path.expanduser("~/.ansible_vault_pass")
+
+
+def deadline_env() -> Dict[str, str]:
+    """Per-task and connect deadlines, enforced by ansible for every host.
+    A deadline set to 0 is left out (no task deadline / ansible's default)."""
+    env = {}
+    if TASK_TIMEOUT:
+        env["ANSIBLE_TASK_TIMEOUT"] = str(TASK_TIMEOUT)
+    if CONNECT_TIMEOUT:
+        env["ANSIBLE_TIMEOUT"] = str(CONNECT_TIMEOUT)
+    return env
+
+
+@dataclass
+class Job:
+    os_name: str
+    action: str
+    targets: List[str]
+    playbook: str
+    extra: Dict[str, str] = field(default_factory=dict)
+    runbook: bool = False    # playbook is generated from RUNBOOKS[(os_name, action)]
+    forks: int = 0           # 0 = ansible.cfg / ansible default
+    host_vars: Dict[str, Dict[str, str]] = field(default_factory=dict)  # written into the inventory
+    steps: List[Dict] = field(default_factory=list)   # composite jobs: {action, playbook, runbook, extra}
+    transport: str = ""      # lab's connection profile (core.transports), "" = hosts.ini
+
+    @property
+    def group(self) -> str:
+        return "windows_clients" if self.os_name == "windows" else "linux_clients"
+
+    def extra_vars_str(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in self.extra.items())
+
+    def mounts(self, project_root: str) -> List[Tuple[str, str]]:
+        if self.action == "install" and self.os_name == "windows" and self.extra.get("file_name"):
+            return [(os.path.join(project_root, "software_repo"), "/app/software_repo")]
+        if self.action == CONTENT_ACTION:
+            return [(self.extra["content_src"], CONTENT_MOUNT)]
+        return []
+
+    def vault_pass(self) -> Optional[str]:
+        path = vault_pass_path()
+        # Linux needs the sudo password, WinRM / PSRP the Windows login
+        benched = self.extra.get("bench_transports", "").split(",")
+        needs = self.os_name == "linux" or any(
+            transports.needs_password(t) for t in [self.transport, *benched]
+        )
+        if needs and os.path.exists(path):
+            return path
+        return None
+
+    def inventory_vars(self) -> Dict[str, str]:
+        """Group vars rendered over hosts.ini's in the job inventory."""
+        return transports.profile_vars(self.os_name, self.transport)
+
+    @property
+    def adhoc(self) -> bool:
+        return self.action in (ADHOC_ACTION, POWER_ACTION, HEALTH_ACTION, VERIFY_ACTION)
+
+    def command(self, executor: Executor, project_root: str, inventory: str) -> ExecCommand:
+        """inventory is relative to the ansible/ dir, e.g. 'inventory/_sync_tmp_inventory.ini'."""
+        # Reuse the SSH masters opened while the PCs were selected
+        warm_mounts, warm_env = prewarm.ansible_settings(executor)
+        ansible_env = {**self.ansible_env(), **warm_env}
+        if self.adhoc:
+            argv = [
+                "ansible", self.group,
+                "-i", inventory,
+                "-m", self.extra.get("module") or ADHOC_MODULES[self.os_name],
+                "-a", self.extra["command"],
+                "-o",
+            ]
+            if self.extra.get("become") == "true":
+                argv.append("--become")
+            return executor.build(
+                argv,
+                project_root,
+                vault_pass=self.vault_pass(),
+                mounts=warm_mounts,
+                ansible_env=ansible_env,
+            )
+        if self.runbook:
+            get_runbook(self.os_name, self.action).write(project_root)
+        if self.steps:
+            composite.write(project_root, self.os_name, self.steps)
+        if self.action == TRANSPORT_BENCH_ACTION:
+            transports.write_bench(project_root, self.extra["bench_transports"].split(","))
+        extra = dict(self.extra)
+        if self.action == CONTENT_ACTION:
+            extra["content_src"] = executor.path_for(extra["content_src"], CONTENT_MOUNT)
+        return executor.build(
+            [
+                "ansible-playbook",
+                "-i", inventory,
+                self.playbook,
+                # JSON so values with spaces / backslashes (paths, installer args) survive
+                "-e", json.dumps(extra),
+            ],
+            project_root,
+            vault_pass=self.vault_pass(),
+            mounts=self.mounts(project_root) + warm_mounts,
+            ansible_env=ansible_env,
+        )
+
+    def ansible_env(self) -> Dict[str, str]:
+        env = deadline_env()
+        if self.forks:
+            env["ANSIBLE_FORKS"] = str(self.forks)
+        return env
+
+    def with_targets(self, targets: List[str]) -> "Job":
+        host_vars = {ip: dict(v) for ip, v in self.host_vars.items() if ip in targets}
+        return Job(self.os_name, self.action, list(targets), self.playbook,
+                   dict(self.extra), self.runbook, self.forks, host_vars, list(self.steps),
+                   self.transport)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        return cls(
+            os_name=data["os_name"],
+            action=data["action"],
+            targets=list(data.get("targets", [])),
+            playbook=data["playbook"],
+            extra=dict(data.get("extra", {})),
+            runbook=bool(data.get("runbook", False)),
+            forks=int(data.get("forks", 0)),
+            host_vars={ip: dict(v) for ip, v in data.get("host_vars", {}).items()},
+            steps=list(data.get("steps", [])),
+            transport=data.get("transport", ""),
+        )
+
+
+def build_job(payload: dict, os_name: str, action: str, targets: List[str],
+              project_root: Optional[str] = None) -> Job:
+    """
+    Validate a form payload and resolve playbook + extra vars.
+    Raises JobError with a user-facing message.
+    """
+    project_root = project_root or get_project_root()
+
+    # ── Ad-hoc command: no playbook at all ────────────────────────────────
+    if action == ADHOC_ACTION:
+        cmd = payload.get("command", "").strip()
+        if not cmd:
+            raise JobError("Enter a command to run.")
+        extra = {"command": cmd}
+        if os_name == "linux" and payload.get("become", False):
+            extra["become"] = "true"
+        return Job(os_name=os_name, action=action, targets=list(targets),
+                   playbook="", extra=extra)
+
+    # ── Health snapshot: one short command per host, no fact gathering ────
+    if action == HEALTH_ACTION:
+        return Job(os_name=os_name, action=action, targets=list(targets),
+                   playbook="", extra=health_extra(os_name))
+
+    # ── Verify: one package query per host instead of a playbook dry run ─
+    if action == VERIFY_ACTION:
+        try:
+            extra = verify_extra(os_name, payload)
+        except ValueError as e:
+            raise JobError(str(e))
+        return Job(os_name=os_name, action=action, targets=list(targets),
+                   playbook="", extra=extra)
+
+    # ── Restart / shut down: one ad-hoc module run, parallel across hosts ─
+    if action == POWER_ACTION:
+        mode = payload.get("mode", "")
+        if mode not in POWER_MODES:
+            raise JobError("Choose whether to restart or shut down the PCs.")
+        return Job(os_name=os_name, action=action, targets=list(targets),
+                   playbook="", extra=power_extra(os_name, mode))
+
+    # ── Transport benchmark: same tasks over every transport that answers ─
+    if action == TRANSPORT_BENCH_ACTION:
+        if os_name != "windows":
+            raise JobError("Transport profiles only apply to Windows PCs.")
+        sample = list(targets)[: max(1, int(payload.get("sample") or BENCH_SAMPLE))]
+        names = transports.reachable_transports(sample)
+        if not names:
+            raise JobError("None of the sample PCs answers on the SSH or WinRM ports.")
+        extra = {
+            "bench_transports": ",".join(names),
+            "bench_apply": "true" if payload.get("apply", False) else "false",
+        }
+        return Job(os_name=os_name, action=action, targets=sample,
+                   playbook=transports.bench_playbook_name(names), extra=extra)
+
+    # ── Composite: each step is built as its own job, then chained ──────
+    if action == COMPOSITE_ACTION:
+        steps = payload.get("steps") or []
+        if not steps:
+            raise JobError("Add at least one step.")
+        step_jobs: List[Job] = []
+        for i, step in enumerate(steps, 1):
+            step_action = step.get("action", "")
+            if step_action not in STEP_ACTIONS:
+                raise JobError(f"Step {i}: '{step_action}' can't be part of a multi-step job.")
+            pkgs = step.get("packages", "").strip()
+            sub = {"choco_package": pkgs} if os_name == "windows" else {"packages": pkgs}
+            sub["reboot"] = payload.get("reboot", False)
+            try:
+                step_jobs.append(build_job(sub, os_name, step_action, targets, project_root))
+            except JobError as e:
+                raise JobError(f"Step {i} ({step_action}): {e}")
+        steps = [
+            {"action": j.action, "playbook": j.playbook, "runbook": j.runbook, "extra": j.extra}
+            for j in step_jobs
+        ]
+        host_vars: Dict[str, Dict[str, str]] = {}
+        for j in step_jobs:
+            for ip, hv in j.host_vars.items():
+                host_vars.setdefault(ip, {}).update(hv)
+        return Job(os_name=os_name, action=action, targets=list(targets),
+                   playbook=composite.playbook_name(steps), host_vars=host_vars, steps=steps)
+
+    target_host = "windows_clients" if os_name == "windows" else "linux_clients"
+    extra: Dict[str, str] = {
+        "target_host": target_host,
+    }
+    host_vars: Dict[str, Dict[str, str]] = {}
+
+    # ── Windows Install ───────────────────────────────────────────────────
+    if action == "install" and os_name == "windows":
+        choco_pkg = payload.get("choco_package", "").strip()
+        file_path = payload.get("file", "").strip()
+
+        if not choco_pkg and not file_path:
+            raise JobError("Enter a Chocolatey package name or select a local installer file.")
+
+        if choco_pkg:
+            extra["choco_package"] = choco_pkg
+        else:
+            extra["file_name"] = os.path.basename(file_path)
+            repo_file = ensure_in_repo(file_path, os.path.join(project_root, "software_repo"))
+            if payload.get("args", "").strip():
+                extra["custom_install_args"] = payload["args"].strip()
+            # Hosts that already hold this exact payload skip the transfer
+            if os.path.exists(repo_file):
+                extra["payload_sha"] = payload_hash(repo_file)
+                for ip in set(staged_hosts(project_root, extra["payload_sha"])) & set(targets):
+                    host_vars[ip] = {"staged": "true"}
+
+    # ── Windows Remove ────────────────────────────────────────────────────
+    elif action == "remove" and os_name == "windows":
+        choco_pkg = payload.get("choco_package", "").strip()
+        app_name  = payload.get("app_name", "").strip()
+
+        if not choco_pkg and not app_name:
+            raise JobError("Enter a Chocolatey package name or an application display name.")
+
+        if choco_pkg:
+            extra["choco_package"] = choco_pkg
+        else:
+            extra["app_name"] = app_name
+
+    # ── Windows Update ────────────────────────────────────────────────────
+    elif action == "update" and os_name == "windows":
+        choco_pkg = payload.get("choco_package", "").strip()
+        if not choco_pkg:
+            raise JobError("Enter a Chocolatey package name or tick 'Upgrade ALL'.")
+        extra["choco_package"] = choco_pkg
+
+    # ── Linux Install ─────────────────────────────────────────────────────
+    elif action == "install" and os_name == "linux":
+        pkgs = payload.get("packages", "").strip()
+        if not pkgs:
+            raise JobError("No packages specified.")
+        extra["package_name"] = pkgs
+
+    # ── Linux Remove ──────────────────────────────────────────────────────
+    elif action == "remove" and os_name == "linux":
+        pkgs = payload.get("packages", "").strip()
+        if not pkgs:
+            raise JobError("No packages specified.")
+        extra["package_name"] = pkgs
+        extra["purge"]        = "true" if payload.get("purge", False) else "false"
+        extra["autoremove"]   = "true" if payload.get("autoremove", True) else "false"
+
+    # ── Linux Update ──────────────────────────────────────────────────────
+    elif action == "update" and os_name == "linux":
+        dist_upgrade = payload.get("dist_upgrade", False)
+        pkgs         = payload.get("packages", "").strip()
+        extra["dist_upgrade"] = "true" if dist_upgrade else "false"
+        if pkgs and not dist_upgrade:
+            extra["package_name"] = pkgs
+
+    # ── Collect files ─────────────────────────────────────────────────────
+    elif action == COLLECT_ACTION:
+        path = payload.get("path", "").strip()
+        if not path:
+            raise JobError("Enter a path or glob to collect.")
+        extra["collect_path"]     = path
+        extra["collect_job"]      = slug(payload.get("name", "").strip() or default_job_name(path))
+        extra["collect_parallel"] = str(payload.get("parallel") or COLLECT_PARALLEL)
+        if os_name == "linux":
+            extra["collect_become"] = "true" if payload.get("become", False) else "false"
+
+    # ── Content sync ──────────────────────────────────────────────────────
+    elif action == CONTENT_ACTION:
+        src  = payload.get("source", "").strip()
+        dest = payload.get("dest", "").strip()
+        if not src or not os.path.isdir(src):
+            raise JobError("Select a source folder on this controller.")
+        if not dest:
+            raise JobError("Enter the destination path on the PCs.")
+        # "/" or "C:\" would strip to "" or "C:" (the current directory on C),
+        # and a mirror run would prune everything it does not find in the source
+        dest = dest.rstrip("/\\")
+        if not dest or (len(dest) == 2 and dest[1] == ":"):
+            raise JobError("Sync into a folder, not a drive or filesystem root.")
+        extra["content_src"]      = os.path.abspath(src).rstrip("/\\")
+        extra["content_dest"]     = dest
+        extra["content_delete"]   = "true" if payload.get("mirror", False) else "false"
+        extra["content_parallel"] = str(payload.get("parallel") or CONTENT_PARALLEL)
+
+    # ── Pre-stage payloads ────────────────────────────────────────────────
+    elif action == STAGE_ACTION and os_name == "windows":
+        file_path = payload.get("file", "").strip()
+        if not file_path:
+            raise JobError("Select a local installer file to stage.")
+        extra["file_name"] = os.path.basename(file_path)
+        repo_file = ensure_in_repo(file_path, os.path.join(project_root, "software_repo"))
+        if not os.path.exists(repo_file):
+            raise JobError(f"Installer not found: {file_path}")
+        extra["payload_sha"]    = payload_hash(repo_file)
+        extra["stage_parallel"] = str(payload.get("parallel") or STAGE_PARALLEL)
+        if payload.get("peer", False):
+            # fanout_waves and the per-host tree are filled in by the controller
+            extra["fanout"]      = "true"
+            extra["fanout_port"] = str(FANOUT_PORT)
+            extra["fanout_ttl"]  = str(FANOUT_TTL)
+
+    elif action == STAGE_ACTION and os_name == "linux":
+        pkgs = payload.get("packages", "").strip()
+        if not pkgs:
+            raise JobError("No packages specified.")
+        extra["package_name"]   = pkgs
+        extra["stage_parallel"] = str(payload.get("parallel") or STAGE_PARALLEL)
+
+    # ── Known host capabilities: skip probing / bootstrap where fresh ─────
+    if action in PROBED_ACTIONS:
+        for ip, caps in capability_host_vars(project_root, targets).items():
+            host_vars.setdefault(ip, {}).update(caps)
+
+    # ── Long-running steps: fire-and-poll instead of holding a fork ─────────
+    long_running = (
+        (os_name == "windows" and action == "install" and "file_name" in extra)
+        or (os_name == "linux" and action == "update" and extra.get("dist_upgrade") == "true")
+    )
+    if ASYNC_LONG_TASKS and long_running:
+        extra["async_mode"]    = "true"
+        extra["async_timeout"] = str(payload.get("async_timeout") or ASYNC_TIMEOUT)
+        extra["async_poll"]    = str(payload.get("async_poll") or ASYNC_POLL_INTERVAL)
+
+    # ── Pending reboots: only when the form allows them (core.reboot) ─────
+    if action in STEP_ACTIONS:
+        extra["allow_reboot"] = "true" if payload.get("reboot", False) else "false"
+        if extra["allow_reboot"] == "true":
+            extra["reboot_timeout"] = str(payload.get("reboot_timeout") or REBOOT_TIMEOUT)
+
+    # ── Resolve playbook (runbook first, hand-written playbook otherwise) ─
+    runbook = get_runbook(os_name, action) if USE_RUNBOOKS else None
+    if runbook:
+        return Job(os_name=os_name, action=action, targets=list(targets),
+                   playbook=runbook.playbook_name(), extra=extra, runbook=True,
+                   host_vars=host_vars)
+
+    playbook = PLAYBOOK_MAP.get((os_name, action))
+    if extra.get("fanout") == "true":
+        playbook = FANOUT_PLAYBOOK
+    if not playbook:
+        raise JobError(f"No playbook defined for {os_name} / {action}.")
+
+    return Job(os_name=os_name, action=action, targets=list(targets),
+               playbook=playbook, extra=extra, host_vars=host_vars)
+
+
+def prepare_jobs(payloads: List[dict], lab: Optional[str], inventory_manager=None,
+                 project_root: Optional[str] = None, default_os: str = "windows",
+                 default_action: str = "install",
+                 default_targets: Sequence[str] = ()) -> List[Job]:
+    """
+    One job per payload (one payload per OS), plus everything that depends on
+    the lab: per-host collect folders, the lab's transport profile, the peer
+    fan-out tree, its bandwidth budgets and the reboot waves. Shared by the
+    GUI and the headless scheduler.
+    Raises JobError with a user-facing message.
+    """
+    project_root = project_root or get_project_root()
+    jobs: List[Job] = []
+    for payload in payloads:
+        os_name = payload.get("os", default_os)
+        action  = payload.get("action", default_action)
+        targets = payload.get("targets", list(default_targets))
+        try:
+            jobs.append(build_job(payload, os_name, action, targets, project_root))
+        except JobError as e:
+            prefix = f"{os_name.title()}: " if len(payloads) > 1 else ""
+            raise JobError(f"{prefix}{e}")
+
+    # ── Collect: each host's archive goes to its lab/section/row folder ──
+    for job in jobs:
+        if job.action == COLLECT_ACTION:
+            for ip, subdir in host_subdirs(inventory_manager, job.targets).items():
+                job.host_vars.setdefault(ip, {})["collect_subdir"] = subdir
+
+    # ── Lab transport profile: rendered into the job inventory ───────────
+    transport = inventory_manager.get_lab_transport(lab) if inventory_manager and lab else ""
+    for job in jobs:
+        if job.os_name == "windows" and job.action != TRANSPORT_BENCH_ACTION:
+            job.transport = transport
+
+    # ── Peer-assisted staging: fan-out tree from the lab layout ──────────
+    for job in jobs:
+        if job.extra.get("fanout") == "true":
+            pcs = []
+            for ip in job.targets:
+                found = inventory_manager.find_pc(ip) if inventory_manager else None
+                pcs.append(found[1] if found else {"ip": ip})
+            plan = plan_tree(pcs, FANOUT_SEEDS, FANOUT_DEGREE)
+            for ip, node in plan.items():
+                job.host_vars.setdefault(ip, {}).update(node.host_vars())
+            job.extra["fanout_waves"] = str(wave_count(plan))
+
+    # ── Bandwidth budgets: paced downloads instead of win_copy ───────────
+    for job in jobs:
+        bandwidth.apply_budgets(job, lab, inventory_manager)
+
+    # ── Coordinated reboots: staggered waves across the lab's sections ───
+    for job in jobs:
+        if allows_reboot(job):
+            pcs = []
+            for ip in job.targets:
+                found = inventory_manager.find_pc(ip) if inventory_manager else None
+                pcs.append(found[1] if found else {"ip": ip})
+            plan = reboot.plan_waves(pcs, REBOOT_WAVE)
+            for ip, hv in reboot.host_vars(plan, REBOOT_STAGGER).items():
+                job.host_vars.setdefault(ip, {}).update(hv)
+            job.extra["reboot_waves"] = str(reboot.wave_count(plan))
+    return jobs
+
+
+def allows_reboot(job: Job) -> bool:
+    """True when the job (or any step of a composite job) may reboot hosts."""
+    extras = [job.extra] + [step.get("extra", {}) for step in job.steps]
+    return any(extra.get("allow_reboot") == "true" for extra in extras)
+
+
+def plan_workers(jobs: List[Job]) -> Tuple[int, bool]:
+    """(worker processes, sharded) for a batch of jobs."""
+    total = sum(len(job.targets) for job in jobs)
+    n_workers = min(WORKER_COUNT, total)
+    if any(job.extra.get("fanout") == "true" for job in jobs):
+        n_workers = 1   # the tree spans the whole lab, one play must run it
+    return max(n_workers, len(jobs)), n_workers > 1 or len(jobs) > 1
+
+
+def write_temp_inventory(
+    project_root: str,
+    targets: List[str],
+    group: str,
+    filename: str = TMP_INVENTORY_NAME,
+    host_vars: Optional[Dict[str, Dict[str, str]]] = None,
+    group_vars: Optional[Dict[str, str]] = None,
+) -> Optional[str]:
+    """
+    Job inventory: the targets (with their host vars) under `group`, plus the
+    group's vars from hosts.ini with `group_vars` (a lab's transport profile)
+    rendered over them.
+    """
+
+    ansible_dir = os.path.join(project_root, "ansible")
+    real_inv    = os.path.join(ansible_dir, "inventory", "hosts.ini")
+    inv_dir     = os.path.join(ansible_dir, "inventory")
+    os.makedirs(inv_dir, exist_ok=True)
+    tmp_path    = os.path.join(inv_dir, filename)
+
+    group_vars_lines: List[str] = []
+    if os.path.exists(real_inv):
+        with open(real_inv, "r") as f:
+            in_vars = False
+            for line in f:
+                stripped = line.strip()
+                if stripped == f"[{group}:vars]":
+                    in_vars = True
+                    group_vars_lines.append(line)
+                    continue
+                if in_vars:
+                    if stripped.startswith("["):
+                        in_vars = False
+                    else:
+                        group_vars_lines.append(line)
+    else:
+        print(f"[JobBuilder] WARNING: hosts.ini not found at {real_inv}")
+
+    if group_vars:
+        if not group_vars_lines:
+            group_vars_lines.append(f"[{group}:vars]\n")
+        group_vars_lines = [
+            line for line in group_vars_lines
+            if line.split("=", 1)[0].strip() not in group_vars
+        ]
+        group_vars_lines += [f"{k}={v}\n" for k, v in group_vars.items()]
+
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(f"[{group}]\n")
+            for ip in targets:
+                hv = " ".join(f'{k}="{v}"' for k, v in (host_vars or {}).get(ip, {}).items())
+                f.write(f"{ip} {hv}\n" if hv else f"{ip}\n")
+            f.write("\n")
+            for line in group_vars_lines:
+                f.write(line)
+        return tmp_path
+    except OSError as e:
+        print(f"[JobBuilder] Failed to write temp inventory: {e}")
+        return None
+
+
+def read_group_vars(project_root: str, group: str) -> Dict[str, str]:
+    """The ``[<group>:vars]`` section of hosts.ini as a dict."""
+    real_inv = os.path.join(project_root, "ansible", "inventory", "hosts.ini")
+    group_vars: Dict[str, str] = {}
+    try:
+        with open(real_inv, "r") as f:
+            in_vars = False
+            for line in f:
+                stripped = line.strip()
+                if stripped.startswith("["):
+                    in_vars = stripped == f"[{group}:vars]"
+                elif in_vars and "=" in stripped and not stripped.startswith(("#", ";")):
+                    key, value = stripped.split("=", 1)
+                    group_vars[key.strip()] = value.strip()
+    except OSError:
+        pass
+    return group_vars
+
+
+def inventory_rel_path(filename: str = TMP_INVENTORY_NAME) -> str:
+    """Inventory path as seen from the ansible/ dir (same for every executor)."""
+    return f"inventory/{filename}"
+
+
+def ensure_in_repo(src_path: str, repo_dir: str) -> str:
+    os.makedirs(repo_dir, exist_ok=True)
+    dst = os.path.join(repo_dir, os.path.basename(src_path))
+    if not os.path.exists(dst):
+        try:
+            shutil.copy2(src_path, dst)
+        except OSError as e:
+            print(f"[JobBuilder] Could not copy installer to repo: {e}")
+    return dst
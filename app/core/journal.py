@@ -0,0 +1,264 @@
+"""
+Detached jobs – runs that outlive the GUI session that started them.
+
+With SYNC_DETACHED on, SoftwareController does not run ansible itself: it
+writes a job spec and starts a background runner (``main.py --run-job <id>``)
+in its own session. The runner drives the same ShardRunner as a sharded run
+and appends every output line to a per-job journal:
+
+    data/jobs/<id>/spec.json     jobs, worker count, executor, deadline, meta
+    data/jobs/<id>/output.log    merged ansible output, append-only
+    data/jobs/<id>/status.json   running / done, runner pid, heartbeat, result
+    data/jobs/<id>/seen.json     how far the GUI has read output.log
+    data/jobs/<id>/cancel        written by the GUI – the runner stops with
+                                 the policy it contains (no signals, so this
+                                 also works on a Windows controller)
+    data/jobs/<id>/runner.log    the runner's own stderr
+
+The GUI follows output.log with a JournalTailWorker (core.ansible_worker).
+Closing or crashing the GUI leaves the run untouched; on the next start
+main.py lists the journals and reattaches to a running (or finished but
+unread) job, replaying its output so the recap and results pages work as if
+the session had never ended.
+
+A runner whose heartbeat is older than STALE_AFTER while its status still
+says running died with the controller machine; the job shows as "lost".
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .config import JOURNAL_KEEP
+from .job_builder import Job, get_project_root
+
+JOBS_DIR = os.path.join("data", "jobs")
+HEARTBEAT = 2.0      # seconds between runner heartbeats / cancel checks
+STALE_AFTER = 20.0   # heartbeat age after which a running job counts as lost
+
+if os.name == "nt":
+    DETACH = {"creationflags": getattr(subprocess, "DETACHED_PROCESS", 0)
+                               | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)}
+else:
+    DETACH = {"start_new_session": True}
+
+
+def job_dir(job_id: str) -> str:
+    return os.path.join(get_project_root(), JOBS_DIR, job_id)
+
+
+def _path(job_id: str, name: str) -> str:
+    return os.path.join(job_dir(job_id), name)
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _write_json(path: str, data: Dict):
+    # Write-then-rename: a reader never sees a half-written status
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, default=str)
+    os.replace(tmp, path)
+
+
+@dataclass
+class JobRecord:
+    job_id: str
+    meta: Dict = field(default_factory=dict)
+    status: Dict = field(default_factory=dict)
+
+    @property
+    def state(self) -> str:
+        """"running", "done" or "lost"."""
+        if self.status.get("state") == "done":
+            return "done"
+        heartbeat = self.status.get("ts") or self.meta.get("started") or 0
+        return "lost" if time.time() - heartbeat > STALE_AFTER else "running"
+
+    @property
+    def seen(self) -> int:
+        return int((_read_json(_path(self.job_id, "seen.json")) or {}).get("offset", 0))
+
+    @property
+    def unseen(self) -> bool:
+        """Output the GUI has not shown yet (the session ended mid-run)."""
+        try:
+            return os.path.getsize(_path(self.job_id, "output.log")) > self.seen
+        except OSError:
+            return False
+
+    def describe(self) -> str:
+        payloads = self.meta.get("payloads") or [{}]
+        hosts = sum(len(p.get("targets") or []) for p in payloads)
+        action = payloads[0].get("action", "?")
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(self.meta.get("started", 0)))
+        return f"{action} on {hosts} host(s) in {self.meta.get('lab') or '?'}, started {started}"
+
+
+# =============================================================================
+# GUI side
+# =============================================================================
+def start(jobs: List[Job], workers: int, executor_name: Optional[str],
+          deadline: int, meta: Dict) -> str:
+    """Write the job spec, start its detached runner and return the job id."""
+    from .distributed import entry_command
+
+    job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    os.makedirs(job_dir(job_id))
+    meta = dict(meta, started=time.time())
+    _write_json(_path(job_id, "spec.json"), {
+        "jobs": [job.to_dict() for job in jobs],
+        "workers": workers,
+        "executor": executor_name,
+        "deadline": deadline,
+        "meta": meta,
+    })
+    _write_json(_path(job_id, "status.json"), {"state": "starting", "ts": time.time()})
+    open(_path(job_id, "output.log"), "a").close()
+    with open(_path(job_id, "runner.log"), "w") as err:
+        subprocess.Popen(
+            entry_command("--run-job", job_id),
+            stdin=subprocess.DEVNULL,
+            stdout=err,
+            stderr=subprocess.STDOUT,
+            close_fds=True,
+            **DETACH,
+        )
+    prune()
+    return job_id
+
+
+def load(job_id: str) -> Optional[JobRecord]:
+    spec = _read_json(_path(job_id, "spec.json"))
+    if spec is None:
+        return None
+    status = _read_json(_path(job_id, "status.json")) or {}
+    return JobRecord(job_id, spec.get("meta") or {}, status)
+
+
+def load_jobs(job_id: str) -> List[Job]:
+    spec = _read_json(_path(job_id, "spec.json")) or {}
+    return [Job.from_dict(d) for d in spec.get("jobs", [])]
+
+
+def list_jobs() -> List[JobRecord]:
+    """Every journalled job, newest first."""
+    root = os.path.join(get_project_root(), JOBS_DIR)
+    try:
+        names = sorted(os.listdir(root), reverse=True)
+    except OSError:
+        return []
+    return [r for r in (load(name) for name in names) if r is not None]
+
+
+def read_from(job_id: str, offset: int) -> Tuple[List[str], int]:
+    """Complete lines of output.log after byte `offset`, and the new offset."""
+    try:
+        with open(_path(job_id, "output.log"), "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+    end = data.rfind(b"\n") + 1   # a partly written last line waits for the next read
+    if not end:
+        return [], offset
+    text = data[:end].decode("utf-8", errors="replace")
+    return text.split("\n")[:-1], offset + end
+
+
+def mark_seen(job_id: str, offset: int):
+    try:
+        _write_json(_path(job_id, "seen.json"), {"offset": offset})
+    except OSError:
+        pass
+
+
+def request_cancel(job_id: str, policy: str):
+    try:
+        with open(_path(job_id, "cancel"), "w") as f:
+            f.write(policy)
+    except OSError as e:
+        print(f"[JOBS] Could not cancel {job_id}: {e}")
+
+
+def prune(keep: int = JOURNAL_KEEP):
+    """Delete the oldest finished journals beyond `keep`."""
+    done = [r for r in list_jobs() if r.state != "running"]
+    for record in done[keep:]:
+        shutil.rmtree(job_dir(record.job_id), ignore_errors=True)
+
+
+# =============================================================================
+# Runner side
+# =============================================================================
+def run_journal_job(job_id: str) -> int:
+    """Entry point for ``main.py --run-job <id>``. Returns the process exit code."""
+    from .distributed import ShardRunner
+
+    spec = _read_json(_path(job_id, "spec.json"))
+    if spec is None:
+        print(f"[JOBS] No spec for job {job_id}")
+        return 2
+    runner = ShardRunner(
+        [Job.from_dict(d) for d in spec["jobs"]], spec.get("workers", 1),
+        spec.get("executor"), spec.get("deadline", 0),
+    )
+
+    out = open(_path(job_id, "output.log"), "a", encoding="utf-8", newline="\n")
+    lock = threading.Lock()
+
+    def emit(line: str):
+        with lock:
+            out.write(line + "\n")
+            out.flush()
+
+    status = {"state": "running", "pid": os.getpid(), "ts": time.time()}
+    _write_json(_path(job_id, "status.json"), status)
+
+    # Heartbeat, and pick up cancel requests ("finish" may escalate to "abort")
+    stop = threading.Event()
+
+    def watch():
+        applied = None
+        while not stop.wait(HEARTBEAT):
+            status["ts"] = time.time()
+            _write_json(_path(job_id, "status.json"), status)
+            try:
+                with open(_path(job_id, "cancel"), "r") as f:
+                    policy = f.read().strip() or "finish"
+            except OSError:
+                continue
+            if policy != applied and applied != "abort":
+                applied = policy
+                runner.cancel(policy)
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        ok = runner.run(emit)
+    except Exception as e:
+        emit(f"[ERROR] {e}")
+        ok = False
+    finally:
+        stop.set()
+        watcher.join()
+        out.close()
+    status.update(
+        state="done", ts=time.time(), ok=ok,
+        timed_out=runner.timed_out, cancelled=runner.cancelled,
+    )
+    _write_json(_path(job_id, "status.json"), status)
+    return 0 if ok else 1
@@ -0,0 +1,75 @@
+"""
+OS detection for mixed selections.
+
+Both client groups are managed over SSH, and the SSH identification banner
+already says which side a host is on ("SSH-2.0-OpenSSH_for_Windows_8.1" vs.
+"SSH-2.0-OpenSSH_8.9p1 Ubuntu-3"). Reading it costs one TCP round trip and
+needs no credentials, so a selection can be split before any playbook runs.
+Detected values are written back to the inventory (``os_detected``) and
+those hosts are never probed again.
+
+Only actions that run OS-specific tooling probe (see PROBE_ACTIONS); the
+others group a mixed selection by the OS already in the inventory.
+"""
+
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+BANNER_PORT = 22
+BANNER_TIMEOUT = 1.5   # seconds
+
+# Package / file actions, where running the wrong OS's playbook would fail
+PROBE_ACTIONS = ("install", "remove", "update", "stage", "sync", "composite", "transports")
+
+
+def detect_os(ip: str, port: int = BANNER_PORT, timeout: float = BANNER_TIMEOUT) -> Optional[str]:
+    """'windows' / 'linux' from the SSH banner, None if the host did not answer."""
+    try:
+        with socket.create_connection((ip, port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            banner = sock.recv(256).decode("ascii", errors="replace")
+    except OSError:
+        return None
+    if not banner.startswith("SSH-"):
+        return None
+    return "windows" if "windows" in banner.lower() else "linux"
+
+
+def undetected(inventory_manager, targets: Sequence[str]) -> List[str]:
+    """Targets whose OS has not been detected yet (the ones worth probing)."""
+    todo = []
+    for ip in targets:
+        found = inventory_manager.find_pc(ip) if inventory_manager else None
+        pc = found[1] if found else {}
+        if not (pc.get("os_detected") and pc.get("os")):
+            todo.append(ip)
+    return todo
+
+
+def detect_many(ips: Sequence[str]) -> Dict[str, Optional[str]]:
+    """detect_os() for every host in parallel. Blocks for up to BANNER_TIMEOUT
+    per round, so callers in the GUI run it off the main thread."""
+    if not ips:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(32, len(ips))) as pool:
+        return dict(zip(ips, pool.map(detect_os, ips)))
+
+
+def classify_targets(inventory_manager, targets: Sequence[str], default: str,
+                     detected: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, List[str]]:
+    """
+    Group targets by OS: a freshly `detected` OS (from detect_many()) wins
+    and is saved to the inventory in one write, then the stored OS, then
+    `default`. Keeps the selection order inside each group. No network I/O.
+    """
+    detected = {ip: os_name for ip, os_name in (detected or {}).items() if os_name}
+    if detected and inventory_manager:
+        inventory_manager.set_pcs_os(detected)
+
+    groups: Dict[str, List[str]] = {}
+    for ip in targets:
+        found = inventory_manager.find_pc(ip) if inventory_manager else None
+        os_name = detected.get(ip) or (found[1].get("os") if found else None) or default
+        groups.setdefault(os_name, []).append(ip)
+    return groups
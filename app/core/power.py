@@ -0,0 +1,256 @@
+"""
+Power management – wake a lab before a rollout, restart or shut it down after.
+
+Wake-on-LAN
+    send_wol() sends each PC's magic packet (6 x 0xFF, then its MAC 16 times)
+    WOL_REPEAT times over UDP, in batches of WOL_BATCH PCs WOL_STAGGER seconds
+    apart: UDP may drop a packet, and a whole lab powering up at the same
+    instant trips breakers.  MACs come from the inventory (``pc["mac"]``),
+    learnt from the controller's ARP cache whenever a status check finds the
+    PC online (arp_macs()).  wake() then waits for every woken PC's
+    management port, so only PCs that can actually take a job count as up.
+
+Restart / shut down
+    The ``power`` action is an ad-hoc ansible run (see core.adhoc), parallel
+    across the selection: restart uses win_reboot / reboot, which wait until
+    each PC is back; shut down returns before the PC goes down so ansible
+    does not report it unreachable.
+
+For testing without real PCs, ``main.py --wol-sink [port]`` listens for
+magic packets and prints the MACs it receives; point SYNC_WOL_BROADCAST at
+127.0.0.1 and SYNC_WOL_PORT at the sink.
+"""
+
+import os
+import re
+import socket
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .config import (
+    REBOOT_TIMEOUT, WOL_BATCH, WOL_BROADCAST, WOL_PORT, WOL_REPEAT, WOL_STAGGER, WOL_TIMEOUT,
+)
+from .transports import TRANSPORTS
+
+POWER_ACTION = "power"
+MODES = ("restart", "shutdown")
+
+_PROBE_TIMEOUT = 1.0   # seconds per management-port check
+_POLL = 3.0            # seconds between readiness rounds
+_MAC_RE = re.compile(r"\b([0-9a-fA-F]{1,2}(?:[:-][0-9a-fA-F]{1,2}){5})\b")
+_IP_RE = re.compile(r"\b(\d{1,3}(?:\.\d{1,3}){3})\b")
+
+# (module, args, become) of the ad-hoc run per OS and mode
+_COMMANDS = {
+    ("windows", "restart"):  ("win_reboot", f"reboot_timeout={REBOOT_TIMEOUT}", False),
+    ("windows", "shutdown"): ("win_shell", "shutdown /s /t 5 /f", False),
+    ("linux", "restart"):    ("reboot", f"reboot_timeout={REBOOT_TIMEOUT}", True),
+    ("linux", "shutdown"):   ("raw", "nohup sh -c 'sleep 2; poweroff' >/dev/null 2>&1 &", True),
+}
+
+
+def adhoc_extra(os_name: str, mode: str) -> Dict[str, str]:
+    """Job extra for a restart / shutdown: the module and arguments to run."""
+    module, args, become = _COMMANDS[(os_name, mode)]
+    extra = {"power": mode, "module": module, "command": args}
+    if become:
+        extra["become"] = "true"
+    return extra
+
+
+# =============================================================================
+# Wake-on-LAN
+# =============================================================================
+def normalize_mac(mac: str) -> str:
+    """'AA-BB-CC-0-1-2' -> 'aa:bb:cc:00:01:02'. Raises ValueError."""
+    text = (mac or "").strip()
+    if len(text) == 12 and all(c in "0123456789abcdefABCDEF" for c in text):
+        parts = [text[i:i + 2] for i in range(0, 12, 2)]
+    elif _MAC_RE.fullmatch(text):
+        parts = re.split(r"[:-]", text)
+    else:
+        raise ValueError(f"Not a MAC address: '{mac}'")
+    return ":".join(p.zfill(2) for p in parts).lower()
+
+
+def magic_packet(mac: str) -> bytes:
+    return b"\xff" * 6 + bytes.fromhex(normalize_mac(mac).replace(":", "")) * 16
+
+
+def parse_magic(data: bytes) -> Optional[str]:
+    """The MAC a magic packet wakes, or None if `data` is not one."""
+    if len(data) < 102 or data[:6] != b"\xff" * 6:
+        return None
+    mac = data[6:12]
+    if data[6:102] != mac * 16:
+        return None
+    return ":".join(f"{b:02x}" for b in mac)
+
+
+def broadcast_for(ip: str) -> str:
+    """WOL_BROADCAST, or the PC's /24 directed broadcast address."""
+    if WOL_BROADCAST:
+        return WOL_BROADCAST
+    return ip.rsplit(".", 1)[0] + ".255"
+
+
+def send_wol(macs: Dict[str, str], repeat: int = WOL_REPEAT, batch: int = WOL_BATCH,
+             stagger: float = WOL_STAGGER, port: int = WOL_PORT) -> int:
+    """macs: {ip: mac}. Sends the staggered bursts, returns the packets sent."""
+    sent = 0
+    hosts = list(macs.items())
+    batch = max(1, batch)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        for start in range(0, len(hosts), batch):
+            if start and stagger:
+                time.sleep(stagger)
+            for _ in range(max(1, repeat)):
+                for ip, mac in hosts[start:start + batch]:
+                    try:
+                        sock.sendto(magic_packet(mac), (broadcast_for(ip), port))
+                        sent += 1
+                    except (OSError, ValueError) as e:
+                        print(f"[POWER] Magic packet for {ip} failed: {e}")
+    return sent
+
+
+# =============================================================================
+# Readiness
+# =============================================================================
+def management_port(os_name: str, transport: str = "") -> int:
+    """Port ansible reaches the PC on: the lab's transport, else hosts.ini."""
+    if os_name == "windows" and transport in TRANSPORTS:
+        return int(TRANSPORTS[transport]["ansible_port"])
+    from .job_builder import get_project_root, read_group_vars
+
+    group = "windows_clients" if os_name == "windows" else "linux_clients"
+    try:
+        return int(read_group_vars(get_project_root(), group).get("ansible_port", 22))
+    except ValueError:
+        return 22
+
+
+def _port_open(ip: str, port: int) -> bool:
+    try:
+        with socket.create_connection((ip, port), timeout=_PROBE_TIMEOUT):
+            return True
+    except OSError:
+        return False
+
+
+def wait_ready(ports: Dict[str, int], timeout: float,
+               on_ready: Optional[Callable[[str], None]] = None) -> Set[str]:
+    """
+    ports: {ip: management port}. Probes every PC still down each round
+    (in parallel) until all answer or `timeout` passes. Returns the ready IPs.
+    """
+    ready: Set[str] = set()
+    deadline = time.monotonic() + timeout
+    with ThreadPoolExecutor(max_workers=min(64, max(1, len(ports)))) as pool:
+        while True:
+            waiting = [ip for ip in ports if ip not in ready]
+            for ip, ok in zip(waiting, pool.map(lambda ip: _port_open(ip, ports[ip]), waiting)):
+                if ok:
+                    ready.add(ip)
+                    if on_ready:
+                        on_ready(ip)
+            if len(ready) == len(ports) or time.monotonic() >= deadline:
+                return ready
+            time.sleep(_POLL)
+
+
+@dataclass
+class WakeResult:
+    up: List[str] = field(default_factory=list)        # answering, woken or already on
+    woken: List[str] = field(default_factory=list)     # sent a magic packet
+    no_mac: List[str] = field(default_factory=list)    # down, and no MAC in the inventory
+    seconds: float = 0.0
+
+    @property
+    def down(self) -> List[str]:
+        return [ip for ip in self.woken if ip not in self.up]
+
+    def describe(self) -> str:
+        text = f"{len(self.up)} up"
+        if self.woken:
+            text += f", {len(self.woken) - len(self.down)} of {len(self.woken)} woken"
+        if self.down:
+            text += f", {len(self.down)} did not come up"
+        if self.no_mac:
+            text += f", {len(self.no_mac)} without a MAC address"
+        return text + f" ({self.seconds:.0f}s)"
+
+
+def wake(pcs: List[dict], transport: str = "", default_os: str = "windows",
+         timeout: float = WOL_TIMEOUT,
+         on_ready: Optional[Callable[[str], None]] = None) -> WakeResult:
+    """
+    pcs: inventory PC dicts. PCs whose management port already answers are
+    left alone; the rest are woken and waited for.
+    """
+    started = time.monotonic()
+    ports = {
+        pc["ip"]: management_port(pc.get("os") or default_os, transport) for pc in pcs
+    }
+    result = WakeResult()
+    result.up = sorted(wait_ready(ports, 0, on_ready))
+
+    macs: Dict[str, str] = {}
+    for pc in pcs:
+        if pc["ip"] in result.up:
+            continue
+        try:
+            macs[pc["ip"]] = normalize_mac(pc.get("mac", ""))
+        except ValueError:
+            result.no_mac.append(pc["ip"])
+    if macs:
+        print(f"[POWER] Waking {len(macs)} PC(s), {send_wol(macs)} magic packet(s) sent")
+        result.woken = sorted(macs)
+        woken = wait_ready({ip: ports[ip] for ip in macs}, timeout, on_ready)
+        result.up = sorted(set(result.up) | woken)
+    result.seconds = time.monotonic() - started
+    return result
+
+
+def arp_macs(ips: Iterable[str]) -> Dict[str, str]:
+    """MACs of `ips` from the controller's ARP cache (PCs on the same segment)."""
+    wanted = set(ips)
+    text = ""
+    try:
+        with open("/proc/net/arp") as f:
+            text = f.read()
+    except OSError:
+        try:
+            text = subprocess.run(
+                ["arp", "-a"], capture_output=True, text=True, timeout=5,
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            return {}
+    macs: Dict[str, str] = {}
+    for line in text.splitlines():
+        ip_m, mac_m = _IP_RE.search(line), _MAC_RE.search(line)
+        if not ip_m or not mac_m or ip_m.group(1) not in wanted:
+            continue
+        mac = normalize_mac(mac_m.group(1))
+        if mac not in ("00:00:00:00:00:00", "ff:ff:ff:ff:ff:ff"):
+            macs[ip_m.group(1)] = mac
+    return macs
+
+
+def run_packet_sink(port: int = WOL_PORT) -> int:
+    """Entry point for ``main.py --wol-sink [port]``: print the MACs woken."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("", port))
+        print(f"[POWER] Listening for magic packets on udp/{port} (pid {os.getpid()})")
+        try:
+            while True:
+                data, addr = sock.recvfrom(1024)
+                mac = parse_magic(data)
+                print(f"[POWER] {addr[0]} -> " + (f"wake {mac}" if mac else f"{len(data)} byte(s), not a magic packet"))
+        except KeyboardInterrupt:
+            return 0
@@ -0,0 +1,183 @@
+"""
+Connection pre-warming – SSH master connections opened while PCs are still
+being selected, so the first task of a run skips the TCP + auth handshake.
+
+Every client (Windows via OpenSSH, Linux) is reached over ssh. As soon as a
+PC is selected on the lab page, the pool opens a multiplexing master to it in
+the background:
+
+    ssh -f -N -o ControlMaster=yes -o ControlPath=~/.sync_cp/%h-%p-%r ...
+
+using the user / port / key / ssh args from the group's vars in hosts.ini.
+Ansible is pointed at the same directory and name pattern (see
+ansible_settings()), and its default ``ControlMaster=auto`` reuses a master
+that is already up instead of connecting again. With the docker executor the
+directory is mounted into the container.
+
+Budget
+    A master closes by itself after SYNC_PREWARM_IDLE seconds without a
+    client (ssh's ControlPersist), and the pool holds at most
+    SYNC_PREWARM_MAX of them – the least recently selected masters outside
+    the current selection are closed first. Masters are not closed when the
+    GUI exits, so a detached job (core.journal) still benefits.
+
+Hosts that do not answer (or need a password) simply fail to warm; ansible
+then connects on its own exactly as before. Not available on a Windows
+controller, whose ssh client cannot multiplex.
+"""
+
+import getpass
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .config import CONNECT_TIMEOUT, PREWARM, PREWARM_IDLE, PREWARM_MAX, PREWARM_PARALLEL
+
+CP_DIR = os.path.join(os.path.expanduser("~"), ".sync_cp")
+CP_MOUNT = "/sync_cp"
+# Same name on both sides: ssh expands %h/%p/%r, ansible passes "%%" through as "%"
+_SSH_NAME = "%h-%p-%r"
+_ANSIBLE_CONTROL_PATH = "%(directory)s/%%h-%%p-%%r"
+
+
+def available() -> bool:
+    return PREWARM and os.name != "nt" and shutil.which("ssh") is not None
+
+
+def ansible_settings(executor) -> Tuple[List[Tuple[str, str]], Dict[str, str]]:
+    """(mounts, ANSIBLE_* env) that let ansible reuse the pool's masters."""
+    if not available():
+        return [], {}
+    os.makedirs(CP_DIR, mode=0o700, exist_ok=True)
+    env = {
+        "ANSIBLE_SSH_CONTROL_PATH_DIR": executor.path_for(CP_DIR, CP_MOUNT),
+        "ANSIBLE_SSH_CONTROL_PATH": _ANSIBLE_CONTROL_PATH,
+    }
+    return [(CP_DIR, CP_MOUNT)], env
+
+
+def _ssh_target(ip: str, group_vars: Dict[str, str]) -> Tuple[str, str, List[str]]:
+    """(socket path, destination, extra ssh args) for a host."""
+    user = group_vars.get("ansible_user") or getpass.getuser()
+    port = group_vars.get("ansible_port", "22")
+    args = ["-p", port]
+    key = group_vars.get("ansible_ssh_private_key_file", "")
+    if key:
+        # hosts.ini names the key as the container sees it (/root/.ssh is ~/.ssh)
+        if not os.path.exists(key):
+            key = os.path.join(os.path.expanduser("~/.ssh"), os.path.basename(key))
+        if os.path.exists(key):
+            args += ["-i", key]
+    args += shlex.split(group_vars.get("ansible_ssh_common_args", ""))
+    dest = f"{user}@{ip}"
+    return os.path.join(CP_DIR, f"{ip}-{port}-{user}"), dest, args
+
+
+class ConnectionPool:
+    """Background master connections for the current selection (see module doc)."""
+
+    def __init__(self, max_open: int = PREWARM_MAX, parallel: int = PREWARM_PARALLEL):
+        self.max_open = max_open
+        self._executor = ThreadPoolExecutor(max_workers=max(1, parallel))
+        self._lock = threading.Lock()
+        # socket path -> destination, least recently selected first
+        self._open: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: set = set()
+        self._keep: set = set()   # sockets of the current selection
+        self._group_vars: Dict[str, Dict[str, str]] = {}
+
+    def _vars_for(self, group: str) -> Dict[str, str]:
+        if group not in self._group_vars:
+            from .job_builder import get_project_root, read_group_vars
+            self._group_vars[group] = read_group_vars(get_project_root(), group)
+        return self._group_vars[group]
+
+    def warm(self, hosts: Dict[str, str]):
+        """hosts: {ip: os_name} – the current selection, in selection order."""
+        if not available():
+            return
+        os.makedirs(CP_DIR, mode=0o700, exist_ok=True)
+        keep = set()
+        with self._lock:
+            for ip, os_name in list(hosts.items())[: self.max_open]:
+                group = "windows_clients" if os_name == "windows" else "linux_clients"
+                path, dest, args = _ssh_target(ip, self._vars_for(group))
+                keep.add(path)
+                if os.path.exists(path):
+                    # Still up – possibly from an earlier session
+                    self._open[path] = dest
+                    self._open.move_to_end(path)
+                    continue
+                self._open.pop(path, None)
+                if path not in self._pending:
+                    self._pending.add(path)
+                    self._executor.submit(self._connect, path, dest, args)
+            self._keep = keep
+            self._evict()
+
+    def _connect(self, path: str, dest: str, args: List[str]):
+        cmd = [
+            "ssh", "-f", "-N",
+            "-o", "ControlMaster=yes",
+            "-o", f"ControlPath={os.path.join(CP_DIR, _SSH_NAME)}",
+            "-o", f"ControlPersist={PREWARM_IDLE}",
+            "-o", "BatchMode=yes",
+            *(["-o", f"ConnectTimeout={CONNECT_TIMEOUT}"] if CONNECT_TIMEOUT else []),
+            *args, dest,
+        ]
+        try:
+            # Not a pipe: the backgrounded master inherits stderr and would
+            # keep a pipe open until it exits
+            with tempfile.TemporaryFile(mode="w+") as err:
+                result = subprocess.run(
+                    cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                    stderr=err, timeout=CONNECT_TIMEOUT + 15 if CONNECT_TIMEOUT else None,
+                )
+                ok = result.returncode == 0
+                if not ok:
+                    err.seek(0)
+                    errors = err.read().strip().splitlines()
+                    print(f"[PREWARM] {dest}: {errors[-1] if errors else 'failed'}")
+        except (OSError, subprocess.TimeoutExpired) as e:
+            ok = False
+            print(f"[PREWARM] {dest}: {e}")
+        with self._lock:
+            self._pending.discard(path)
+            if ok:
+                self._open[path] = dest
+                self._evict()
+
+    def _evict(self):
+        """Close the oldest masters while over budget, sparing the selection. Lock held."""
+        for path in list(self._open):
+            if len(self._open) <= self.max_open:
+                break
+            if path in self._keep:
+                continue
+            dest = self._open.pop(path)
+            self._executor.submit(self._close, path, dest)
+
+    def _close(self, path: str, dest: str):
+        try:
+            subprocess.run(
+                ["ssh", "-o", f"ControlPath={path}", "-O", "exit", dest],
+                stdin=subprocess.DEVNULL, capture_output=True, timeout=10,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+
+_POOL: Optional[ConnectionPool] = None
+
+
+def get_pool() -> ConnectionPool:
+    global _POOL
+    if _POOL is None:
+        _POOL = ConnectionPool()
+    return _POOL
@@ -0,0 +1,97 @@
+"""
+Coordinated reboots – hosts left with a pending reboot restart in staggered
+waves instead of all at once.
+
+The reboot step (ansible/steps/<os>/reboot.yml) only reboots a host when it
+reports a pending reboot (Windows' servicing / update / rename flags or the
+marker written for installer exit codes 3010 and 1641, Linux'
+/var/run/reboot-required) and the job allows it.  plan_waves() spreads the
+targets over waves of ``size`` hosts, taking hosts from every section in
+turn so one wave never empties a whole row or switch; a host in wave N goes
+down after N * stagger seconds.  Every host then waits for its own
+management port, so the waits overlap and the lab is back in about
+(waves - 1) * stagger + one reboot instead of one reboot per host.
+
+Each rebooted host prints one line that reboot_results() reads back:
+    reboot-done 10.20.9.1 wave=1 94.2s
+with the time it was down (stagger delay excluded).
+"""
+
+import re
+import statistics
+from typing import Dict, List, Tuple
+
+_RESULT_RE = re.compile(r"reboot-done (\S+) wave=(\d+) (-?[\d.]+)s")
+
+
+def plan_waves(pcs: List[dict], size: int) -> Dict[str, int]:
+    """pcs: inventory PC dicts (ip, section, row, col). Returns {ip: wave}."""
+    sections: Dict[int, List[dict]] = {}
+    for pc in pcs:
+        sections.setdefault(pc.get("section", 0), []).append(pc)
+    queues = [
+        sorted(members, key=lambda pc: (pc.get("row", 0), pc.get("col", 0)))
+        for _, members in sorted(sections.items())
+    ]
+
+    # Round-robin over the sections: consecutive hosts sit in different sections
+    order: List[str] = []
+    while any(queues):
+        for queue in queues:
+            if queue:
+                order.append(queue.pop(0)["ip"])
+    size = max(1, size)
+    return {ip: i // size for i, ip in enumerate(order)}
+
+
+def host_vars(plan: Dict[str, int], stagger: int) -> Dict[str, Dict[str, str]]:
+    return {
+        ip: {"reboot_wave": str(wave), "reboot_delay": str(wave * stagger)}
+        for ip, wave in plan.items()
+    }
+
+
+def wave_count(plan: Dict[str, int]) -> int:
+    return max(plan.values(), default=-1) + 1
+
+
+def reboot_results(lines: List[str]) -> Dict[str, Tuple[int, float]]:
+    """{host: (wave, seconds down)} for every host that rebooted."""
+    results: Dict[str, Tuple[int, float]] = {}
+    for line in lines:
+        m = _RESULT_RE.search(line)
+        if m:
+            host, wave, seconds = m.groups()
+            # A composite job may reboot a host after more than one step
+            downtime = results.get(host, (0, 0.0))[1] + max(0.0, float(seconds))
+            results[host] = (int(wave), downtime)
+    return results
+
+
+def summary_lines(results: Dict[str, Tuple[int, float]]) -> List[str]:
+    if not results:
+        return []
+    waves: Dict[int, List[float]] = {}
+    for wave, seconds in results.values():
+        waves.setdefault(wave, []).append(seconds)
+    times = [seconds for _, seconds in results.values()]
+    slowest = max(results, key=lambda host: results[host][1])
+    lines = [
+        f"Rebooted {len(results)} host(s) in {len(waves)} wave(s): "
+        f"median {statistics.median(times):.0f}s, "
+        f"slowest {slowest} ({results[slowest][1]:.0f}s)"
+    ]
+    for wave, secs in sorted(waves.items()):
+        lines.append(
+            f"  wave {wave + 1:<3} {len(secs)} host(s)  "
+            f"median {statistics.median(secs):.0f}s  max {max(secs):.0f}s"
+        )
+    return lines
+
+
+def host_notes(results: Dict[str, Tuple[int, float]]) -> Dict[str, str]:
+    """Per host, how long its reboot took (shown as the PC card tooltip)."""
+    return {
+        host: f"↻ rebooted in {seconds:.0f}s (wave {wave + 1})"
+        for host, (wave, seconds) in results.items()
+    }
@@ -0,0 +1,153 @@
+"""
+Runbooks – a job as a DAG of steps that every host walks independently.
+
+A step is a task file in ansible/steps/<os>/<step>.yml.  A runbook lists
+steps with their dependencies; order() sorts them topologically and
+render() emits a single playbook that runs with ``strategy: free``, so each host
+moves on to its next step as soon as it finishes the previous one instead
+of waiting at every task for the slowest PC in the room.  A host that fails
+a step is dropped by Ansible and never reaches the steps that depend on it.
+
+Output is ordinary ansible-playbook output (task names are prefixed with
+the step, e.g. "install | Install package(s) via APT"), so the existing log
+colouring and PLAY RECAP parsing keep working.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+
+class RunbookError(Exception):
+    pass
+
+
+@dataclass
+class Step:
+    name: str
+    after: List[str] = field(default_factory=list)
+    guarded: bool = True   # False for the probe step, which sets the OS guard's input
+
+
+@dataclass
+class Runbook:
+    name: str
+    os_name: str
+    steps: List[Step]
+
+    # Applied to every guarded step: os guard and privilege escalation, as in
+    # the hand-written playbooks (caps_os_family comes from the probe step)
+    _OS_GUARD = {
+        "windows": 'caps_os_family | default(\'\') == "Windows"',
+        "linux":   'caps_os_family | default(\'\') == "Debian"',
+    }
+
+    def order(self) -> List[Step]:
+        """Topological order of the steps (stable w.r.t. declaration order)."""
+        by_name: Dict[str, Step] = {s.name: s for s in self.steps}
+        for step in self.steps:
+            for dep in step.after:
+                if dep not in by_name:
+                    raise RunbookError(f"Step '{step.name}' depends on unknown step '{dep}'")
+
+        ordered: List[Step] = []
+        state: Dict[str, int] = {}   # 1 = visiting, 2 = done
+
+        def visit(step: Step):
+            if state.get(step.name) == 2:
+                return
+            if state.get(step.name) == 1:
+                raise RunbookError(f"Cycle in runbook '{self.name}' at step '{step.name}'")
+            state[step.name] = 1
+            for dep in step.after:
+                visit(by_name[dep])
+            state[step.name] = 2
+            ordered.append(step)
+
+        for step in self.steps:
+            visit(step)
+        return ordered
+
+    def render(self, project_root: str) -> str:
+        guard = self._OS_GUARD.get(self.os_name, "true")
+        lines = [
+            "---",
+            "# Generated by app/core/runbook.py – do not edit, changes are overwritten.",
+            f"- name: Runbook - {self.name}",
+            "  hosts: all",
+            "  gather_facts: no",
+            "  strategy: free",
+        ]
+        vars_file = os.path.join(project_root, "ansible", "steps", self.os_name, "vars.yml")
+        if os.path.exists(vars_file):
+            lines += ["", "  vars_files:", f"    - ../steps/{self.os_name}/vars.yml"]
+
+        lines += ["", "  tasks:"]
+        for step in self.order():
+            after = ", ".join(step.after) or "-"
+            lines += [
+                f"    # step: {step.name}  (after: {after})",
+                f"    - import_tasks: ../steps/{self.os_name}/{step.name}.yml",
+            ]
+            if not step.guarded:
+                continue
+            lines.append(f"      when: {guard}")
+            if self.os_name == "linux":
+                lines.append("      become: yes")
+        return "\n".join(lines) + "\n"
+
+    def playbook_name(self) -> str:
+        slug = self.name.lower().replace(" ", "_")
+        return f"playbooks/_sync_runbook_{slug}.yml"
+
+    def write(self, project_root: str) -> str:
+        """Render into ansible/playbooks/ (next to the real playbooks so
+        playbook_dir-relative paths stay valid). Returns the playbook path
+        relative to the ansible/ dir."""
+        rel = self.playbook_name()
+        write_playbook(os.path.join(project_root, "ansible", rel), self.render(project_root))
+        return rel
+
+
+def write_playbook(path: str, content: str):
+    """
+    Write a generated playbook unless it is already up to date. Goes through
+    a temp file and os.replace(): with SYNC_WORKERS > 1 every worker process
+    renders the same playbook, and one must never truncate the file while
+    another's ansible-playbook is reading it.
+    """
+    try:
+        with open(path, "r") as f:
+            if f.read() == content:
+                return
+    except OSError:
+        pass
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+# ── built-in runbooks ─────────────────────────────────────────────────────────
+
+RUNBOOKS: Dict[Tuple[str, str], Runbook] = {
+    ("windows", "install"): Runbook("windows install", "windows", [
+        Step("probe", guarded=False),
+        Step("bootstrap", after=["probe"]),
+        Step("transfer",  after=["probe"]),
+        Step("install", after=["bootstrap", "transfer"]),
+        Step("reboot",  after=["install"]),
+        Step("verify",  after=["reboot"]),
+    ]),
+    ("linux", "install"): Runbook("linux install", "linux", [
+        Step("probe", guarded=False),
+        Step("bootstrap", after=["probe"]),
+        Step("install", after=["bootstrap"]),
+        Step("reboot",  after=["install"]),
+        Step("verify",  after=["reboot"]),
+    ]),
+}
+
+
+def get_runbook(os_name: str, action: str):
+    return RUNBOOKS.get((os_name, action))
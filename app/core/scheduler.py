@@ -0,0 +1,333 @@
+"""
+Scheduled deployments – run a Software Manager job later, without an operator.
+
+A schedule stores the payloads exactly as the Software Manager forms produced
+them (data/schedules.json). When it is due, the headless scheduler
+(``main.py --scheduler``) builds the jobs with the same prepare_jobs() the GUI
+uses and starts them as detached jobs (core.journal), so a GUI opened later
+reattaches to the run like to any other.
+
+Repeat
+    ""          once, at the given time
+    daily       every day at the same time
+    weekdays    Monday to Friday
+    weekly      same weekday every week
+
+Maintenance windows
+    Per lab, stored in the inventory (``labs[<lab>]["maintenance"]``), e.g.
+        Mon-Fri 22:00-06:00      (overnight – ends the next morning)
+        Sat,Sun 00:00-24:00
+        daily 12:30-13:30
+    A schedule with ``window`` set waits for the next open window when it
+    falls due outside one. A lab without windows is always open.
+
+Deferral
+    At start time the targets that have a MAC address in the inventory get a
+    Wake-on-LAN packet (core.power), then the targets are pinged; only the
+    online ones run. The offline ones – including PCs still booting – stay
+    pending and are retried every SCHED_RETRY seconds while the window is still
+    open (or for SCHED_DEFER_MAX seconds when the schedule ignores windows).
+    Hosts still offline then are recorded as missed in the schedule's history.
+"""
+
+import datetime as dt
+import json
+import os
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Dict, FrozenSet, List, Optional
+
+from .config import JOB_DEADLINE, SCHED_DEFER_MAX, SCHED_POLL, SCHED_RETRY
+from .job_builder import JobError, get_project_root, plan_workers, prepare_jobs
+from . import power
+
+SCHEDULE_FILE = os.path.join("data", "schedules.json")
+REPEATS = ("", "daily", "weekdays", "weekly")
+HISTORY_KEEP = 20
+
+_DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+_WINDOW_RE = re.compile(r"^\s*(\S+)\s+(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$")
+
+
+# =============================================================================
+# Maintenance windows
+# =============================================================================
+@dataclass(frozen=True)
+class Window:
+    days: FrozenSet[int]   # weekdays the window opens on, Monday = 0
+    start: int             # minutes after midnight
+    end: int               # minutes after midnight, <= start = next day
+
+    def opened(self, when: dt.datetime) -> Optional[dt.datetime]:
+        """When the window containing `when` opened, None if it is closed."""
+        minute = when.hour * 60 + when.minute
+        today = when.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.start < self.end:
+            if when.weekday() in self.days and self.start <= minute < self.end:
+                return today + dt.timedelta(minutes=self.start)
+            return None
+        if when.weekday() in self.days and minute >= self.start:
+            return today + dt.timedelta(minutes=self.start)
+        if (when.weekday() - 1) % 7 in self.days and minute < self.end:
+            return today - dt.timedelta(days=1) + dt.timedelta(minutes=self.start)
+        return None
+
+    def closes(self, when: dt.datetime) -> Optional[dt.datetime]:
+        opened = self.opened(when)
+        if opened is None:
+            return None
+        length = (self.end - self.start) % (24 * 60) or 24 * 60
+        return opened + dt.timedelta(minutes=length)
+
+
+def parse_window(spec: str) -> Window:
+    """"Mon-Fri 22:00-06:00" -> Window. Raises ValueError."""
+    m = _WINDOW_RE.match(spec)
+    if not m:
+        raise ValueError(f"'{spec}' is not like 'Mon-Fri 22:00-06:00'")
+    day_spec, h1, m1, h2, m2 = m.groups()
+    days = set()
+    for part in day_spec.lower().split(","):
+        if part in ("daily", "*"):
+            days.update(range(7))
+            continue
+        first, _, last = part.partition("-")
+        if first[:3] not in _DAYS or (last and last[:3] not in _DAYS):
+            raise ValueError(f"Unknown day in '{spec}'")
+        a = _DAYS.index(first[:3])
+        b = _DAYS.index(last[:3]) if last else a
+        days.update((a + i) % 7 for i in range((b - a) % 7 + 1))
+    start, end = int(h1) * 60 + int(m1), int(h2) * 60 + int(m2)
+    if start >= 24 * 60 or end > 24 * 60 or int(m1) > 59 or int(m2) > 59:
+        raise ValueError(f"Invalid time in '{spec}'")
+    return Window(frozenset(days), start, end % (24 * 60))
+
+
+def parse_windows(specs: List[str]) -> List[Window]:
+    return [parse_window(s) for s in specs if s.strip()]
+
+
+def window_closes(windows: List[Window], when: dt.datetime) -> Optional[dt.datetime]:
+    """Latest close of the windows open at `when`; None if all are closed."""
+    closes = [c for c in (w.closes(when) for w in windows) if c is not None]
+    return max(closes) if closes else None
+
+
+def in_window(windows: List[Window], when: dt.datetime) -> bool:
+    return not windows or window_closes(windows, when) is not None
+
+
+# =============================================================================
+# Schedules
+# =============================================================================
+def next_time(ts: float, repeat: str, now: float) -> float:
+    """The first occurrence of a `repeat` schedule at `ts` after `now` (0 = none)."""
+    if not repeat:
+        return 0
+    step = dt.timedelta(days=7 if repeat == "weekly" else 1)
+    when = dt.datetime.fromtimestamp(ts)
+    while when.timestamp() <= now or (repeat == "weekdays" and when.weekday() >= 5):
+        when += step
+    return when.timestamp()
+
+
+@dataclass
+class Schedule:
+    schedule_id: str
+    lab: str
+    payloads: List[Dict]
+    at: float                      # next start (epoch seconds), 0 = nothing left to start
+    repeat: str = ""
+    window: bool = True            # only start inside the lab's maintenance windows
+    pending: List[str] = field(default_factory=list)   # offline hosts of the current run
+    until: float = 0               # the current run stops retrying pending hosts then
+    retry_at: float = 0
+    history: List[Dict] = field(default_factory=list)
+
+    @property
+    def targets(self) -> List[str]:
+        return [ip for p in self.payloads for ip in p.get("targets") or []]
+
+    @property
+    def state(self) -> str:
+        """"waiting", "deferring" or "done"."""
+        if self.pending:
+            return "deferring"
+        return "waiting" if self.at else "done"
+
+    def describe(self) -> str:
+        action = self.payloads[0].get("action", "?") if self.payloads else "?"
+        when = time.strftime("%a %Y-%m-%d %H:%M", time.localtime(self.at)) if self.at else "–"
+        text = f"{action} on {len(self.targets)} host(s) in {self.lab}"
+        if self.state == "deferring":
+            return f"{text}, {len(self.pending)} host(s) offline – retrying"
+        if self.state == "done":
+            return f"{text}, done"
+        return f"{text}, {self.repeat or 'once'} – next {when}"
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Schedule":
+        known = cls.__dataclass_fields__
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+def _file() -> str:
+    return os.path.join(get_project_root(), SCHEDULE_FILE)
+
+
+def load_schedules() -> List[Schedule]:
+    try:
+        with open(_file(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return [Schedule.from_dict(d) for d in data.get("schedules", []) if isinstance(d, dict)]
+
+
+def save_schedules(schedules: List[Schedule]):
+    path = _file()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"schedules": [asdict(s) for s in schedules]}, f, indent=2)
+    os.replace(tmp, path)
+
+
+def add_schedule(lab: str, payloads: List[Dict], at: float, repeat: str = "",
+                 window: bool = True) -> Schedule:
+    if repeat not in REPEATS:
+        raise ValueError(f"Unknown repeat '{repeat}'")
+    schedule = Schedule(f"s-{uuid.uuid4().hex[:8]}", lab, payloads, at, repeat, window)
+    save_schedules(load_schedules() + [schedule])
+    print(f"[SCHED] Added {schedule.schedule_id}: {schedule.describe()}")
+    return schedule
+
+
+def remove_schedule(schedule_id: str) -> bool:
+    schedules = load_schedules()
+    kept = [s for s in schedules if s.schedule_id != schedule_id]
+    if len(kept) == len(schedules):
+        return False
+    save_schedules(kept)
+    return True
+
+
+# =============================================================================
+# Scheduler
+# =============================================================================
+def _launch(schedule: Schedule, hosts: List[str], inventory_manager) -> str:
+    """Start the schedule's jobs for `hosts` as a detached job. Raises JobError."""
+    from . import journal
+    from .executors import get_executor
+
+    payloads = []
+    for payload in schedule.payloads:
+        targets = [ip for ip in payload.get("targets") or [] if ip in hosts]
+        if targets:
+            payloads.append(dict(payload, targets=targets))
+    jobs = prepare_jobs(payloads, schedule.lab, inventory_manager)
+    available, reason = get_executor().is_available()
+    if not available:
+        raise JobError(f"Executor unavailable: {reason}")
+    workers, _ = plan_workers(jobs)
+    meta = {"lab": schedule.lab, "payloads": payloads, "schedule": schedule.schedule_id}
+    return journal.start(jobs, workers, None, JOB_DEADLINE, meta)
+
+
+def _wake(ips: List[str], inventory_manager):
+    """Magic packets for PCs with a known MAC; a PC already on ignores them."""
+    macs = {}
+    for ip in ips:
+        found = inventory_manager.find_pc(ip)
+        try:
+            macs[ip] = power.normalize_mac((found[1] if found else {}).get("mac", ""))
+        except ValueError:
+            continue
+    if macs:
+        print(f"[SCHED] Waking {len(macs)} host(s), {power.send_wol(macs)} magic packet(s) sent")
+
+
+def _step(schedule: Schedule, now: float, inventory_manager) -> bool:
+    """Advance one schedule. Returns True if it changed."""
+    from .ping_service import check_many
+
+    if not schedule.pending:
+        if not schedule.at or now < schedule.at:
+            return False
+        specs = inventory_manager.get_maintenance_windows(schedule.lab) if schedule.window else []
+        try:
+            windows = parse_windows(specs)
+        except ValueError as e:
+            print(f"[SCHED] {schedule.schedule_id}: {e} – ignoring the lab's windows")
+            windows = []
+        when = dt.datetime.fromtimestamp(now)
+        if not in_window(windows, when):
+            return False   # due, but waits for the window to open
+        closes = window_closes(windows, when) if windows else None
+        schedule.until = closes.timestamp() if closes else now + SCHED_DEFER_MAX
+        schedule.pending = list(schedule.targets)
+        schedule.retry_at = now
+        schedule.at = next_time(schedule.at, schedule.repeat, now)
+        print(f"[SCHED] {schedule.schedule_id} due: {len(schedule.pending)} host(s)")
+        _wake(schedule.pending, inventory_manager)
+
+    if now >= schedule.until:
+        print(f"[SCHED] {schedule.schedule_id}: {len(schedule.pending)} host(s) missed (still offline)")
+        schedule.history.append({"ts": now, "missed": schedule.pending})
+        schedule.pending = []
+        schedule.until = 0
+    elif now >= schedule.retry_at:
+        online = [ip for ip, (up, _) in check_many(schedule.pending).items() if up]
+        schedule.retry_at = now + SCHED_RETRY
+        if not online:
+            return True
+        entry = {"ts": now, "hosts": online}
+        try:
+            entry["job_id"] = _launch(schedule, online, inventory_manager)
+            schedule.pending = [ip for ip in schedule.pending if ip not in online]
+            print(f"[SCHED] {schedule.schedule_id}: started {entry['job_id']} on {len(online)} host(s)"
+                  + (f", {len(schedule.pending)} deferred" if schedule.pending else ""))
+        except (JobError, OSError) as e:
+            entry["error"] = str(e)
+            print(f"[SCHED] {schedule.schedule_id}: {e}")
+        schedule.history.append(entry)
+        if not schedule.pending:
+            schedule.until = 0
+    else:
+        return False
+    del schedule.history[:-HISTORY_KEEP]
+    return True
+
+
+def tick(inventory_manager=None, now: Optional[float] = None) -> int:
+    """Run everything that is due. Returns how many schedules changed."""
+    from .inventory_manager import InventoryManager
+
+    now = time.time() if now is None else now
+    inventory_manager = inventory_manager or InventoryManager()
+    changed = {}
+    for schedule in load_schedules():
+        if _step(schedule, now, inventory_manager):
+            changed[schedule.schedule_id] = schedule
+    if changed:
+        # Re-read: the GUI may have added or removed schedules meanwhile
+        save_schedules([changed.get(s.schedule_id, s) for s in load_schedules()])
+    return len(changed)
+
+
+def run_scheduler(once: bool = False) -> int:
+    """Entry point for ``main.py --scheduler [--once]``. Returns the exit code."""
+    from .inventory_manager import InventoryManager
+
+    print(f"[SCHED] Watching {_file()}" + ("" if once else f" every {SCHED_POLL}s"))
+    try:
+        while True:
+            inventory_manager = InventoryManager()   # pick up edits made in the GUI
+            tick(inventory_manager)
+            if once:
+                return 0
+            time.sleep(SCHED_POLL)
+    except KeyboardInterrupt:
+        return 0
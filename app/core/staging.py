@@ -0,0 +1,47 @@
+"""
+Installer pre-staging – push payloads into a client-side cache ahead of the
+deployment window so the install itself skips the transfer.
+
+Windows  The installer is copied to C:\\ProgramData\\SyncStage\\<sha256>\\<file>
+         (keyed by content hash, so versions never collide). Every host that
+         received it drops a marker on the controller:
+             data/staged/<sha256>/<ip>
+         build_job() reads those markers and passes ``staged=true`` as a host
+         var; the transfer step then only checks that the cached file is still
+         there and points win_package at it.
+Linux    apt's own cache is the staging area: packages are fetched with
+         ``download_only`` and the later install doesn't download anything.
+
+Staging runs with a small ``throttle`` (SYNC_STAGE_PARALLEL) so it can trickle
+through a lab during class without saturating the uplink.
+"""
+
+import hashlib
+import os
+from typing import Dict, List, Tuple
+
+STAGE_ACTION = "stage"
+STAGED_DIR = os.path.join("data", "staged")
+
+_HASH_CACHE: Dict[Tuple[str, float, int], str] = {}
+
+
+def payload_hash(path: str) -> str:
+    """sha256 of an installer, memoised on (path, mtime, size)."""
+    st = os.stat(path)
+    key = (path, st.st_mtime, st.st_size)
+    if key not in _HASH_CACHE:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        _HASH_CACHE[key] = h.hexdigest()
+    return _HASH_CACHE[key]
+
+
+def staged_hosts(project_root: str, sha: str) -> List[str]:
+    marker_dir = os.path.join(project_root, STAGED_DIR, sha)
+    try:
+        return sorted(os.listdir(marker_dir))
+    except OSError:
+        return []
@@ -0,0 +1,207 @@
+"""
+Desired-state endpoint for client pull agents (agent/sync_agent.py).
+
+GET  /state?host=<ip>&os=<windows|linux>
+     -> {"lab", "host", "os", "present": [...], "absent": [...], "interval"}
+POST /report   {"host", "os", "ok", "results": {pkg: status}, "detail"}
+     -> stored in data/agent_reports.json, shown in OperationStatusPage
+
+A poll is a dictionary lookup: the IP -> lab index is rebuilt only when
+inventory.json changes on disk, so each agent costs one short HTTP request
+instead of a held-open SSH/WinRM connection.
+
+An agent may only read and report the state of the address it connects
+from. With SYNC_PULL_TOKEN set, every request must carry it in
+X-Sync-Token, and a token holder may name another host (agents behind NAT).
+"""
+
+import hmac
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .config import AGENT_REPORTS_FILE, INVENTORY_FILE, PULL_INTERVAL, PULL_TOKEN, STATE_SERVER_PORT
+from .inventory_manager import read_pull_index
+
+
+# =============================================================================
+# Report store
+# =============================================================================
+class AgentReportStore:
+    """Latest report per host, persisted as JSON: { ip: {lab, ok, ts, results, detail} }."""
+
+    def __init__(self, path: str = AGENT_REPORTS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.reports: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"[PULL] Report file unreadable: {e}")
+        return {}
+
+    def reload(self):
+        with self._lock:
+            self.reports = self._load()
+
+    def add(self, ip: str, report: dict):
+        with self._lock:
+            self.reports[ip] = report
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.reports, f, indent=2)
+
+    def results_for_lab(self, lab_name: str) -> Dict[str, bool]:
+        """{ ip: ok } – same shape OperationStatusPage.load_results() takes."""
+        with self._lock:
+            return {
+                ip: bool(rep.get("ok"))
+                for ip, rep in self.reports.items()
+                if rep.get("lab") == lab_name
+            }
+
+
+# =============================================================================
+# HTTP endpoint
+# =============================================================================
+class _StateIndex:
+    """IP -> lab and lab -> desired state, rebuilt when inventory.json's mtime changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._hosts: Dict[str, str] = {}
+        self._desired: Dict[str, dict] = {}
+
+    def lookup(self, ip: str):
+        with self._lock:
+            mtime = os.path.getmtime(INVENTORY_FILE) if os.path.exists(INVENTORY_FILE) else None
+            if mtime != self._mtime:
+                self._hosts, self._desired = read_pull_index(INVENTORY_FILE)
+                self._mtime = mtime
+            lab_name = self._hosts.get(ip)
+            if lab_name is None:
+                return None, {}
+            return lab_name, self._desired.get(lab_name, {})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    index: _StateIndex = None
+    store: AgentReportStore = None
+
+    def _send_json(self, code: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorize(self, host: str) -> bool:
+        """
+        An agent speaks for the address it connects from. With PULL_TOKEN set
+        every request needs it, and a token holder may name another host.
+        Sends 403 and returns False otherwise.
+        """
+        token = self.headers.get("X-Sync-Token", "")
+        if PULL_TOKEN and not hmac.compare_digest(token, PULL_TOKEN):
+            self._send_json(403, {"error": "missing or wrong X-Sync-Token"})
+            return False
+        if host != self.client_address[0] and not PULL_TOKEN:
+            self._send_json(403, {"error": f"{self.client_address[0]} cannot act for {host}"})
+            return False
+        return True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/state":
+            self._send_json(404, {"error": "not found"})
+            return
+        qs = parse_qs(url.query)
+        host = (qs.get("host") or [self.client_address[0]])[0]
+        os_name = (qs.get("os") or [""])[0].lower()
+        if not self._authorize(host):
+            return
+
+        lab_name, desired = self.index.lookup(host)
+        if lab_name is None:
+            self._send_json(404, {"error": f"host {host} not in inventory"})
+            return
+
+        state = desired.get(os_name, {})
+        self._send_json(200, {
+            "lab":      lab_name,
+            "host":     host,
+            "os":       os_name,
+            "present":  state.get("present", []),
+            "absent":   state.get("absent", []),
+            "interval": PULL_INTERVAL,
+        })
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/report":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            report = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+
+        host = report.get("host") or self.client_address[0]
+        if not self._authorize(host):
+            return
+        lab_name, _ = self.index.lookup(host)
+        if lab_name is None:
+            self._send_json(404, {"error": f"host {host} not in inventory"})
+            return
+
+        self.store.add(host, {
+            "lab":     lab_name,
+            "os":      report.get("os", ""),
+            "ok":      bool(report.get("ok")),
+            "results": report.get("results", {}),
+            "detail":  str(report.get("detail", ""))[:2000],
+            "ts":      time.time(),
+        })
+        self._send_json(200, {"stored": True})
+
+    def log_message(self, fmt, *args):
+        # Keep the console readable – one short line per request
+        print(f"[PULL] {self.client_address[0]} {fmt % args}")
+
+
+class StateServer:
+    def __init__(self, port: int = STATE_SERVER_PORT, store: Optional[AgentReportStore] = None):
+        self.port = port
+        self.store = store or AgentReportStore()
+        handler = type("StateHandler", (_Handler,), {
+            "index": _StateIndex(),
+            "store": self.store,
+        })
+        self._httpd = ThreadingHTTPServer(("0.0.0.0", port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Serve in a daemon thread (GUI mode)."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"[PULL] State server listening on :{self.port}")
+
+    def serve_forever(self):
+        """Serve in the current thread (headless mode)."""
+        print(f"[PULL] State server listening on :{self.port}")
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
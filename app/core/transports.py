@@ -0,0 +1,221 @@
+"""
+Connection transports – how ansible reaches a lab's Windows PCs, chosen per lab.
+
+A lab's profile is stored in the inventory (``labs[<lab>]["transport"]``) and
+rendered into the job's temp inventory as ``[windows_clients:vars]`` lines
+that override the ones copied from hosts.ini. No profile means hosts.ini as it
+is (OpenSSH, see README › Inventory Configuration).
+
+Transport    | Connection                        | Port
+-------------|-----------------------------------|-----
+ssh          | OpenSSH + PowerShell              | 22
+winrm-http   | WinRM over HTTP, NTLM (pywinrm)   | 5985
+winrm-https  | WinRM over HTTPS, NTLM (pywinrm)  | 5986
+psrp         | PowerShell Remoting (pypsrp)      | 5986
+
+WinRM and PSRP log in with a password: ``vault_windows_password`` from
+ansible/inventory/group_vars/windows_clients/vault.yml.
+
+Benchmark
+    The ``transports`` action runs one generated playbook on a few sample
+    PCs: one play per transport that answers on its port, each timing the
+    same standard tasks (ping, shell, stat, 64 KB copy, delete – repeated
+    BENCH_ROUNDS times) with the transport's vars as play vars. A host that
+    does not answer the ping skips the rest of that play instead of waiting
+    out the connect timeout on every task. Every play ends with one line per
+    host:
+        transport-bench <host> <transport> <seconds|failed>
+    bench_results() reads those lines back; the fastest transport that worked
+    on every sample PC can be saved as the lab's profile.
+"""
+
+import hashlib
+import json
+import os
+import re
+import socket
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .runbook import write_playbook
+
+TRANSPORT_BENCH_ACTION = "transports"
+DEFAULT_TRANSPORT = "ssh"
+BENCH_ROUNDS = 3
+BENCH_SAMPLE = 3        # PCs the benchmark runs on by default
+
+_PASSWORD = "{{ vault_windows_password }}"
+
+TRANSPORTS: Dict[str, Dict[str, str]] = {
+    "ssh": {
+        "ansible_connection": "ssh",
+        "ansible_port": "22",
+        "ansible_shell_type": "powershell",
+    },
+    "winrm-http": {
+        "ansible_connection": "winrm",
+        "ansible_port": "5985",
+        "ansible_winrm_scheme": "http",
+        "ansible_winrm_transport": "ntlm",
+        "ansible_password": _PASSWORD,
+    },
+    "winrm-https": {
+        "ansible_connection": "winrm",
+        "ansible_port": "5986",
+        "ansible_winrm_scheme": "https",
+        "ansible_winrm_transport": "ntlm",
+        "ansible_winrm_server_cert_validation": "ignore",
+        "ansible_password": _PASSWORD,
+    },
+    "psrp": {
+        "ansible_connection": "psrp",
+        "ansible_port": "5986",
+        "ansible_psrp_protocol": "https",
+        "ansible_psrp_auth": "ntlm",
+        "ansible_psrp_cert_validation": "ignore",
+        "ansible_password": _PASSWORD,
+    },
+}
+
+_PROBE_TIMEOUT = 1.5    # seconds
+_RESULT_RE = re.compile(r"transport-bench (\S+) (\S+) (\S+)")
+
+
+def profile_vars(os_name: str, transport: str) -> Dict[str, str]:
+    """Group vars a lab's profile adds to the job inventory (none = hosts.ini)."""
+    if os_name != "windows" or not transport:
+        return {}
+    return dict(TRANSPORTS.get(transport, {}))
+
+
+def needs_password(transport: str) -> bool:
+    return "ansible_password" in TRANSPORTS.get(transport, {})
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+def _port_open(ip: str, port: int) -> bool:
+    try:
+        with socket.create_connection((ip, port), timeout=_PROBE_TIMEOUT):
+            return True
+    except OSError:
+        return False
+
+
+def reachable_transports(hosts: List[str]) -> List[str]:
+    """Transports whose port answers on at least one of `hosts`."""
+    ports = sorted({int(v["ansible_port"]) for v in TRANSPORTS.values()})
+    checks = [(ip, port) for ip in hosts for port in ports]
+    with ThreadPoolExecutor(max_workers=min(16, len(checks) or 1)) as pool:
+        open_ports = {port for (ip, port), ok in zip(checks, pool.map(lambda c: _port_open(*c), checks)) if ok}
+    return [name for name, v in TRANSPORTS.items() if int(v["ansible_port"]) in open_ports]
+
+
+def render_bench(names: List[str]) -> str:
+    lines = [
+        "---",
+        "# Generated by app/core/transports.py – do not edit, changes are overwritten.",
+    ]
+    for name in names:
+        lines += [
+            "",
+            f"- name: {json.dumps(f'Transport benchmark - {name}')}",
+            "  hosts: all",
+            "  gather_facts: no",
+            "  ignore_errors: yes",
+            "  ignore_unreachable: yes",
+            # JSON is valid YAML and keeps the Jinja password reference intact
+            f"  vars: {json.dumps(TRANSPORTS[name])}",
+            "  tasks:",
+            "    - name: bench | start",
+            "      ansible.builtin.set_fact:",
+            "        bench_t0: \"{{ now().timestamp() }}\"",
+            "    - name: bench | ping",
+            "      ansible.windows.win_ping:",
+            f"      loop: {list(range(BENCH_ROUNDS))}",
+            "      register: bench_ping",
+            "    - name: bench | shell",
+            "      ansible.windows.win_shell: $PSVersionTable.PSVersion.Major",
+            f"      loop: {list(range(BENCH_ROUNDS))}",
+            "      register: bench_shell",
+            "      when: bench_ping is succeeded",
+            "    - name: bench | stat",
+            "      ansible.windows.win_stat:",
+            "        path: C:\\Windows\\System32\\drivers\\etc\\hosts",
+            f"      loop: {list(range(BENCH_ROUNDS))}",
+            "      register: bench_stat",
+            "      when: bench_ping is succeeded",
+            "    - name: bench | copy 64 KB",
+            "      ansible.windows.win_copy:",
+            "        content: \"{{ 'x' * 65536 }}\"",
+            "        dest: C:\\Windows\\Temp\\sync_transport_bench.txt",
+            f"      loop: {list(range(BENCH_ROUNDS))}",
+            "      register: bench_copy",
+            "      when: bench_ping is succeeded",
+            "    - name: bench | delete",
+            "      ansible.windows.win_file:",
+            "        path: C:\\Windows\\Temp\\sync_transport_bench.txt",
+            "        state: absent",
+            "      register: bench_delete",
+            "      when: bench_ping is succeeded",
+            "    - name: bench | result",
+            "      ansible.builtin.debug:",
+            f"        msg: \"transport-bench {{{{ inventory_hostname }}}} {name} {{{{ bench_outcome }}}}\"",
+            "      vars:",
+            "        bench_outcome: \"{{ 'failed' if bench_errors | length else"
+            " ((now().timestamp() - bench_t0 | float) | round(2)) }}\"",
+            "        bench_all: \"{{ [bench_ping, bench_shell, bench_stat, bench_copy, bench_delete] }}\"",
+            "        bench_errors: \"{{ bench_all | select('failed') | list + bench_all | select('unreachable') | list }}\"",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def bench_playbook_name(names: List[str]) -> str:
+    digest = hashlib.sha1(render_bench(names).encode("utf-8")).hexdigest()[:10]
+    return f"playbooks/_sync_transport_bench_{digest}.yml"
+
+
+def write_bench(project_root: str, names: List[str]) -> str:
+    rel = bench_playbook_name(names)
+    write_playbook(os.path.join(project_root, "ansible", rel), render_bench(names))
+    return rel
+
+
+def bench_results(lines: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
+    """{transport: {host: seconds, or None when the transport failed there}}."""
+    results: Dict[str, Dict[str, Optional[float]]] = {}
+    for line in lines:
+        m = _RESULT_RE.search(line)
+        if not m:
+            continue
+        host, name, value = m.groups()
+        try:
+            seconds: Optional[float] = float(value.strip('"'))
+        except ValueError:
+            seconds = None
+        results.setdefault(name, {})[host] = seconds
+    return results
+
+
+def fastest(results: Dict[str, Dict[str, Optional[float]]]) -> Optional[str]:
+    """Lowest median time among transports that worked on every host."""
+    medians = {
+        name: statistics.median(hosts.values())
+        for name, hosts in results.items()
+        if hosts and None not in hosts.values()
+    }
+    return min(medians, key=medians.get) if medians else None
+
+
+def summary_lines(results: Dict[str, Dict[str, Optional[float]]]) -> List[str]:
+    lines = []
+    for name, hosts in results.items():
+        times = [s for s in hosts.values() if s is not None]
+        failed = len(hosts) - len(times)
+        line = f"{name:<12} "
+        line += f"median {statistics.median(times):6.2f}s" if times else "   no result   "
+        line += f"  ({len(times)} ok, {failed} failed)"
+        lines.append(line)
+    return lines
@@ -0,0 +1,248 @@
+"""
+Fleet verification – is a package installed, and at which version, on every
+selected PC?
+
+The ``verify`` action is an ad-hoc run (core.adhoc) of one short query per
+host instead of an install playbook in check mode: no play, no fact
+gathering, no module transfer on Linux (raw).
+
+    Windows  each Chocolatey package's lib\\<id>\\<id>.nuspec, then the
+             registry's Uninstall keys (64- and 32-bit) by display name
+    Linux    dpkg-query -W
+
+Every package prints one line, the name last so display names may contain
+spaces:
+    verify <version|-> <choco|registry|dpkg|-> <name>
+
+Results are kept per host and package with a timestamp,
+    data/verify/<ip>.json
+so the next check of the same package can say what was seen last time.
+summary_lines() groups the hosts by version for the results page; a host
+counts as failed in the recap when a package is missing or, with an
+expected version, on another one.
+"""
+
+import json
+import os
+import re
+import time
+from dataclasses import replace
+from typing import Dict, Iterable, List, Tuple
+
+from . import adhoc
+
+VERIFY_ACTION = "verify"
+VERIFY_DIR = os.path.join("data", "verify")
+
+MISSING = "-"
+
+_DPKG_NAME_RE = re.compile(r"^[a-z0-9][a-z0-9.+-]*(:[a-z0-9]+)?$")
+_CHOCO_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+_LINE_RE = re.compile(r"^verify (\S+) (\S+) (.+)$")
+
+_UNINSTALL_KEYS = (
+    "'HKLM:\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\*',"
+    "'HKLM:\\SOFTWARE\\WOW6432Node\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\*'"
+)
+
+
+def _ps_quote(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _windows_command(choco: List[str], app_name: str) -> str:
+    names = ",".join(_ps_quote(n) for n in choco + ([app_name] if app_name else []))
+    return (
+        f"$uninstall = Get-ItemProperty {_UNINSTALL_KEYS} -ErrorAction SilentlyContinue; "
+        f"foreach ($p in @({names})) {{ "
+        "$v = $null; $src = 'choco'; "
+        "$nuspec = Join-Path $env:ProgramData \"chocolatey\\lib\\$p\\$p.nuspec\"; "
+        "if (Test-Path -LiteralPath $nuspec) { $v = ([xml](Get-Content -LiteralPath $nuspec -Raw)).package.metadata.version }; "
+        "if (-not $v) { $src = 'registry'; "
+        "$v = ($uninstall | Where-Object { $_.DisplayName -like \"*$p*\" } | Select-Object -First 1).DisplayVersion }; "
+        "if (-not $v) { $v = '-'; $src = '-' }; "
+        "\"verify $($v -replace '\\s', '') $src $p\" }"
+    )
+
+
+def _linux_command(packages: List[str]) -> str:
+    return (
+        f"for p in {' '.join(packages)}; do "
+        "v=$(dpkg-query -W -f='${db:Status-Abbrev}${Version}\\n' \"$p\" 2>/dev/null | grep '^ii' | head -n 1); "
+        "case \"$v\" in ii*) echo \"verify ${v#ii } dpkg $p\";; *) echo \"verify - - $p\";; esac; "
+        "done"
+    )
+
+
+def adhoc_extra(os_name: str, payload: dict) -> Dict[str, str]:
+    """Job extra for a verify run. Raises ValueError with a user-facing message."""
+    if os_name == "windows":
+        choco = payload.get("choco_package", "").split()
+        app_name = payload.get("app_name", "").strip()
+        bad = [n for n in choco if not _CHOCO_ID_RE.match(n)]
+        packages = choco + ([app_name] if app_name else [])
+    else:
+        choco, app_name = [], ""
+        packages = payload.get("packages", "").split()
+        bad = [n for n in packages if not _DPKG_NAME_RE.match(n)]
+    if bad:
+        raise ValueError(f"Not a valid package name: {', '.join(bad)}")
+    if not packages:
+        raise ValueError("Enter at least one package to verify.")
+
+    command = _windows_command(choco, app_name) if os_name == "windows" else _linux_command(packages)
+    extra = {"command": command, "verify_packages": "\n".join(packages)}
+    version = payload.get("version", "").strip()
+    if version:
+        extra["verify_version"] = version
+    return extra
+
+
+def parse_output(text: str) -> Dict[str, Tuple[str, str]]:
+    """{package: (version or MISSING, source)} from a host's verify lines."""
+    found: Dict[str, Tuple[str, str]] = {}
+    for line in (text or "").splitlines():
+        m = _LINE_RE.match(line.strip())
+        if m:
+            version, source, name = m.groups()
+            found[name] = (version, source)
+    return found
+
+
+def matches(version: str, expected: str) -> bool:
+    """Whether `version` is `expected`, or a more specific release of it
+    ("1.2" matches "1.2.3" and "1.2-1ubuntu1", not "1.20")."""
+    if not expected:
+        return version != MISSING
+    if version == expected:
+        return True
+    return version.startswith(expected) and not version[len(expected)].isalnum()
+
+
+def collect(lines: Iterable[str], packages: List[str]) -> Tuple[Dict[str, Dict], Dict[str, adhoc.HostResult]]:
+    """({host: {package: (version, source)} or {"error": ...}}, adhoc results)."""
+    results = adhoc.collect_results(lines)
+    records: Dict[str, Dict] = {}
+    for host, r in results.items():
+        found = parse_output(r.output) if r.ok else {}
+        if r.ok and found:
+            records[host] = {name: found.get(name, (MISSING, MISSING)) for name in packages}
+        else:
+            records[host] = {"error": r.output.splitlines()[0] if r.output else "no output"}
+    return records, results
+
+
+# =============================================================================
+# Result cache
+# =============================================================================
+def save_results(project_root: str, records: Dict[str, Dict]):
+    """Merge each host's versions into its cache file (other packages stay)."""
+    os.makedirs(os.path.join(project_root, VERIFY_DIR), exist_ok=True)
+    now = time.time()
+    for ip, record in records.items():
+        if "error" in record:
+            continue
+        path = os.path.join(project_root, VERIFY_DIR, f"{ip}.json")
+        cached = _load(path)
+        for name, (version, source) in record.items():
+            cached[name] = {"version": version, "source": source, "ts": now}
+        try:
+            with open(path, "w") as f:
+                json.dump(cached, f, indent=2)
+        except OSError as e:
+            print(f"[VERIFY] Could not save {ip}: {e}")
+
+
+def _load(path: str) -> Dict:
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_results(project_root: str, ips: Iterable[str], package: str) -> Dict[str, Dict]:
+    """{ip: {"version", "source", "ts"}} for the hosts that checked `package`."""
+    found: Dict[str, Dict] = {}
+    for ip in ips:
+        entry = _load(os.path.join(project_root, VERIFY_DIR, f"{ip}.json")).get(package)
+        if isinstance(entry, dict):
+            found[ip] = entry
+    return found
+
+
+# =============================================================================
+# Presentation
+# =============================================================================
+def _age(seconds: float) -> str:
+    if seconds >= 86400:
+        return f"{int(seconds // 86400)}d"
+    if seconds >= 3600:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 60)}m"
+
+
+def last_seen_lines(project_root: str, ips: List[str], packages: List[str]) -> List[str]:
+    """What the cache says about each package on `ips`, for the run header."""
+    lines = []
+    now = time.time()
+    for name in packages:
+        cached = load_results(project_root, ips, name)
+        if not cached:
+            continue
+        versions: Dict[str, int] = {}
+        for entry in cached.values():
+            key = "missing" if entry.get("version") == MISSING else entry.get("version", "?")
+            versions[key] = versions.get(key, 0) + 1
+        newest = max(entry.get("ts", 0) for entry in cached.values())
+        counts = ", ".join(f"{v} ×{n}" for v, n in sorted(versions.items(), key=lambda i: -i[1]))
+        lines.append(f"{name}: {counts} ({len(cached)} host(s), newest {_age(now - newest)} ago)")
+    return lines
+
+
+def host_ok(record: Dict, expected: str = "") -> bool:
+    return "error" not in record and all(matches(v, expected) for v, _ in record.values())
+
+
+def summary_lines(records: Dict[str, Dict], results: Dict[str, adhoc.HostResult],
+                  packages: List[str], expected: str = "") -> List[str]:
+    """Hosts grouped by version per package, then a PLAY RECAP block in which
+    hosts without the package (or the expected version) count as failed."""
+    lines = ["", "VERIFY " + "*" * 64]
+    for name in packages:
+        groups: Dict[Tuple[str, str], List[str]] = {}
+        for host, record in records.items():
+            if "error" not in record:
+                groups.setdefault(record[name], []).append(host)
+        lines.append(f"{name}" + (f"  (expected {expected})" if expected else ""))
+        for (version, source), hosts in sorted(groups.items(), key=lambda g: -len(g[1])):
+            mark = "✓" if matches(version, expected) else "✗"
+            label = "not installed" if version == MISSING else f"{version} ({source})"
+            lines.append(f"  {mark} {label:<28} {len(hosts)} host(s): {', '.join(sorted(hosts))}")
+    failed = sorted(host for host, record in records.items() if "error" in record)
+    if failed:
+        lines.append(f"✗ {len(failed)} host(s) did not answer: {', '.join(failed)}")
+    verified = sum(host_ok(record, expected) for record in records.values())
+    lines.append(f"{verified} of {len(records)} host(s) verified")
+
+    recap = {
+        host: replace(r, ok=r.ok and host_ok(records.get(host, {"error": ""}), expected))
+        for host, r in results.items()
+    }
+    return lines + adhoc.recap_lines(recap)
+
+
+def host_notes(records: Dict[str, Dict], expected: str = "") -> Dict[str, str]:
+    """Per host, the versions found (shown as the PC card tooltip)."""
+    notes: Dict[str, str] = {}
+    for host, record in records.items():
+        if "error" in record:
+            notes[host] = f"✗ verify: {record['error']}"
+            continue
+        notes[host] = "\n".join(
+            f"{'✓' if matches(v, expected) else '✗'} {name} "
+            + ("not installed" if v == MISSING else f"{v} ({source})")
+            for name, (v, source) in record.items()
+        )
+    return notes
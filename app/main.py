@@ -2,6 +2,11 @@ import sys
 from PySide6.QtWidgets import QApplication, QMainWindow, QStackedWidget, QWidget, QVBoxLayout
 from core.inventory_manager import InventoryManager
 from core.app_state import AppState
+from core import journal
+from core.health import HEALTH_ACTION
+from core.power import POWER_ACTION
+from core.config import PULL_MODE
+from core.state_server import StateServer
 from ui.theme import get_qss
 from views.welcome_page import WelcomePage
 from views.lab_page import LabPage
@@ -51,6 +56,8 @@ class MainWindow(QMainWindow):
         self.lab.back_requested.connect(lambda: self.stack.setCurrentWidget(self.dashboard))
         self.lab.next_to_software.connect(self._go_software)
         self.lab.edit_lab_requested.connect(self._go_lab_edit)
+        self.lab.power_requested.connect(self._go_power)
+        self.lab.health_requested.connect(self._go_health)
 
         self.lab_edit.back_btn.clicked.connect(self._back_from_lab_edit)
         self.software.back_to_lab.connect(self._back_from_software)
@@ -72,6 +79,17 @@ class MainWindow(QMainWindow):
         self.software.on_page_show()
         self.stack.setCurrentWidget(self.software)
 
+    def _go_power(self, mode: str):
+        """Restart / shut down from the lab page: the Power form, preset."""
+        self.state.action = POWER_ACTION
+        self._go_software()
+        self.software.set_power_mode(mode)
+
+    def _go_health(self):
+        """Refresh the health snapshot from the lab page: the Health action."""
+        self.state.action = HEALTH_ACTION
+        self._go_software()
+
     def _go_lab_edit(self, lab_name: str):
         self.inventory_manager.reload()
         self.dashboard.refresh_labs()
@@ -93,17 +111,84 @@ class MainWindow(QMainWindow):
         self.stack.setCurrentWidget(self.lab)
 
     def _back_from_software(self):
+        self.lab.refresh_health()   # a health run may have left a new snapshot
         self.stack.setCurrentWidget(self.lab)
 
+    def reattach_jobs(self):
+        """
+        Pick up detached jobs an earlier session left behind (core.journal):
+        the newest running – or finished but unread – job opens on the
+        software page with the lab, targets and action it was started with.
+        """
+        pending = [r for r in journal.list_jobs() if r.state == "running" or r.unseen]
+        if not pending:
+            return
+        record = pending[0]
+        payloads = record.meta.get("payloads") or [{}]
+        self.state.current_lab = record.meta.get("lab") or self.state.current_lab
+        self.state.target_os = payloads[0].get("os", self.state.target_os)
+        self.state.action = payloads[0].get("action", self.state.action)
+        self.inventory_manager.reload()
+        self.lab.refresh_labs(self.state.current_lab or None)
+        self.state.selected_targets = [ip for p in payloads for ip in p.get("targets") or []]
+        self.software.reattach(record)
+        self.stack.setCurrentWidget(self.software)
+        for other in pending[1:]:
+            print(f"[JOBS] {other.job_id} ({other.state}) not attached: {other.describe()}")
+
     def _go_status_page(self, results: dict):
-        self.status_page.load_results(results)
+        self.status_page.load_results(results, self.software.timed_out_hosts, self.software.step_notes)
         self.stack.setCurrentWidget(self.status_page)
 
 def main():
+    # Headless worker mode: `main.py --worker` runs one job shard read from stdin
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        from core.distributed import run_worker
+        sys.exit(run_worker())
+
+    # Detached job runner: `main.py --run-job <id>` (started by the GUI)
+    if len(sys.argv) > 2 and sys.argv[1] == "--run-job":
+        sys.exit(journal.run_journal_job(sys.argv[2]))
+
+    # Offline throughput benchmark: `main.py --benchmark <lab> [5,10,20,40]`
+    if len(sys.argv) > 2 and sys.argv[1] == "--benchmark":
+        from core.autotune import run_benchmark
+        steps = [int(n) for n in sys.argv[3].split(",")] if len(sys.argv) > 3 else (5, 10, 20, 40, 80)
+        sys.exit(run_benchmark(sys.argv[2], steps))
+
+    # Headless scheduler: `main.py --scheduler [--once]` starts due schedules
+    if len(sys.argv) > 1 and sys.argv[1] == "--scheduler":
+        from core.scheduler import run_scheduler
+        sys.exit(run_scheduler(once="--once" in sys.argv[2:]))
+
+    # Rate-limited installer downloads (core.bandwidth), started on demand
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve-transfers":
+        from core.bandwidth import run_transfer_server
+        sys.exit(run_transfer_server())
+
+    # Wake-on-LAN test sink: `main.py --wol-sink [port]` prints magic packets
+    if len(sys.argv) > 1 and sys.argv[1] == "--wol-sink":
+        from core.config import WOL_PORT
+        from core.power import run_packet_sink
+        sys.exit(run_packet_sink(int(sys.argv[2]) if len(sys.argv) > 2 else WOL_PORT))
+
+    # Headless desired-state endpoint for pull agents
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve-state":
+        StateServer().serve_forever()
+        return
+
     app = QApplication(sys.argv)
     win = MainWindow()
     app.setStyleSheet(get_qss(win.state.theme))
+    if PULL_MODE:
+        try:
+            win.state_server = StateServer()
+            win.state_server.start()
+        except OSError as e:
+            print(f"[PULL] Could not start state server: {e}")
     win.show()
+    # Also after SYNC_DETACHED was switched off: its jobs may still be running
+    win.reattach_jobs()
     sys.exit(app.exec())
 
 
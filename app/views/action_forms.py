@@ -12,6 +12,19 @@ Windows  | update   | WinUpdateForm    – chocolatey update + Windows Update
 Linux    | install  | LinuxInstallForm – package name(s) + flags + cache
 Linux    | remove   | LinuxRemoveForm  – package name(s) + purge + autoremove
 Linux    | update   | LinuxUpdateForm  – packages OR dist-upgrade + cache
+Windows  | command  | WinCommandForm   – ad-hoc PowerShell line (win_shell)
+Linux    | command  | LinuxCommandForm – ad-hoc shell line (raw) + sudo
+Windows  | collect  | WinCollectForm   – path / glob + collection name
+Linux    | collect  | LinuxCollectForm – path / glob + collection name + sudo
+Both     | sync     | WinSyncForm / LinuxSyncForm – source folder + destination + mirror
+Windows  | stage    | WinStageForm     – installer file into the client cache
+Linux    | stage    | LinuxStageForm   – package(s) into the apt cache
+Both     | composite| WinCompositeForm / LinuxCompositeForm – ordered (action, packages) steps
+Windows  | transports | WinTransportsForm – benchmark SSH / WinRM / PSRP on sample PCs
+Both     | power    | WinPowerForm / LinuxPowerForm – restart or shut down (Wake-on-LAN is on the lab page)
+Both     | health   | WinHealthForm / LinuxHealthForm – snapshot shown on the lab grid
+Windows  | verify   | WinVerifyForm    – chocolatey / display name + expected version
+Linux    | verify   | LinuxVerifyForm  – package name(s) + expected version
 """
 
 import os as _os
@@ -406,6 +419,10 @@ class _BaseForm(QWidget):
         except ValidationError as e:
             self.validation_error.emit(str(e))
 
+    def collect(self) -> dict:
+        """Validated payload without emitting – raises ValidationError."""
+        return self._collect()
+
     def reset(self):
         pass
 
@@ -413,6 +430,9 @@ class _BaseForm(QWidget):
         raise NotImplementedError
 
 
+_REBOOT_LABEL = "Reboot if needed – staggered waves, then carry on"
+
+
 # ── Windows forms ─────────────────────────────────────────────────────────────
 
 class WinInstallForm(_BaseForm):
@@ -439,6 +459,7 @@ class WinInstallForm(_BaseForm):
         self.args_input = _field("/S  /quiet  /norestart")
         self._add("Silent Install Arguments  (optional – for local file only)", self.args_input)
 
+        self.reboot_cb = self._add_check(_REBOOT_LABEL)
         self._layout.addStretch()
 
     def _browse(self):
@@ -453,6 +474,7 @@ class WinInstallForm(_BaseForm):
         self.choco_input.clear()
         self.file_input.clear()
         self.args_input.clear()
+        self.reboot_cb.setChecked(False)
 
     def _collect(self) -> dict:
         choco = self.choco_input.text().strip()
@@ -464,7 +486,7 @@ class WinInstallForm(_BaseForm):
             "choco_package": choco,
             "file":          f,
             "args":          self.args_input.text().strip(),
-            "reboot":        False,
+            "reboot":        self.reboot_cb.isChecked(),
         }
 
 
@@ -478,11 +500,13 @@ class WinRemoveForm(_BaseForm):
         self.name_input = _field("e.g.  VLC media player")
         self._add("Application Display Name", self.name_input)
 
+        self.reboot_cb = self._add_check(_REBOOT_LABEL)
         self._layout.addStretch()
 
     def reset(self):
         self.choco_input.clear()
         self.name_input.clear()
+        self.reboot_cb.setChecked(False)
 
     def _collect(self) -> dict:
         choco = self.choco_input.text().strip()
@@ -493,7 +517,7 @@ class WinRemoveForm(_BaseForm):
             "os": "windows", "action": "remove",
             "choco_package": choco,
             "app_name":      name,
-            "reboot":        False,
+            "reboot":        self.reboot_cb.isChecked(),
         }
 
 
@@ -504,10 +528,12 @@ class WinUpdateForm(_BaseForm):
         self.choco_input = ChocoSearchField("e.g.  vlc  notepadplusplus  git")
         self._add("Chocolatey Package Name(s)", self.choco_input)
 
+        self.reboot_cb = self._add_check(_REBOOT_LABEL)
         self._layout.addStretch()
 
     def reset(self):
         self.choco_input.clear()
+        self.reboot_cb.setChecked(False)
 
     def _collect(self) -> dict:
         choco       = self.choco_input.text().strip()
@@ -518,7 +544,7 @@ class WinUpdateForm(_BaseForm):
             "action":       "update",
             "choco_package": choco,
             "upgrade_all":  False,
-            "reboot":       False,
+            "reboot":       self.reboot_cb.isChecked(),
         }
 
 
@@ -531,11 +557,13 @@ class LinuxInstallForm(_BaseForm):
         self._add("Package Name(s)", self.pkg_input)
         self.flags_input = _field("--no-install-recommends")
         self._add("Extra Flags  (optional)", self.flags_input)
+        self.reboot_cb = self._add_check(_REBOOT_LABEL)
         self._layout.addStretch()
 
     def reset(self):
         self.pkg_input.clear()
         self.flags_input.clear()
+        self.reboot_cb.setChecked(False)
 
     def _collect(self) -> dict:
         p = self.pkg_input.text().strip()
@@ -546,6 +574,7 @@ class LinuxInstallForm(_BaseForm):
             "packages":     p,
             "flags":        self.flags_input.text().strip(),
             "update_cache": True,
+            "reboot":       self.reboot_cb.isChecked(),
         }
 
 
@@ -554,10 +583,12 @@ class LinuxRemoveForm(_BaseForm):
         super().__init__()
         self.pkg_input     = _field("vlc  git")
         self._add("Package Name(s)", self.pkg_input)
+        self.reboot_cb = self._add_check(_REBOOT_LABEL)
         self._layout.addStretch()
 
     def reset(self):
         self.pkg_input.clear()
+        self.reboot_cb.setChecked(False)
 
     def _collect(self) -> dict:
         p = self.pkg_input.text().strip()
@@ -568,6 +599,7 @@ class LinuxRemoveForm(_BaseForm):
             "packages":   p,
             "purge":      False,
             "autoremove": True,
+            "reboot":     self.reboot_cb.isChecked(),
         }
 
 
@@ -576,10 +608,12 @@ class LinuxUpdateForm(_BaseForm):
         super().__init__()
         self.pkg_input = _field("firefox  libc6")
         self._add("Specific Package(s)", self.pkg_input)
+        self.reboot_cb = self._add_check(_REBOOT_LABEL)
         self._layout.addStretch()
 
     def reset(self):
         self.pkg_input.clear()
+        self.reboot_cb.setChecked(False)
 
     def _collect(self) -> dict:
         return {
@@ -587,9 +621,460 @@ class LinuxUpdateForm(_BaseForm):
             "dist_upgrade": False,
             "packages":     self.pkg_input.text().strip(),
             "update_cache": True,
+            "reboot":       self.reboot_cb.isChecked(),
+        }
+
+
+# ── Ad-hoc command forms ──────────────────────────────────────────────────────
+
+class WinCommandForm(_BaseForm):
+    def __init__(self):
+        super().__init__()
+        self.cmd_input = _field("Get-Process chrome | Stop-Process -Force")
+        self._add_with_hint(
+            "PowerShell Command", self.cmd_input,
+            "Runs once on every selected PC – no playbook, no fact gathering.",
+        )
+        self._layout.addStretch()
+
+    def reset(self):
+        self.cmd_input.clear()
+
+    def _collect(self) -> dict:
+        c = self.cmd_input.text().strip()
+        if not c:
+            raise ValidationError("Enter a command to run.")
+        return {"os": "windows", "action": "command", "command": c}
+
+
+class LinuxCommandForm(_BaseForm):
+    def __init__(self):
+        super().__init__()
+        self.cmd_input = _field("systemctl restart cups")
+        self._add_with_hint(
+            "Shell Command", self.cmd_input,
+            "Runs once on every selected PC – no playbook, no fact gathering.",
+        )
+        self.become_cb = self._add_check("Run with sudo")
+        self._layout.addStretch()
+
+    def reset(self):
+        self.cmd_input.clear()
+        self.become_cb.setChecked(False)
+
+    def _collect(self) -> dict:
+        c = self.cmd_input.text().strip()
+        if not c:
+            raise ValidationError("Enter a command to run.")
+        return {
+            "os": "linux", "action": "command",
+            "command": c,
+            "become":  self.become_cb.isChecked(),
+        }
+
+
+# ── Collect forms ─────────────────────────────────────────────────────────────
+
+class _CollectForm(_BaseForm):
+    OS_NAME = ""
+    PATH_HINT = ""
+
+    def __init__(self):
+        super().__init__()
+        self.path_input = _field(self.PATH_HINT)
+        self._add_with_hint(
+            "Path or Glob on the PCs", self.path_input,
+            "Packed on each PC and fetched in parallel into collected/<name>/<lab>/section/row/.",
+        )
+        self.name_input = _field("exam_logs  (default: file name + date)")
+        self._add_with_hint(
+            "Collection Name  (optional)", self.name_input,
+            "Re-using a name only transfers files that changed since the last run.",
+        )
+
+    def reset(self):
+        self.path_input.clear()
+        self.name_input.clear()
+
+    def _collect(self) -> dict:
+        p = self.path_input.text().strip()
+        if not p:
+            raise ValidationError("Enter a path or glob to collect.")
+        return {
+            "os": self.OS_NAME, "action": "collect",
+            "path": p,
+            "name": self.name_input.text().strip(),
+        }
+
+
+class WinCollectForm(_CollectForm):
+    OS_NAME = "windows"
+    PATH_HINT = "C:\\ExamLogs\\*.log"
+
+    def __init__(self):
+        super().__init__()
+        self._layout.addStretch()
+
+
+class LinuxCollectForm(_CollectForm):
+    OS_NAME = "linux"
+    PATH_HINT = "/var/log/exam/*.log"
+
+    def __init__(self):
+        super().__init__()
+        self.become_cb = self._add_check("Read with sudo")
+        self._layout.addStretch()
+
+    def reset(self):
+        super().reset()
+        self.become_cb.setChecked(False)
+
+    def _collect(self) -> dict:
+        return {**super()._collect(), "become": self.become_cb.isChecked()}
+
+
+# ── Content sync forms ────────────────────────────────────────────────────────
+
+class _SyncForm(_BaseForm):
+    OS_NAME = ""
+    DEST_HINT = ""
+
+    def __init__(self):
+        super().__init__()
+        self.src_input = _field("No folder selected…", read_only=True)
+        browse_btn = QPushButton("Browse…")
+        browse_btn.setObjectName("SecondaryBtn")
+        browse_btn.setFixedWidth(100)
+        browse_btn.clicked.connect(self._browse)
+        self._add_row("Source Folder  (on this controller)", self.src_input, browse_btn)
+
+        self.dest_input = _field(self.DEST_HINT)
+        self._add_with_hint(
+            "Destination on the PCs", self.dest_input,
+            "Only changed files are sent (rsync deltas on Linux, per-file checksums on Windows).",
+        )
+        self.mirror_cb = self._add_check("Mirror – delete files on the PCs that are not in the source")
+        self._layout.addStretch()
+
+    def _browse(self):
+        path = QFileDialog.getExistingDirectory(self, "Select Content Folder", _os.path.expanduser("~"))
+        if path:
+            self.src_input.setText(path)
+
+    def reset(self):
+        self.src_input.clear()
+        self.dest_input.clear()
+        self.mirror_cb.setChecked(False)
+
+    def _collect(self) -> dict:
+        src  = self.src_input.text().strip()
+        dest = self.dest_input.text().strip()
+        if not src:
+            raise ValidationError("Select a source folder.")
+        if not dest:
+            raise ValidationError("Enter the destination path on the PCs.")
+        return {
+            "os": self.OS_NAME, "action": "sync",
+            "source": src,
+            "dest":   dest,
+            "mirror": self.mirror_cb.isChecked(),
+        }
+
+
+class WinSyncForm(_SyncForm):
+    OS_NAME = "windows"
+    DEST_HINT = "C:\\Course\\CS101"
+
+
+class LinuxSyncForm(_SyncForm):
+    OS_NAME = "linux"
+    DEST_HINT = "/opt/course/cs101"
+
+
+# ── Pre-stage forms ───────────────────────────────────────────────────────────
+
+class WinStageForm(_BaseForm):
+    def __init__(self):
+        super().__init__()
+        self.file_input = _field("No file selected…", read_only=True)
+        browse_btn = QPushButton("Browse…")
+        browse_btn.setObjectName("SecondaryBtn")
+        browse_btn.setFixedWidth(100)
+        browse_btn.clicked.connect(self._browse)
+        self._add_row("Installer File  (.exe / .msi)", self.file_input, browse_btn)
+        self._layout.addWidget(_hint(
+            "Copied into the PCs' local cache now; a later Install of the same file skips the copy."
+        ))
+        self.peer_cb = self._add_check("Peer-assisted – seed a few PCs per section, they pass it on")
+        self._layout.addStretch()
+
+    def _browse(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select Installer", _os.path.expanduser("~"),
+            "Installers (*.exe *.msi);;All Files (*)"
+        )
+        if path:
+            self.file_input.setText(path)
+
+    def reset(self):
+        self.file_input.clear()
+        self.peer_cb.setChecked(False)
+
+    def _collect(self) -> dict:
+        f = self.file_input.text().strip()
+        if not f:
+            raise ValidationError("Select a local installer file to stage.")
+        return {"os": "windows", "action": "stage", "file": f, "peer": self.peer_cb.isChecked()}
+
+
+class LinuxStageForm(_BaseForm):
+    def __init__(self):
+        super().__init__()
+        self.pkg_input = _field("vlc  git  python3-pip")
+        self._add_with_hint(
+            "Package Name(s)", self.pkg_input,
+            "Downloaded into the apt cache only; a later Install doesn't download again.",
+        )
+        self._layout.addStretch()
+
+    def reset(self):
+        self.pkg_input.clear()
+
+    def _collect(self) -> dict:
+        p = self.pkg_input.text().strip()
+        if not p:
+            raise ValidationError("At least one package name is required.")
+        return {"os": "linux", "action": "stage", "packages": p}
+
+
+# ── Multi-step (composite) forms ──────────────────────────────────────────────
+
+class _CompositeForm(_BaseForm):
+    OS_NAME = ""
+    PKG_HINT = ""
+
+    def __init__(self):
+        super().__init__()
+        self.action_combo = QComboBox()
+        self.action_combo.addItems(["remove", "install", "update"])
+        self.action_combo.setStyleSheet("border-radius: 6px; padding: 5px 8px; font-size: 13px;")
+        self.pkg_input = _field(self.PKG_HINT)
+        self.pkg_input.returnPressed.connect(self._add_step)
+        add_btn = QPushButton("Add Step")
+        add_btn.setObjectName("SecondaryBtn")
+        add_btn.setFixedWidth(100)
+        add_btn.clicked.connect(self._add_step)
+        self._add_row("Step  (action + package(s))", self.action_combo, self.pkg_input, add_btn)
+
+        self.steps_list = QListWidget()
+        self.steps_list.setDragDropMode(QListWidget.InternalMove)
+        self.steps_list.setStyleSheet("border-radius: 6px; font-size: 13px;")
+        self.steps_list.setMinimumHeight(120)
+        self._add_with_hint(
+            "Steps  (run in this order)", self.steps_list,
+            "Drag to reorder. All steps run in one playbook run; a PC that fails a step skips the rest.",
+        )
+        remove_btn = QPushButton("Remove Selected Step")
+        remove_btn.setObjectName("SecondaryBtn")
+        remove_btn.clicked.connect(self._remove_step)
+        self._layout.addWidget(remove_btn)
+        self.reboot_cb = self._add_check(_REBOOT_LABEL)
+        self._layout.addStretch()
+
+    def _add_step(self):
+        pkgs = self.pkg_input.text().strip()
+        if not pkgs:
+            return
+        action = self.action_combo.currentText()
+        item = QListWidgetItem(f"{action}   {pkgs}")
+        item.setData(Qt.UserRole, {"action": action, "packages": pkgs})
+        self.steps_list.addItem(item)
+        self.pkg_input.clear()
+
+    def _remove_step(self):
+        for item in self.steps_list.selectedItems():
+            self.steps_list.takeItem(self.steps_list.row(item))
+
+    def reset(self):
+        self.pkg_input.clear()
+        self.steps_list.clear()
+        self.action_combo.setCurrentIndex(0)
+        self.reboot_cb.setChecked(False)
+
+    def _collect(self) -> dict:
+        steps = [self.steps_list.item(i).data(Qt.UserRole) for i in range(self.steps_list.count())]
+        if not steps:
+            raise ValidationError("Add at least one step.")
+        return {
+            "os": self.OS_NAME, "action": "composite",
+            "steps":  steps,
+            "reboot": self.reboot_cb.isChecked(),
+        }
+
+
+class WinCompositeForm(_CompositeForm):
+    OS_NAME = "windows"
+    PKG_HINT = "Chocolatey package(s), e.g.  jdk17"
+
+
+class LinuxCompositeForm(_CompositeForm):
+    OS_NAME = "linux"
+    PKG_HINT = "APT package(s), e.g.  openjdk-17-jdk"
+
+
+# ── Transport benchmark form ──────────────────────────────────────────────────
+
+class WinTransportsForm(_BaseForm):
+    def __init__(self):
+        super().__init__()
+        self.sample_combo = self._add_combo("Sample PCs", ["1", "2", "3", "5"])
+        self.sample_combo.setCurrentText("3")
+        self._layout.addWidget(_hint(
+            "The first selected PCs run the same tasks over SSH, WinRM (HTTP / HTTPS) and PSRP "
+            "– every transport that answers on its port."
+        ))
+        self.apply_cb = self._add_check("Save the fastest transport as this lab's profile")
+        self._layout.addStretch()
+
+    def reset(self):
+        self.sample_combo.setCurrentText("3")
+        self.apply_cb.setChecked(False)
+
+    def _collect(self) -> dict:
+        return {
+            "os": "windows", "action": "transports",
+            "sample": int(self.sample_combo.currentText()),
+            "apply": self.apply_cb.isChecked(),
+        }
+
+
+# ── Power forms ───────────────────────────────────────────────────────────────
+
+class _PowerForm(_BaseForm):
+    OS_NAME = ""
+    _MODES = [("restart", "Restart – wait until each PC is back"), ("shutdown", "Shut down")]
+
+    def __init__(self):
+        super().__init__()
+        self.mode_combo = self._add_combo("Power Action", [label for _, label in self._MODES])
+        self._layout.addWidget(_hint(
+            "Runs on every selected PC at once. PCs that are off can be woken from the "
+            "lab page (⏻ Power → Wake) if their MAC address is known."
+        ))
+        self._layout.addStretch()
+
+    def set_mode(self, mode: str):
+        keys = [key for key, _ in self._MODES]
+        if mode in keys:
+            self.mode_combo.setCurrentIndex(keys.index(mode))
+
+    def reset(self):
+        self.mode_combo.setCurrentIndex(0)
+
+    def _collect(self) -> dict:
+        return {
+            "os": self.OS_NAME, "action": "power",
+            "mode": self._MODES[self.mode_combo.currentIndex()][0],
+        }
+
+
+class WinPowerForm(_PowerForm):
+    OS_NAME = "windows"
+
+
+class LinuxPowerForm(_PowerForm):
+    OS_NAME = "linux"
+
+
+# ── Health snapshot forms ─────────────────────────────────────────────────────
+
+class _HealthForm(_BaseForm):
+    OS_NAME = ""
+
+    def __init__(self):
+        super().__init__()
+        self._layout.addWidget(_hint(
+            "Uptime, CPU load, free memory and disk, pending reboot and logged-in user "
+            "from every selected PC – one short command each, no playbook. The results "
+            "stay on the lab page's grid (🩺 Health)."
+        ))
+        self._layout.addStretch()
+
+    def _collect(self) -> dict:
+        return {"os": self.OS_NAME, "action": "health"}
+
+
+class WinHealthForm(_HealthForm):
+    OS_NAME = "windows"
+
+
+class LinuxHealthForm(_HealthForm):
+    OS_NAME = "linux"
+
+
+_VERIFY_HINT = (
+    "One quick query per PC, no playbook; results are grouped by version. "
+    "With a version, PCs on any other version count as failed – "
+    "\"1.2\" also accepts 1.2.x."
+)
+
+
+class WinVerifyForm(_BaseForm):
+    def __init__(self):
+        super().__init__()
+
+        self.choco_input = ChocoSearchField("e.g.  vlc  notepadplusplus  7zip  git")
+        self._add("Chocolatey Package Name(s)", self.choco_input)
+
+        self.name_input = _field("e.g.  VLC media player")
+        self._add_with_hint(
+            "Application Display Name  (optional)", self.name_input,
+            "For software not installed with Chocolatey – matched against Apps & features.",
+        )
+
+        self.version_input = _field("e.g.  3.0.20")
+        self._add_with_hint("Expected Version  (optional)", self.version_input, _VERIFY_HINT)
+        self._layout.addStretch()
+
+    def reset(self):
+        self.choco_input.clear()
+        self.name_input.clear()
+        self.version_input.clear()
+
+    def _collect(self) -> dict:
+        choco = self.choco_input.text().strip()
+        name  = self.name_input.text().strip()
+        if not choco and not name:
+            raise ValidationError("Enter a Chocolatey package name or an application display name.")
+        return {
+            "os": "windows", "action": "verify",
+            "choco_package": choco,
+            "app_name":      name,
+            "version":       self.version_input.text().strip(),
         }
 
 
+class LinuxVerifyForm(_BaseForm):
+    def __init__(self):
+        super().__init__()
+        self.pkg_input = _field("vlc  git  python3-pip")
+        self._add("Package Name(s)", self.pkg_input)
+        self.version_input = _field("e.g.  3.0.20")
+        self._add_with_hint("Expected Version  (optional)", self.version_input, _VERIFY_HINT)
+        self._layout.addStretch()
+
+    def reset(self):
+        self.pkg_input.clear()
+        self.version_input.clear()
+
+    def _collect(self) -> dict:
+        p = self.pkg_input.text().strip()
+        if not p:
+            raise ValidationError("At least one package name is required.")
+        return {"os": "linux", "action": "verify", "packages": p,
+                "version": self.version_input.text().strip()}
+
+
 # ── factory ───────────────────────────────────────────────────────────────────
 
 _REGISTRY = {
@@ -599,6 +1084,23 @@ _REGISTRY = {
     ("linux",   "install"): LinuxInstallForm,
     ("linux",   "remove"):  LinuxRemoveForm,
     ("linux",   "update"):  LinuxUpdateForm,
+    ("windows", "command"): WinCommandForm,
+    ("linux",   "command"): LinuxCommandForm,
+    ("windows", "collect"): WinCollectForm,
+    ("linux",   "collect"): LinuxCollectForm,
+    ("windows", "sync"):    WinSyncForm,
+    ("linux",   "sync"):    LinuxSyncForm,
+    ("windows", "stage"):   WinStageForm,
+    ("linux",   "stage"):   LinuxStageForm,
+    ("windows", "composite"): WinCompositeForm,
+    ("linux",   "composite"): LinuxCompositeForm,
+    ("windows", "transports"): WinTransportsForm,
+    ("windows", "power"):   WinPowerForm,
+    ("linux",   "power"):   LinuxPowerForm,
+    ("windows", "health"):  WinHealthForm,
+    ("linux",   "health"):  LinuxHealthForm,
+    ("windows", "verify"):  WinVerifyForm,
+    ("linux",   "verify"):  LinuxVerifyForm,
 }
 
 
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from PySide6.QtWidgets import (
+    QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QSpinBox,
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+
+from core.config import BW_GLOBAL
+from .dialog_base import BaseDialog, CloseButton
+
+
+class BandwidthDialog(BaseDialog):
+    """
+    Transfer-rate budgets for one lab and its sections (core.bandwidth).
+    0 = unlimited. get_result() -> (lab Mbit/s, {section: Mbit/s}) after accept.
+    """
+
+    def __init__(self, parent=None, lab_name: str = "", sections: int = 1,
+                 budgets: dict | None = None):
+        super().__init__(parent)
+        self.setObjectName("BandwidthDialog")
+        self._lab_name = lab_name
+        self._n_sections = max(1, sections)
+        self._budgets = budgets or {}
+        self._result: tuple[float, dict[str, float]] | None = None
+        self.setFixedSize(440, 300 + 44 * ((self._n_sections + 1) // 2))
+
+        self._build_ui()
+        self._finish_init()
+
+    def _build_ui(self):
+        self.setStyleSheet(self.BASE_QSS + """
+            QSpinBox {
+                background: #f8fafc; border: 1px solid #e2e8f0;
+                border-radius: 8px; padding: 0px 10px;
+                color: #0f172a; font-size: 13px; min-height: 34px;
+            }
+        """)
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(24, 20, 24, 20)
+        root.setSpacing(8)
+
+        # ── Header ────────────────────────────────────────────
+        hdr = QHBoxLayout()
+        hdr.setSpacing(12)
+        icon = QLabel("⇅")
+        icon.setFixedSize(32, 32)
+        icon.setAlignment(Qt.AlignCenter)
+        icon.setFont(QFont("Segoe UI", 16))
+
+        title_col = QVBoxLayout()
+        title_col.setSpacing(2)
+        title = QLabel("Bandwidth Budget")
+        title.setObjectName("DialogTitle")
+        cap = f"{BW_GLOBAL:g} Mbit/s" if BW_GLOBAL else "none"
+        subtitle = QLabel(f"{self._lab_name} · controller-wide cap: {cap}")
+        subtitle.setObjectName("DialogSubtitle")
+        title_col.addWidget(title)
+        title_col.addWidget(subtitle)
+
+        close_btn = CloseButton()
+        close_btn.setObjectName("CloseBtn")
+        close_btn.clicked.connect(self.reject)
+        hdr.addWidget(icon)
+        hdr.addLayout(title_col, 1)
+        hdr.addWidget(close_btn)
+        root.addLayout(hdr)
+        root.addSpacing(6)
+        root.addWidget(self._divider())
+        root.addSpacing(6)
+
+        # ── Lab budget ────────────────────────────────────────
+        root.addWidget(self._field_label("WHOLE LAB"))
+        self._lab_spin = self._spin(self._budgets.get("lab") or 0)
+        root.addWidget(self._lab_spin)
+
+        # ── Section budgets ───────────────────────────────────
+        root.addSpacing(4)
+        root.addWidget(self._field_label("PER SECTION"))
+        grid = QGridLayout()
+        grid.setHorizontalSpacing(10)
+        grid.setVerticalSpacing(6)
+        current = self._budgets.get("sections") or {}
+        self._section_spins: dict[str, QSpinBox] = {}
+        for i in range(self._n_sections):
+            key = str(i + 1)
+            row = QHBoxLayout()
+            lbl = QLabel(f"Section {key}")
+            lbl.setFixedWidth(70)
+            spin = self._spin(current.get(key) or 0)
+            row.addWidget(lbl)
+            row.addWidget(spin, 1)
+            grid.addLayout(row, i // 2, i % 2)
+            self._section_spins[key] = spin
+        root.addLayout(grid)
+
+        hint = QLabel("0 = unlimited. Hosts downloading at the same time share a budget evenly.")
+        hint.setObjectName("DialogSubtitle")
+        hint.setWordWrap(True)
+        root.addWidget(hint)
+
+        root.addStretch()
+        root.addWidget(self._divider())
+        root.addSpacing(6)
+
+        # ── Buttons ───────────────────────────────────────────
+        btn_row = QHBoxLayout()
+        btn_row.setSpacing(10)
+        btn_row.addStretch()
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.setObjectName("CancelBtn")
+        cancel_btn.setCursor(Qt.PointingHandCursor)
+        cancel_btn.setFixedSize(110, 36)
+        cancel_btn.clicked.connect(self.reject)
+        save_btn = QPushButton("Save")
+        save_btn.setObjectName("PrimaryBtn")
+        save_btn.setCursor(Qt.PointingHandCursor)
+        save_btn.setFixedSize(120, 36)
+        save_btn.clicked.connect(self._on_save)
+        btn_row.addWidget(cancel_btn)
+        btn_row.addWidget(save_btn)
+        root.addLayout(btn_row)
+
+    def _field_label(self, text: str) -> QLabel:
+        lbl = QLabel(text)
+        lbl.setObjectName("FieldLabel")
+        return lbl
+
+    def _spin(self, value: float) -> QSpinBox:
+        spin = QSpinBox()
+        spin.setRange(0, 100000)
+        spin.setSingleStep(10)
+        spin.setSuffix(" Mbit/s")
+        spin.setSpecialValueText("Unlimited")
+        spin.setValue(int(value))
+        return spin
+
+    def _on_save(self):
+        self._result = (
+            float(self._lab_spin.value()),
+            {k: float(s.value()) for k, s in self._section_spins.items() if s.value()},
+        )
+        self._dismiss(accepted=True)
+
+    def get_result(self) -> tuple[float, dict[str, float]] | None:
+        return self._result
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from PySide6.QtWidgets import (
+    QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QComboBox, QCheckBox, QDateTimeEdit, QListWidget, QListWidgetItem,
+)
+from PySide6.QtCore import Qt, QDateTime
+from PySide6.QtGui import QFont
+
+from core import scheduler
+from .dialog_base import BaseDialog, CloseButton
+
+_REPEATS = [("Once", ""), ("Daily", "daily"), ("Weekdays", "weekdays"), ("Weekly", "weekly")]
+
+
+class ScheduleDialog(BaseDialog):
+    """
+    Schedule the Software Manager's current job for later (core.scheduler).
+    Also edits the lab's maintenance windows and lists / removes the lab's
+    existing schedules. `schedule` holds the new entry after accept.
+    """
+
+    def __init__(self, parent=None, inventory_manager=None, lab: str = "",
+                 payloads: list[dict] | None = None):
+        super().__init__(parent)
+        self.setObjectName("ScheduleDialog")
+        self.setFixedSize(520, 560)
+
+        self.inventory_manager = inventory_manager
+        self._lab = lab
+        self._payloads = payloads or []
+        self.schedule: scheduler.Schedule | None = None
+
+        self._build_ui()
+        self._refresh_list()
+        self._finish_init()
+
+    def _build_ui(self):
+        self.setStyleSheet(self.BASE_QSS + """
+            QLabel#ErrorText { color: #dc2626; font-size: 11px; font-weight: 600; }
+            QComboBox, QDateTimeEdit {
+                background: #f8fafc; border: 1px solid #e2e8f0;
+                border-radius: 8px; padding: 0px 10px;
+                color: #0f172a; font-size: 13px; min-height: 36px;
+            }
+            QListWidget {
+                background: #f8fafc; border: 1px solid #e2e8f0;
+                border-radius: 8px; color: #1e293b; font-size: 12px;
+            }
+            QCheckBox { color: #1e293b; font-size: 12px; }
+        """)
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(24, 20, 24, 20)
+        root.setSpacing(8)
+
+        # ── Header ────────────────────────────────────────────
+        hdr = QHBoxLayout()
+        hdr.setSpacing(12)
+        icon = QLabel("🕒")
+        icon.setFixedSize(32, 32)
+        icon.setAlignment(Qt.AlignCenter)
+        icon.setFont(QFont("Segoe UI Emoji", 16))
+
+        title_col = QVBoxLayout()
+        title_col.setSpacing(2)
+        title = QLabel("Schedule Deployment")
+        title.setObjectName("DialogTitle")
+        hosts = sum(len(p.get("targets") or []) for p in self._payloads)
+        action = self._payloads[0].get("action", "?") if self._payloads else "?"
+        subtitle = QLabel(f"{action} on {hosts} host(s) in {self._lab}")
+        subtitle.setObjectName("DialogSubtitle")
+        title_col.addWidget(title)
+        title_col.addWidget(subtitle)
+
+        close_btn = CloseButton()
+        close_btn.setObjectName("CloseBtn")
+        close_btn.clicked.connect(self.reject)
+        hdr.addWidget(icon)
+        hdr.addLayout(title_col, 1)
+        hdr.addWidget(close_btn)
+        root.addLayout(hdr)
+        root.addSpacing(6)
+        root.addWidget(self._divider())
+        root.addSpacing(6)
+
+        # ── When ──────────────────────────────────────────────
+        row = QHBoxLayout()
+        row.setSpacing(10)
+        start_col = QVBoxLayout()
+        start_col.addWidget(self._field_label("START"))
+        self._start_edit = QDateTimeEdit(QDateTime(self._default_start()))
+        self._start_edit.setDisplayFormat("ddd yyyy-MM-dd HH:mm")
+        self._start_edit.setCalendarPopup(True)
+        start_col.addWidget(self._start_edit)
+        repeat_col = QVBoxLayout()
+        repeat_col.addWidget(self._field_label("REPEAT"))
+        self._repeat_combo = QComboBox()
+        for label, key in _REPEATS:
+            self._repeat_combo.addItem(label, key)
+        repeat_col.addWidget(self._repeat_combo)
+        row.addLayout(start_col, 3)
+        row.addLayout(repeat_col, 2)
+        root.addLayout(row)
+
+        # ── Maintenance windows ───────────────────────────────
+        root.addWidget(self._field_label("LAB MAINTENANCE WINDOWS"))
+        self._windows_edit = QLineEdit()
+        self._windows_edit.setPlaceholderText("Mon-Fri 22:00-06:00; Sat,Sun 00:00-24:00")
+        if self.inventory_manager:
+            self._windows_edit.setText("; ".join(self.inventory_manager.get_maintenance_windows(self._lab)))
+        root.addWidget(self._windows_edit)
+        self._window_check = QCheckBox("Only start inside a maintenance window")
+        self._window_check.setChecked(True)
+        root.addWidget(self._window_check)
+        hint = QLabel("PCs that are offline at start time are retried until the window closes.")
+        hint.setObjectName("DialogSubtitle")
+        hint.setWordWrap(True)
+        root.addWidget(hint)
+
+        # ── Existing schedules ────────────────────────────────
+        root.addSpacing(6)
+        root.addWidget(self._field_label("SCHEDULED FOR THIS LAB"))
+        self._list = QListWidget()
+        root.addWidget(self._list, 1)
+        remove_row = QHBoxLayout()
+        remove_row.addStretch()
+        self._remove_btn = QPushButton("Remove selected")
+        self._remove_btn.setObjectName("CancelBtn")
+        self._remove_btn.setCursor(Qt.PointingHandCursor)
+        self._remove_btn.setFixedHeight(30)
+        self._remove_btn.clicked.connect(self._remove_selected)
+        remove_row.addWidget(self._remove_btn)
+        root.addLayout(remove_row)
+
+        self._error_lbl = QLabel("")
+        self._error_lbl.setObjectName("ErrorText")
+        self._error_lbl.setWordWrap(True)
+        root.addWidget(self._error_lbl)
+        root.addWidget(self._divider())
+        root.addSpacing(6)
+
+        # ── Buttons ───────────────────────────────────────────
+        btn_row = QHBoxLayout()
+        btn_row.setSpacing(10)
+        btn_row.addStretch()
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.setObjectName("CancelBtn")
+        cancel_btn.setCursor(Qt.PointingHandCursor)
+        cancel_btn.setFixedSize(110, 36)
+        cancel_btn.clicked.connect(self.reject)
+        self._ok_btn = QPushButton("Schedule")
+        self._ok_btn.setObjectName("PrimaryBtn")
+        self._ok_btn.setCursor(Qt.PointingHandCursor)
+        self._ok_btn.setFixedSize(120, 36)
+        self._ok_btn.setEnabled(bool(self._payloads))
+        self._ok_btn.clicked.connect(self._confirm)
+        btn_row.addWidget(cancel_btn)
+        btn_row.addWidget(self._ok_btn)
+        root.addLayout(btn_row)
+
+    def _field_label(self, text: str) -> QLabel:
+        lbl = QLabel(text)
+        lbl.setObjectName("FieldLabel")
+        return lbl
+
+    @staticmethod
+    def _default_start() -> dt.datetime:
+        """Tonight at 22:00, or tomorrow's if that has passed."""
+        now = dt.datetime.now()
+        start = now.replace(hour=22, minute=0, second=0, microsecond=0)
+        return start if start > now else start + dt.timedelta(days=1)
+
+    def _refresh_list(self):
+        self._list.clear()
+        for s in scheduler.load_schedules():
+            if s.lab != self._lab:
+                continue
+            item = QListWidgetItem(s.describe())
+            item.setData(Qt.UserRole, s.schedule_id)
+            self._list.addItem(item)
+        self._remove_btn.setEnabled(self._list.count() > 0)
+
+    def _remove_selected(self):
+        item = self._list.currentItem()
+        if item and scheduler.remove_schedule(item.data(Qt.UserRole)):
+            self._refresh_list()
+
+    def _confirm(self):
+        specs = [s.strip() for s in self._windows_edit.text().split(";") if s.strip()]
+        try:
+            scheduler.parse_windows(specs)
+        except ValueError as e:
+            self._error_lbl.setText(str(e))
+            return
+        if self.inventory_manager and specs != self.inventory_manager.get_maintenance_windows(self._lab):
+            self.inventory_manager.set_maintenance_windows(self._lab, specs)
+
+        at = self._start_edit.dateTime().toSecsSinceEpoch()
+        repeat = self._repeat_combo.currentData()
+        if at < dt.datetime.now().timestamp() - 60 and not repeat:
+            self._error_lbl.setText("The start time is in the past.")
+            return
+        self.schedule = scheduler.add_schedule(
+            self._lab, self._payloads, float(at), repeat, self._window_check.isChecked(),
+        )
+        self._dismiss(accepted=True)
@@ -18,6 +18,7 @@ from .dialogs.bulk_ip_dialog import BulkIpDialog
 from .dialogs.add_pc_dialog import AddPcDialog
 from .dialogs.glass_messagebox import show_glass_message
 from .dialogs.edit_lab_dialog import EditLabDialog
+from .dialogs.bandwidth_dialog import BandwidthDialog
 
 import ipaddress
 
@@ -225,6 +226,13 @@ class LabEditPage(QWidget):
         self.edit_ip_btn.clicked.connect(self._edit_ip)
         actions.addWidget(self.edit_ip_btn)
 
+        self.bandwidth_btn = QPushButton("⇅ Bandwidth")
+        self.bandwidth_btn.setObjectName("ActionButton")
+        self.bandwidth_btn.setCursor(Qt.PointingHandCursor)
+        self.bandwidth_btn.setFixedHeight(38)
+        self.bandwidth_btn.clicked.connect(self._edit_bandwidth)
+        actions.addWidget(self.bandwidth_btn)
+
         actions.addStretch()
         footer_layout.addLayout(actions, 2)
 
@@ -784,6 +792,21 @@ class LabEditPage(QWidget):
         else:
             show_glass_message(self, "IP Error", "Invalid or duplicate IP", icon=QMessageBox.Warning)
 
+    def _edit_bandwidth(self):
+        if not self.state.current_lab:
+            show_glass_message(self, "No Lab", "Load a lab first.", icon=QMessageBox.Warning)
+            return
+        lab = self.state.current_lab
+        layout = self.inventory_manager.get_lab_layout(lab) or {}
+        dlg = BandwidthDialog(
+            self, lab_name=lab, sections=layout.get("sections", 1),
+            budgets=self.inventory_manager.get_lab_bandwidth(lab),
+        )
+        if dlg.exec() != QDialog.Accepted or not dlg.get_result():
+            return
+        lab_mbit, sections = dlg.get_result()
+        self.inventory_manager.set_lab_bandwidth(lab, lab_mbit, sections)
+
     def _add_edit_lab_button(self):
         """Add edit lab button to the header (call this in _build_ui)"""
         # Find where the header is built and add this button after the lab combo
@@ -5,14 +5,18 @@ from PySide6.QtWidgets import (
     QFrame, QScrollArea, QComboBox, QGridLayout, QSizePolicy,
     QMessageBox, QApplication, QDialog, QMenu
 )
-from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtCore import Qt, Signal, QTimer, QThread
 from PySide6.QtGui import QFont, QColor, QPalette
 
 from .dialogs.edit_pc_ip_dialog import EditPcIpDialog
 from .dialogs.glass_messagebox import show_glass_message
 from .dialogs.confirm_delete_dialog import ConfirmDeleteDialog
 from .widgets.pc_card import PcCard
+from core import autotune, health, power
+from core.config import AUTOTUNE
+from core.job_builder import get_project_root
 from core.ping_service import check_many
+from core.prewarm import get_pool
 
 
 class LabPage(QWidget):
@@ -20,6 +24,8 @@ class LabPage(QWidget):
     next_to_software = Signal()
     edit_lab_requested = Signal(str)
     delete_lab_requested = Signal(str)
+    power_requested = Signal(str)   # "restart" | "shutdown" – runs from the Software Manager
+    health_requested = Signal()     # refresh the health snapshot from the Software Manager
 
     def __init__(self, inventory_manager, state=None):
         super().__init__()
@@ -36,6 +42,15 @@ class LabPage(QWidget):
         self.part_frames = []
         self.part_grids = []
 
+        # Pre-warm SSH connections once the selection settles (core/prewarm.py)
+        self._prewarm_timer = QTimer(self)
+        self._prewarm_timer.setSingleShot(True)
+        self._prewarm_timer.setInterval(800)
+        self._prewarm_timer.timeout.connect(self._prewarm_selection)
+
+        self._wake_worker = None
+        self._show_health = True   # health snapshot overlay on the grid (core.health)
+
         self._build_ui()
         self._apply_styles()
         
@@ -149,6 +164,20 @@ class LabPage(QWidget):
         actions.addWidget(self.check_status_btn)
         # ─────────────────────────────────────────────────────────────────
 
+        self.power_btn = QPushButton("⏻ Power")
+        self.power_btn.setObjectName("ActionButton")
+        self.power_btn.setCursor(Qt.PointingHandCursor)
+        self.power_btn.setFixedHeight(38)
+        self.power_btn.clicked.connect(self._open_power_menu)
+        actions.addWidget(self.power_btn)
+
+        self.health_btn = QPushButton("🩺 Health")
+        self.health_btn.setObjectName("ActionButton")
+        self.health_btn.setCursor(Qt.PointingHandCursor)
+        self.health_btn.setFixedHeight(38)
+        self.health_btn.clicked.connect(self._open_health_menu)
+        actions.addWidget(self.health_btn)
+
         self.edit_lab_btn = QPushButton("✏️ Edit Lab")
         self.edit_lab_btn.setObjectName("ActionButton")
         self.edit_lab_btn.setCursor(Qt.PointingHandCursor)
@@ -494,6 +523,7 @@ class LabPage(QWidget):
             c = pc["col"] - 1
             grid.addWidget(card, r, c, alignment=Qt.AlignCenter)
 
+        self.refresh_health()
         self._update_footer()
 
     def _open_select_menu(self):
@@ -546,6 +576,19 @@ class LabPage(QWidget):
         if self.state:
             self.state.selected_targets = list(self.selected_pcs)
             self.state.current_lab = self.current_lab
+        if self.selected_pcs:
+            self._prewarm_timer.start()
+
+    def _prewarm_selection(self):
+        """Open connections to the selected PCs, and probe them, in the background."""
+        default = getattr(self.state, "target_os", "windows")
+        hosts = {
+            pc["ip"]: pc.get("os") or default
+            for pc in self.pcs if pc.get("ip") in self.selected_pcs
+        }
+        get_pool().warm(hosts)
+        if AUTOTUNE:
+            autotune.probe_async(list(hosts))   # reachability for the next run's forks
 
     def _on_lab_changed(self, lab_name: str):
         """Handle lab selection change"""
@@ -568,6 +611,7 @@ class LabPage(QWidget):
         self.selected_pcs.clear()
         self._render_lab()
         self.lab_subtitle.setText(f"Managing: {lab_name}")
+        self.refresh_health()
 
     def _edit_lab(self):
         """Edit current lab"""
@@ -650,6 +694,11 @@ class LabPage(QWidget):
         ips = list(self.cards_by_ip.keys())
         results = check_many(ips)
 
+        # Online PCs just answered a ping: their MACs are in the ARP cache now
+        online = [ip for ip, (ok, _) in results.items() if ok]
+        if online:
+            self.inventory_manager.set_pc_macs(power.arp_macs(online))
+
         for ip, (ok, os_type) in results.items():
             card = self.cards_by_ip.get(ip)
 
@@ -665,3 +714,123 @@ class LabPage(QWidget):
             else:
                 card.clear_status()
     # ─────────────────────────────────────────────────────────────────────
+
+    # ── Health snapshot overlay (core.health) ─────────────────────────────
+    def refresh_health(self):
+        """Badge every card from the cached snapshot; summary in the subtitle."""
+        if not self.current_lab or not self.cards_by_ip:
+            return
+        ips = list(self.cards_by_ip)
+        if not self._show_health:
+            for card in self.cards_by_ip.values():
+                card.clear_health()
+            self.lab_subtitle.setText(f"Managing: {self.current_lab}")
+            return
+        snapshot = health.load_snapshot(get_project_root(), ips)
+        for ip, card in self.cards_by_ip.items():
+            record = snapshot.get(ip)
+            card.set_health(health.assess(record), health.describe(record) if record else "")
+        text = f"Managing: {self.current_lab}"
+        if snapshot:
+            text += " · " + health.lab_summary(snapshot, ips)
+        self.lab_subtitle.setText(text)
+
+    def _open_health_menu(self):
+        menu = QMenu(self)
+        a_show = menu.addAction("Show health on the grid")
+        a_show.setCheckable(True)
+        a_show.setChecked(self._show_health)
+        a_refresh = menu.addAction("Refresh for the selected PCs…")
+        a_refresh.setEnabled(bool(self.selected_pcs))
+
+        act = menu.exec(self.health_btn.mapToGlobal(self.health_btn.rect().bottomLeft()))
+        if act == a_show:
+            self._show_health = a_show.isChecked()
+            self.refresh_health()
+        elif act == a_refresh:
+            self.health_requested.emit()
+
+    # ── Power: Wake-on-LAN here, restart / shut down via the Software Manager ─
+    def _open_power_menu(self):
+        if not self.selected_pcs:
+            show_glass_message(self, "No PCs", "Select the PCs first.", QMessageBox.Information)
+            return
+
+        menu = QMenu(self)
+        a_wake = menu.addAction("Wake selected")
+        a_wake_deploy = menu.addAction("Wake selected, then deploy to the PCs that come up")
+        menu.addSeparator()
+        a_restart = menu.addAction("Restart selected…")
+        a_shutdown = menu.addAction("Shut down selected…")
+        a_wake.setEnabled(self._wake_worker is None)
+        a_wake_deploy.setEnabled(self._wake_worker is None)
+
+        act = menu.exec(self.power_btn.mapToGlobal(self.power_btn.rect().bottomLeft()))
+        if act in (a_wake, a_wake_deploy):
+            self._wake_selected(then_deploy=act == a_wake_deploy)
+        elif act == a_restart:
+            self.power_requested.emit("restart")
+        elif act == a_shutdown:
+            self.power_requested.emit("shutdown")
+
+    def _wake_selected(self, then_deploy: bool):
+        pcs = [pc for pc in self.pcs if pc.get("ip") in self.selected_pcs]
+        transport = self.inventory_manager.get_lab_transport(self.current_lab)
+        default = getattr(self.state, "target_os", "windows")
+
+        self._wake_worker = _WakeWorker(pcs, transport, default)
+        self._wake_worker.host_ready.connect(self._on_host_ready)
+        self._wake_worker.done.connect(lambda result: self._on_wake_done(result, then_deploy))
+        self.power_btn.setEnabled(False)
+        self.power_btn.setText("⏻ Waking…")
+        self.lab_subtitle.setText(f"Waking {len(pcs)} PC(s) in {self.current_lab}…")
+        self._wake_worker.start()
+
+    def _on_host_ready(self, ip: str):
+        card = self.cards_by_ip.get(ip)
+        pc = next((pc for pc in self.pcs if pc.get("ip") == ip), {})
+        if card:
+            if pc.get("os") == "linux":
+                card.set_status_linux()
+            else:
+                card.set_status_windows()
+
+    def _on_wake_done(self, result: "power.WakeResult", then_deploy: bool):
+        self._wake_worker = None
+        self.power_btn.setEnabled(True)
+        self.power_btn.setText("⏻ Power")
+        self.refresh_health()
+        for ip in result.down + result.no_mac:
+            card = self.cards_by_ip.get(ip)
+            if card:
+                card.set_status_offline()
+
+        if not then_deploy:
+            show_glass_message(self, "Wake-on-LAN", result.describe(), QMessageBox.Information)
+            return
+        # Deploy only to what actually came up
+        for ip in list(self.selected_pcs):
+            if ip not in result.up:
+                self._unselect_pc(ip)
+        if not self.selected_pcs:
+            show_glass_message(self, "Wake-on-LAN", f"No PC came up: {result.describe()}", QMessageBox.Warning)
+            return
+        print(f"[POWER] Wake then deploy: {result.describe()}")
+        self.next_to_software.emit()
+
+
+class _WakeWorker(QThread):
+    """Runs power.wake() off the GUI thread."""
+
+    host_ready = Signal(str)
+    done = Signal(object)   # power.WakeResult
+
+    def __init__(self, pcs: list[dict], transport: str, default_os: str):
+        super().__init__()
+        self.pcs = pcs
+        self.transport = transport
+        self.default_os = default_os
+
+    def run(self):
+        result = power.wake(self.pcs, self.transport, self.default_os, on_ready=self.host_ready.emit)
+        self.done.emit(result)
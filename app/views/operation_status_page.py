@@ -9,6 +9,7 @@ from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont, QColor, QPalette
 
 from .widgets.pc_card import PcCard
+from core.state_server import AgentReportStore
 
 
 class OperationStatusPage(QWidget):
@@ -19,6 +20,9 @@ class OperationStatusPage(QWidget):
         self.inventory_manager = inventory_manager
         self.state = state
         self._results: dict[str, bool] = {}
+        self._timed_out: set[str] = set()
+        self._notes: dict[str, str] = {}
+        self._source = "push"   # "push" = last execution, "agents" = pull agent reports
         self._build_ui()
 
     # =========================================================================
@@ -56,13 +60,22 @@ class OperationStatusPage(QWidget):
         title_col.addWidget(self._sub_lbl)
         header.addLayout(title_col, 1)
 
+        self.agent_btn = QPushButton("📡 Agent Reports")
+        self.agent_btn.setFixedHeight(38)
+        self.agent_btn.setObjectName("BackBtn")
+        self.agent_btn.setCursor(Qt.PointingHandCursor)
+        self.agent_btn.setToolTip("Show the latest results reported by pull agents in this lab")
+        self.agent_btn.clicked.connect(self.load_agent_reports)
+        header.addWidget(self.agent_btn)
+
         root.addLayout(header)
 
         # ── Legend ────────────────────────────────────────────────────────
         legend = QHBoxLayout()
         legend.setSpacing(20)
         legend.addStretch()
-        for color, text in [("#22c55e", "Success"), ("#ef4444", "Failed"), ("#9F9F9F", "Not targeted")]:
+        for color, text in [("#22c55e", "Success"), ("#ef4444", "Failed"),
+                            ("#f59e0b", "Timed out / cancelled"), ("#9F9F9F", "Not targeted")]:
             dot = QLabel("●")
             dot.setStyleSheet(f"color: {color}; font-size: 16px; background: transparent;")
             lbl = QLabel(text)
@@ -108,6 +121,8 @@ class OperationStatusPage(QWidget):
         self._success_lbl.setStyleSheet("color: #15803d; font-size: 14px; font-weight: 700; background: transparent;")
         self._failed_lbl  = QLabel("✗  0 failed")
         self._failed_lbl.setStyleSheet("color: #dc2626; font-size: 14px; font-weight: 700; background: transparent;")
+        self._timeout_lbl = QLabel("⏱  0 stopped")
+        self._timeout_lbl.setStyleSheet("color: #b45309; font-size: 14px; font-weight: 700; background: transparent;")
         self._skipped_lbl = QLabel("—  0 not targeted")
         self._skipped_lbl.setStyleSheet("color: #94a3b8; font-size: 14px; font-weight: 600; background: transparent;")
 
@@ -116,6 +131,8 @@ class OperationStatusPage(QWidget):
         footer_layout.addSpacing(32)
         footer_layout.addWidget(self._failed_lbl)
         footer_layout.addSpacing(32)
+        footer_layout.addWidget(self._timeout_lbl)
+        footer_layout.addSpacing(32)
         footer_layout.addWidget(self._skipped_lbl)
         footer_layout.addStretch()
 
@@ -124,12 +141,30 @@ class OperationStatusPage(QWidget):
     # =========================================================================
     # Public API — called before showing this page
     # =========================================================================
-    def load_results(self, results: dict[str, bool]):
+    def load_results(self, results: dict[str, bool], timed_out=(), notes=None):
         """
         results: { ip: True/False }  True = success, False = failed
+        timed_out: failed IPs stopped by a deadline or a cancel (shown amber)
+        notes: { ip: text } shown as the card tooltip (per-step outcome of
+               composite jobs)
         All other PCs in the lab are shown in normal grey.
         """
         self._results = results
+        self._timed_out = set(timed_out)
+        self._notes = dict(notes or {})
+        self._source = "push"
+        self._render()
+
+    def load_agent_reports(self):
+        """Show the latest pull-agent convergence result for every reporting PC."""
+        lab = self.state.current_lab
+        if not lab:
+            return
+        store = AgentReportStore()
+        self._results = store.results_for_lab(lab)
+        self._timed_out = set()
+        self._notes = {}
+        self._source = "agents"
         self._render()
 
     # =========================================================================
@@ -155,19 +190,27 @@ class OperationStatusPage(QWidget):
             return
 
         n_success = sum(1 for v in self._results.values() if v)
-        n_failed  = sum(1 for v in self._results.values() if not v)
+        n_timeout = sum(1 for ip, v in self._results.items() if not v and ip in self._timed_out)
+        n_failed  = sum(1 for v in self._results.values() if not v) - n_timeout
         n_skipped = len(all_pcs) - len(targeted)
 
         self._success_lbl.setText(f"✓  {n_success} succeeded")
         self._failed_lbl.setText(f"✗  {n_failed} failed")
+        self._timeout_lbl.setText(f"⏱  {n_timeout} stopped")
         self._skipped_lbl.setText(f"—  {n_skipped} not targeted")
 
-        action  = self.state.action.upper()
-        os_name = self.state.target_os.upper()
-        self._sub_lbl.setText(
-            f"{action} / {os_name}  ·  "
-            f"{len(targeted)} targeted  ·  Lab: {lab}"
-        )
+        if self._source == "agents":
+            self._sub_lbl.setText(
+                f"PULL AGENTS  ·  {len(targeted)} reporting  ·  Lab: {lab}"
+            )
+        else:
+            action  = self.state.action.upper()
+            oses    = {pc.get("os") for pc in all_pcs if pc["ip"] in targeted}
+            os_name = "MIXED" if len(oses) > 1 else self.state.target_os.upper()
+            self._sub_lbl.setText(
+                f"{action} / {os_name}  ·  "
+                f"{len(targeted)} targeted  ·  Lab: {lab}"
+            )
 
         self._wrap_layout.addStretch(1)
 
@@ -211,9 +254,13 @@ class OperationStatusPage(QWidget):
                 if ip in self._results:
                     if self._results[ip]:
                         card.set_status_online()   # green = success
+                    elif ip in self._timed_out:
+                        card.set_status_timeout()  # amber = deadline hit / cancelled
                     else:
                         card.set_status_offline()  # red   = failed
                 # else: stays normal grey = not targeted
+                if ip in self._notes:
+                    card.setToolTip(self._notes[ip])
 
                 r = pc["row"] - 1
                 c = pc["col"] - 1
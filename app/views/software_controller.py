@@ -2,48 +2,58 @@
 from __future__ import annotations
 
 import os
-import sys
 from typing import Callable
 
-from core.ansible_worker import AnsibleWorker
-
-
-# Playbook routing map — (os, action) -> playbook filename
-_PLAYBOOK_MAP = {
-    ("windows", "install"): "playbooks/windows_install.yml",
-    ("windows", "remove"):  "playbooks/windows_remove.yml",
-    ("windows", "update"):  "playbooks/windows_update.yml",
-    ("linux",   "install"): "playbooks/linux_install.yml",
-    ("linux",   "remove"):  "playbooks/linux_remove.yml",
-    ("linux",   "update"):  "playbooks/linux_update.yml",
-}
-
-
-def _get_project_root() -> str:
-    if getattr(sys, "frozen", False):
-        exe_dir = os.path.dirname(sys.executable)
-        project_root = os.path.abspath(os.path.join(exe_dir, ".."))
-    else:
-        here = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.abspath(os.path.join(here, "..", ".."))
-
-    ansible_dir = os.path.join(project_root, "ansible")
-    if not os.path.exists(ansible_dir):
-        print(f"[WARNING] ansible/ folder not found at: {project_root}")
-
-    return project_root
+from PySide6.QtCore import QTimer
+
+from core import adhoc, bandwidth, composite, health, journal, reboot, transports, verify
+from core.collect import COLLECT_ACTION, output_dir
+from core.fanout import CONTROLLER
+from core.ansible_worker import AnsibleWorker, JournalTailWorker
+from core.autotune import AutoTuner, RunMonitor
+from core.config import (
+    AUTOTUNE, CANCEL_POLICY, DETACHED_JOBS, JOB_DEADLINE, PULL_MODE, WORKER_NODES,
+)
+from core.distributed import ShardedAnsibleWorker
+from core.executors import get_executor
+from core.inventory_manager import DESIRED_STATE_ACTIONS
+from core.job_builder import (
+    JobError, allows_reboot, get_project_root, inventory_rel_path, plan_workers,
+    prepare_jobs, write_temp_inventory,
+)
 
 
 class SoftwareController:
-    def __init__(self, log_panel, progress_bar, execute_btn, state):
+    def __init__(self, log_panel, progress_bar, execute_btn, state, inventory_manager=None):
         self.log_panel    = log_panel
         self.progress_bar = progress_bar
         self.execute_btn  = execute_btn
         self.state        = state
-        self._worker: AnsibleWorker | None = None
-        self._last_payload: dict | None = None
+        self.inventory_manager = inventory_manager
+        self._worker: AnsibleWorker | ShardedAnsibleWorker | JournalTailWorker | None = None
+        self._tmp_inv: str | None = None
+        self._cancel_policy: str | None = None
+        self._stopping: list = []   # cancelled workers still tearing down in the background
+        self._last_payloads: list[dict] = []
         self._log_lines: list[str] = []
         self._in_recap: bool = False
+        self._tuner = AutoTuner() if AUTOTUNE else None
+        self._monitor: RunMonitor | None = None
+        self._adhoc: bool = False
+        self._composite_jobs: list = []       # composite jobs of the running batch
+        self._bench_jobs: list = []           # transport benchmarks of the running batch
+        self._reboots = False                 # the running batch may reboot hosts
+        self._health = False                  # health snapshot: cache per host, show a table
+        self._verify_jobs: list = []          # verify runs: versions grouped, cached per host
+        self._bench_lab: str | None = None
+        self._desired_jobs: list = []         # pull mode: (os, action, extra) of install / update / remove runs to record on success
+        self.step_notes: dict[str, str] = {}  # ip -> per-step outcome of the last composite run
+        self._tune_keys: list[tuple] = []     # (lab, os_name, forks, targets) per running job
+        # Live transfer rates while budgeted downloads run (core.bandwidth)
+        self._metered: bool = False
+        self._rate_timer = QTimer()
+        self._rate_timer.setInterval(1000)
+        self._rate_timer.timeout.connect(self._show_rates)
         # Set by SoftwarePage to receive (ok, log_lines) after execution
         self._on_execution_finished_callback: Callable | None = None
 
@@ -51,14 +61,79 @@ class SoftwareController:
     # Public API called by SoftwarePage
     # =========================================================================
     def run(self, payload: dict):
-        self._last_payload = payload
+        self.run_many([payload])
+
+    def run_many(self, payloads: list[dict]):
+        """One payload per OS – a mixed selection runs both jobs concurrently."""
+        self._last_payloads = payloads
         self._log_lines = []
         self._in_recap = False
         self.log_panel.clear()
-        self._run_ansible(payload)
+        self._run_ansible(payloads)
+
+    def reattach(self, record: journal.JobRecord):
+        """
+        Follow a detached job an earlier session started (see core.journal).
+        The journal is replayed from the start so the recap, composite and
+        ad-hoc summaries see the whole run; a marker shows where that
+        session stopped reading.
+        """
+        if self._worker and self._worker.isRunning():
+            return
+        jobs = journal.load_jobs(record.job_id)
+        self._last_payloads = record.meta.get("payloads") or []
+        self._log_lines = []
+        self._in_recap = False
+        self._adhoc = bool(jobs) and all(job.adhoc for job in jobs)
+        self._composite_jobs = [job for job in jobs if job.steps]
+        self._bench_jobs = [job for job in jobs if job.action == transports.TRANSPORT_BENCH_ACTION]
+        self._reboots = any(allows_reboot(job) for job in jobs)
+        self._health = any(job.action == health.HEALTH_ACTION for job in jobs)
+        self._verify_jobs = [job for job in jobs if job.action == verify.VERIFY_ACTION]
+        self._bench_lab = record.meta.get("lab")
+        self._desired_jobs = self._desired_state_jobs(jobs, self._bench_lab)
+        self._metered = self._is_metered(jobs)
+        self.step_notes = {}
+        self._tune_keys = []
+        self._monitor = None   # the start was not observed, nothing to learn from
+        self.log_panel.clear()
+        self.log_panel.append_line(
+            f"↻ Reattached to job {record.job_id} ({record.state}): {record.describe()}", "dim"
+        )
+        self.log_panel.append_line(f"  Journal  : {journal.job_dir(record.job_id)}", "dim")
+        self.log_panel.append_line("", "dim")
+
+        seen = record.seen
+        self._worker = JournalTailWorker(record.job_id, mark=seen)
+        if seen:
+            self._worker.caught_up.connect(
+                lambda: self.log_panel.append_line("──── output since the last session ────", "dim")
+            )
+        self._start_worker()
+
+    def cancel(self):
+        """
+        First click applies SYNC_CANCEL_POLICY; a second click (or the abort
+        policy) stops everything at once and frees the slot immediately –
+        the process tree and container are torn down in the background.
+        """
+        worker = self._worker
+        if worker is None or not worker.isRunning():
+            return
+        policy = "abort" if self._cancel_policy else CANCEL_POLICY
+        self._cancel_policy = policy
+        worker.cancel(policy)
+        if policy != "abort":
+            self.log_panel.cancel_btn.setText("■ Force Stop")
+            return
+        worker.output_received.disconnect()
+        worker.finished.disconnect()
+        self._stopping.append(worker)
+        worker.finished.connect(lambda _ok, w=worker: self._stopping.remove(w))
+        self._on_execution_finished(ok=False)
 
     def retry(self):
-        if self._last_payload is None:
+        if not self._last_payloads:
             return
         self._log_lines = []
         self._in_recap = False
@@ -66,228 +141,215 @@ class SoftwareController:
         self.execute_btn.setEnabled(False)
         self.execute_btn.setText("Executing...")
         self.log_panel.clear()
-        self._run_ansible(self._last_payload)
+        self._run_ansible(self._last_payloads)
 
     # =========================================================================
     # Internal logic
     # =========================================================================
-    def _run_ansible(self, payload: dict):
-        os_name = payload.get("os", self.state.target_os)
-        action  = payload.get("action", self.state.action)
-        targets = payload.get("targets", self.state.selected_targets)
-
-        project_root = _get_project_root()
-        ssh_dir      = os.path.expanduser("~/.ssh")
-        vault_pass   = os.path.expanduser("~/.ansible_vault_pass")
-        sw_repo      = os.path.join(project_root, "software_repo")
-
-        target_host = "windows_clients" if os_name == "windows" else "linux_clients"
-        extra: dict[str, str] = {
-            "target_host": target_host,
-        }
-
-        # ── Windows Install ───────────────────────────────────────────────────
-        if action == "install" and os_name == "windows":
-            choco_pkg = payload.get("choco_package", "").strip()
-            file_path = payload.get("file", "").strip()
-
-            if not choco_pkg and not file_path:
+    def _run_ansible(self, payloads: list[dict]):
+        if self._worker and self._worker.isRunning():
+            self.log_panel.append_line(
+                "⚠ A task is already running. Wait for it to finish.", "error"
+            )
+            return
+
+        project_root = get_project_root()
+        lab = payloads[0].get("lab") or self.state.current_lab
+
+        try:
+            jobs = prepare_jobs(
+                payloads, lab, self.inventory_manager, project_root,
+                self.state.target_os, self.state.action, self.state.selected_targets,
+            )
+        except JobError as e:
+            self.log_panel.append_line(f"✗ {e}", "error")
+            self._on_execution_finished(ok=False)
+            return
+
+        for job in jobs:
+            n_staged = sum(1 for hv in job.host_vars.values() if hv.get("staged") == "true")
+            if n_staged:
                 self.log_panel.append_line(
-                    "✗ Enter a Chocolatey package name or select a local installer file.", "error"
+                    f"  Staged   : {n_staged}/{len(job.targets)} host(s) install from their local cache", "dim"
                 )
-                self._on_execution_finished(ok=False)
-                return
 
-            if choco_pkg:
-                extra["choco_package"] = choco_pkg
-            else:
-                file_name = os.path.basename(file_path)
-                extra["file_name"] = file_name
-                self._ensure_in_repo(file_path, sw_repo)
-                if payload.get("args", "").strip():
-                    extra["custom_install_args"] = payload["args"].strip()
-
-        # ── Windows Remove ────────────────────────────────────────────────────
-        elif action == "remove" and os_name == "windows":
-            choco_pkg = payload.get("choco_package", "").strip()
-            app_name  = payload.get("app_name", "").strip()
-
-            if not choco_pkg and not app_name:
+        executor = get_executor()
+        available, reason = executor.is_available()
+        if not available:
+            self.log_panel.append_line(
+                f"✗ Executor '{executor.name}' unavailable: {reason}", "error"
+            )
+            self._on_execution_finished(ok=False)
+            return
+
+        self._adhoc = all(job.adhoc for job in jobs)
+        self._composite_jobs = [job for job in jobs if job.steps]
+        self._bench_jobs = [job for job in jobs if job.action == transports.TRANSPORT_BENCH_ACTION]
+        self._reboots = any(allows_reboot(job) for job in jobs)
+        self._health = any(job.action == health.HEALTH_ACTION for job in jobs)
+        self._verify_jobs = [job for job in jobs if job.action == verify.VERIFY_ACTION]
+        self._bench_lab = lab
+        self._desired_jobs = self._desired_state_jobs(jobs, lab)
+        self._metered = self._is_metered(jobs)
+        self.step_notes = {}
+        total     = sum(len(job.targets) for job in jobs)
+        n_procs, sharded = plan_workers(jobs)
+
+        self._tune_keys = []
+        if self._tuner:
+            self._monitor = RunMonitor()
+
+        for job in jobs:
+            # ── Concurrency: forks chosen from controller headroom + lab history
+            tune = None
+            if self._tuner:
+                tune = self._tuner.decide(lab, job.os_name, job.targets)
+                job.forks = tune.forks
+                if sharded and not WORKER_NODES:
+                    # Local worker processes share this controller's budget
+                    share = max(1, round(n_procs * len(job.targets) / total))
+                    job.forks = max(1, tune.forks * len(job.targets) // total // share)
+                self._tune_keys.append((lab, job.os_name, tune.forks, list(job.targets)))
+
+            tool = "ansible (ad-hoc)" if job.adhoc else "ansible-playbook"
+            self.log_panel.append_line(
+                f"▶ {tool}  [{job.action.upper()} / {job.os_name.upper()}]"
+                f"  →  {len(job.targets)} host(s)", "dim"
+            )
+            self.log_panel.append_line(f"  Hosts    : {', '.join(job.targets)}", "dim")
+            if job.action == health.HEALTH_ACTION:
                 self.log_panel.append_line(
-                    "✗ Enter a Chocolatey package name or an application display name.", "error"
+                    "  Command  : health snapshot – uptime, CPU, memory, disk, reboot, user", "dim"
+                )
+            elif job.action == verify.VERIFY_ACTION:
+                packages = job.extra["verify_packages"].split("\n")
+                expected = job.extra.get("verify_version")
+                self.log_panel.append_line(
+                    f"  Verify   : {', '.join(packages)}" + (f" at {expected}" if expected else ""), "dim"
+                )
+                for line in verify.last_seen_lines(get_project_root(), job.targets, packages):
+                    self.log_panel.append_line(f"  Last seen: {line}", "dim")
+            elif job.adhoc:
+                self.log_panel.append_line(f"  Command  : {job.extra['command']}", "dim")
+            elif job.steps:
+                self.log_panel.append_line(f"  Playbook : {job.playbook}", "dim")
+                for i, step in enumerate(job.steps, 1):
+                    self.log_panel.append_line(f"  Step {i}   : {composite.describe(step)}", "dim")
+            elif job.action == transports.TRANSPORT_BENCH_ACTION:
+                self.log_panel.append_line(f"  Playbook : {job.playbook}", "dim")
+                self.log_panel.append_line(
+                    f"  Compare  : {job.extra['bench_transports'].replace(',', ', ')}", "dim"
                 )
-                self._on_execution_finished(ok=False)
-                return
-
-            if choco_pkg:
-                extra["choco_package"] = choco_pkg
             else:
-                extra["app_name"] = app_name
-
-        # ── Windows Update ────────────────────────────────────────────────────
-        elif action == "update" and os_name == "windows":
-            choco_pkg = payload.get("choco_package", "").strip()
-            if not choco_pkg:
+                self.log_panel.append_line(f"  Playbook : {job.playbook}", "dim")
+                self.log_panel.append_line(f"  Vars     : {job.extra_vars_str()}", "dim")
+            if job.extra.get("fanout") == "true":
+                seeds = sum(1 for hv in job.host_vars.values() if hv.get("fanout_parent") == CONTROLLER)
                 self.log_panel.append_line(
-                    "✗ Enter a Chocolatey package name or tick 'Upgrade ALL'.", "error"
+                    f"  Fan-out  : {seeds} seed(s) from controller, "
+                    f"{job.extra['fanout_waves']} wave(s) peer to peer", "dim"
                 )
+            if job.action == COLLECT_ACTION:
+                self.log_panel.append_line(
+                    f"  Output   : {output_dir(project_root, job.extra['collect_job'])}", "dim"
+                )
+            paced = sum(1 for hv in job.host_vars.values() if "transfer_url" in hv)
+            if paced:
+                self.log_panel.append_line(
+                    f"  Bandwidth: {paced} host(s) download within the lab's budget", "dim"
+                )
+            limits = [int(hv["transfer_kbps"]) for hv in job.host_vars.values() if "transfer_kbps" in hv]
+            if limits:
+                self.log_panel.append_line(
+                    f"  Bandwidth: rsync limited to {min(limits)}–{max(limits)} KB/s per host", "dim"
+                )
+            if allows_reboot(job):
+                self.log_panel.append_line(
+                    f"  Reboots  : if pending, {job.extra['reboot_waves']} staggered wave(s)", "dim"
+                )
+            if job.transport:
+                self.log_panel.append_line(f"  Transport: {job.transport} (lab profile)", "dim")
+            if tune:
+                self.log_panel.append_line(f"  Forks    : {tune.summary()}", "dim")
+        self.log_panel.append_line(f"  Executor : {executor.name}", "dim")
+        if sharded:
+            self.log_panel.append_line(f"  Workers  : {n_procs}", "dim")
+
+        # ── Detached: a background runner journals the run (core.journal) ────
+        if DETACHED_JOBS:
+            meta = {"lab": lab, "payloads": payloads}
+            try:
+                job_id = journal.start(jobs, n_procs, executor.name, JOB_DEADLINE, meta)
+            except OSError as e:
+                self.log_panel.append_line(f"✗ Could not start detached job: {e}", "error")
                 self._on_execution_finished(ok=False)
                 return
-            extra["choco_package"] = choco_pkg
-
-        # ── Linux Install ─────────────────────────────────────────────────────
-        elif action == "install" and os_name == "linux":
-            pkgs = payload.get("packages", "").strip()
-            if not pkgs:
-                self.log_panel.append_line("✗ No packages specified.", "error")
-                self._on_execution_finished(ok=False)
-                return
-            extra["package_name"] = pkgs
+            self.log_panel.append_line(f"  Journal  : {journal.job_dir(job_id)}", "dim")
+            self.log_panel.append_line("", "dim")
+            self._worker = JournalTailWorker(job_id)
+            self._start_worker()
+            return
+        self.log_panel.append_line("", "dim")
 
-        # ── Linux Remove ──────────────────────────────────────────────────────
-        elif action == "remove" and os_name == "linux":
-            pkgs = payload.get("packages", "").strip()
-            if not pkgs:
-                self.log_panel.append_line("✗ No packages specified.", "error")
-                self._on_execution_finished(ok=False)
-                return
-            extra["package_name"] = pkgs
-            extra["purge"]        = "true" if payload.get("purge", False) else "false"
-            extra["autoremove"]   = "true" if payload.get("autoremove", True) else "false"
-
-        # ── Linux Update ──────────────────────────────────────────────────────
-        elif action == "update" and os_name == "linux":
-            dist_upgrade = payload.get("dist_upgrade", False)
-            pkgs         = payload.get("packages", "").strip()
-            extra["dist_upgrade"] = "true" if dist_upgrade else "false"
-            if pkgs and not dist_upgrade:
-                extra["package_name"] = pkgs
-
-        # ── Resolve playbook ──────────────────────────────────────────────────
-        playbook = _PLAYBOOK_MAP.get((os_name, action))
-        if not playbook:
-            self.log_panel.append_line(
-                f"✗ No playbook defined for {os_name} / {action}.", "error"
-            )
-            self._on_execution_finished(ok=False)
+        # ── Sharded / multi-OS run: each worker writes its own temp inventory ─
+        if sharded:
+            self._worker = ShardedAnsibleWorker(jobs, n_procs, executor.name, deadline=JOB_DEADLINE)
+            self._start_worker()
             return
 
         # ── Write temp inventory ──────────────────────────────────────────────
-        tmp_inv = self._write_temp_inventory(
-            project_root, targets, os_name, target_host
+        job = jobs[0]
+        tmp_inv = write_temp_inventory(
+            project_root, job.targets, job.group,
+            host_vars=job.host_vars, group_vars=job.inventory_vars(),
         )
         if tmp_inv is None:
             self.log_panel.append_line("✗ Could not write temporary inventory.", "error")
             self._on_execution_finished(ok=False)
             return
 
-        inv_container_path = "/app/ansible/inventory/_sync_tmp_inventory.ini"
-        ev_str = " ".join(f"{k}={v}" for k, v in extra.items())
+        exec_cmd = job.command(executor, project_root, inventory_rel_path())
 
-        self.log_panel.append_line(
-            f"▶ ansible-playbook  [{action.upper()} / {os_name.upper()}]"
-            f"  →  {len(targets)} host(s)", "dim"
+        self._tmp_inv = tmp_inv
+        self._worker = AnsibleWorker(
+            exec_cmd.args, cwd=exec_cmd.cwd, env=exec_cmd.env, deadline=JOB_DEADLINE,
+            container=exec_cmd.container,
         )
-        self.log_panel.append_line(f"  Hosts    : {', '.join(targets)}", "dim")
-        self.log_panel.append_line(f"  Playbook : {playbook}", "dim")
-        self.log_panel.append_line(f"  Vars     : {ev_str}", "dim")
-        self.log_panel.append_line("", "dim")
+        self._start_worker()
 
-        cmd = [
-            "docker", "run", "--rm",
-            "-v", f"{project_root}:/app",
-            "-v", f"{ssh_dir}:/root/.ssh:ro",
-        ]
-
-        if action == "install" and os_name == "windows" and extra.get("file_name"):
-            cmd += ["-v", f"{sw_repo}:/app/software_repo"]
-
-        if os_name == "linux" and os.path.exists(vault_pass):
-            cmd += ["-v", f"{vault_pass}:/vault_pass:ro"]
-
-        cmd += [
-            "-w", "/app/ansible",
-            "sync-ansible:latest",
-            "ansible-playbook",
-            "-i", inv_container_path,
-            playbook,
-            "-e", ev_str,
-        ]
-
-        if os_name == "linux" and os.path.exists(vault_pass):
-            cmd += ["--vault-password-file=/vault_pass"]
-
-        if self._worker and self._worker.isRunning():
-            self.log_panel.append_line(
-                "⚠ A task is already running. Wait for it to finish.", "error"
-            )
-            return
-
-        self._worker = AnsibleWorker(cmd)
+    def _start_worker(self):
+        self._cancel_policy = None
         self._worker.output_received.connect(self._on_ansible_line)
-        self._worker.finished.connect(
-            lambda ok: self._on_execution_finished(ok, tmp_inv)
-        )
+        self._worker.finished.connect(lambda ok: self._on_execution_finished(ok))
+        self.log_panel.cancel_btn.setText("■ Cancel")
+        self.log_panel.cancel_btn.show()
+        if self._metered:
+            self._rate_timer.start()
         self._worker.start()
 
     @staticmethod
-    def _write_temp_inventory(
-        project_root: str,
-        targets: list[str],
-        os_name: str,
-        group: str,
-    ) -> str | None:
-
-        ansible_dir = os.path.join(project_root, "ansible")
-        real_inv    = os.path.join(ansible_dir, "inventory", "hosts.ini")
-        inv_dir     = os.path.join(ansible_dir, "inventory")
-        os.makedirs(inv_dir, exist_ok=True)
-        tmp_path    = os.path.join(inv_dir, "_sync_tmp_inventory.ini")
-
-        group_vars_lines: list[str] = []
-        if os.path.exists(real_inv):
-            with open(real_inv, "r") as f:
-                in_vars = False
-                for line in f:
-                    stripped = line.strip()
-                    if stripped == f"[{group}:vars]":
-                        in_vars = True
-                        group_vars_lines.append(line)
-                        continue
-                    if in_vars:
-                        if stripped.startswith("["):
-                            in_vars = False
-                        else:
-                            group_vars_lines.append(line)
-        else:
-            print(f"[SoftwarePage] WARNING: hosts.ini not found at {real_inv}")
+    def _is_metered(jobs: list) -> bool:
+        return any("transfer_url" in hv for job in jobs for hv in job.host_vars.values())
 
-        try:
-            with open(tmp_path, "w") as f:
-                f.write(f"[{group}]\n")
-                for ip in targets:
-                    f.write(f"{ip}\n")
-                f.write("\n")
-                for line in group_vars_lines:
-                    f.write(line)
-            return tmp_path
-        except OSError as e:
-            print(f"[SoftwarePage] Failed to write temp inventory: {e}")
-            return None
-
-    @staticmethod
-    def _ensure_in_repo(src_path: str, repo_dir: str):
-        import shutil
-        os.makedirs(repo_dir, exist_ok=True)
-        dst = os.path.join(repo_dir, os.path.basename(src_path))
-        if not os.path.exists(dst):
-            try:
-                shutil.copy2(src_path, dst)
-            except OSError as e:
-                print(f"[SoftwarePage] Could not copy installer to repo: {e}")
+    def _show_rates(self):
+        rates = bandwidth.fetch_rates()
+        if not rates or not rates["hosts"]:
+            self.log_panel.rate_lbl.hide()
+            return
+        hosts = rates["hosts"]
+        self.log_panel.rate_lbl.setText(
+            f"⇅ {rates['total'] * 8 / 1e6:.1f} Mbit/s · {len(hosts)} download(s)"
+        )
+        tip = [f"{lab or 'other'}: {bps * 8 / 1e6:.1f} Mbit/s" for lab, bps in rates["labs"].items()]
+        for ip, h in sorted(hosts.items())[:12]:
+            tip.append(f"  {ip}  {h['bps'] * 8 / 1e6:5.1f} Mbit/s  {h['sent'] * 100 // max(1, h['size'])}%")
+        self.log_panel.rate_lbl.setToolTip("\n".join(tip))
+        self.log_panel.rate_lbl.show()
 
     def _on_ansible_line(self, line: str):
         self._log_lines.append(line)
+        if self._monitor:
+            self._monitor.feed(line)
         low = line.lower()
 
         if "play recap" in low:
@@ -312,6 +374,13 @@ class SoftwareController:
                 self.log_panel.append_line(line, "error")
             return
 
+        if self._adhoc:
+            result = adhoc.parse_line(line)
+            if result or line.startswith(("✓", "✗")):
+                ok = result.ok if result else line.startswith("✓")
+                self.log_panel.append_line(line, "success" if ok else "error")
+                return
+
         if low.startswith("ok:") or low.startswith("changed:"):
             self.log_panel.append_line(line, "success")
         elif any(kw in low for kw in ("fatal:", "error", "failed!", "unreachable")):
@@ -321,18 +390,118 @@ class SoftwareController:
         else:
             self.log_panel.append_line(line, "normal")
 
-    def _on_execution_finished(self, ok: bool, tmp_inv: str | None = None):
+    def _desired_state_jobs(self, jobs: list, lab: str | None) -> list:
+        """(os, action, extra) per install / update / remove run, in order –
+        a composite job contributes each of its steps."""
+        if not (PULL_MODE and self.inventory_manager and lab):
+            return []
+        runs = []
+        for job in jobs:
+            for step in (job.steps or [{"action": job.action, "extra": job.extra}]):
+                if step["action"] in DESIRED_STATE_ACTIONS:
+                    runs.append((job.os_name, step["action"], step.get("extra", {})))
+        return runs
+
+    def _record_desired_state(self):
+        lab = self._bench_lab
+        updated = set()
+        for os_name, action, extra in self._desired_jobs:
+            pkgs = (extra.get("choco_package") or extra.get("package_name") or "").split()
+            if pkgs and self.inventory_manager.record_desired_packages(lab, os_name, action, pkgs):
+                updated.add(os_name)
+        for os_name in sorted(updated):
+            self.log_panel.append_line(
+                f"  Desired state updated for {os_name} pull agents in {lab}", "dim"
+            )
+
+    def _on_execution_finished(self, ok: bool):
+        tmp_inv, self._tmp_inv = self._tmp_inv, None
         if tmp_inv and os.path.exists(tmp_inv):
             try:
                 os.remove(tmp_inv)
             except OSError:
                 pass
+        self.log_panel.cancel_btn.hide()
+        self._rate_timer.stop()
+        self.log_panel.rate_lbl.hide()
+        if self._adhoc:
+            # Group identical outputs and add the recap the results page reads
+            if self._health:
+                records, results = health.collect(self._log_lines)
+                health.save_snapshot(get_project_root(), records)
+                summary = health.summary_lines(records, results) if results else []
+            elif self._verify_jobs:
+                # Hosts grouped by version; missing / other versions fail the recap
+                summary = []
+                for job in self._verify_jobs:
+                    packages = job.extra["verify_packages"].split("\n")
+                    expected = job.extra.get("verify_version", "")
+                    records, results = verify.collect(self._log_lines, packages)
+                    records = {h: r for h, r in records.items() if h in job.targets}
+                    results = {h: r for h, r in results.items() if h in job.targets}
+                    verify.save_results(get_project_root(), records)
+                    if results:
+                        summary += verify.summary_lines(records, results, packages, expected)
+                    self.step_notes.update(verify.host_notes(records, expected))
+            else:
+                results = adhoc.collect_results(self._log_lines)
+                summary = adhoc.summary_lines(results) if results else []
+            for line in summary:
+                self._on_ansible_line(line)
+            self._adhoc = False
+            self._health = False
+            self._verify_jobs = []
+        # Composite: break the single run down per step and per host
+        for job in self._composite_jobs:
+            results = composite.step_results(self._log_lines, len(job.steps), job.targets)
+            for line in composite.summary_lines(job.steps, results):
+                self._on_ansible_line(line)
+            self.step_notes.update(composite.host_notes(job.steps, results))
+        self._composite_jobs = []
+        # Coordinated reboots: how long each host was down
+        if self._reboots:
+            results = reboot.reboot_results(self._log_lines)
+            for line in reboot.summary_lines(results):
+                self._on_ansible_line(line)
+            for ip, note in reboot.host_notes(results).items():
+                self.step_notes[ip] = f"{self.step_notes[ip]}\n{note}" if ip in self.step_notes else note
+            self._reboots = False
+        # Transport benchmark: time per transport, the fastest optionally kept
+        for job in self._bench_jobs:
+            results = transports.bench_results(self._log_lines)
+            for line in transports.summary_lines(results):
+                self._on_ansible_line(line)
+            best = transports.fastest(results)
+            if best:
+                self._on_ansible_line(f"Fastest transport: {best}")
+            if best and job.extra.get("bench_apply") == "true" and not self._cancel_policy:
+                if self.inventory_manager and self.inventory_manager.set_lab_transport(self._bench_lab, best):
+                    self.log_panel.append_line(
+                        f"  Saved as the connection profile for {self._bench_lab}", "dim"
+                    )
+        self._bench_jobs = []
+        # ── Pull mode: a successful push also becomes the lab's desired state
+        if ok and not self._cancel_policy:
+            self._record_desired_state()
+        self._desired_jobs = []
+        if self._monitor:
+            # A cancelled run says nothing about the lab's capacity
+            if not self._cancel_policy:
+                for lab, os_name, forks, targets in self._tune_keys:
+                    self._tuner.record(lab, os_name, forks, self._monitor, targets)
+            self._monitor.stop()
+        self._monitor = None
+        self._tune_keys = []
         self.progress_bar.set_step("done", failed=not ok)
         self.log_panel.set_status(ok)
-        self.log_panel.append_line(
-            "Execution completed successfully." if ok else "Execution failed.",
-            "success" if ok else "error",
-        )
+        if self._cancel_policy:
+            self.log_panel.append_line("Execution cancelled.", "error")
+        else:
+            self.log_panel.append_line(
+                "Execution completed successfully." if ok else "Execution failed.",
+                "success" if ok else "error",
+            )
+        self._cancel_policy = None
         self.execute_btn.setEnabled(True)
         self.execute_btn.setText("Execute →")
         self._worker = None
@@ -6,16 +6,20 @@ from PySide6.QtWidgets import (
     QStackedWidget, QSizePolicy, QScrollArea, QRadioButton, QButtonGroup,
     QFileDialog,
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtGui import QColor, QPalette
 
-from views.action_forms import get_form
+from views.action_forms import ValidationError, get_form
 from views.software_theme import _t, _STEPS, _ACTIONS
 from views.software_widgets import StepProgressBar, LogPanel
 from views.software_controller import SoftwareController
+from views.dialogs.schedule_dialog import ScheduleDialog
+from core.ansible_worker import CANCEL_MARKER, TIMEOUT_MARKER
+from core.os_detect import PROBE_ACTIONS, classify_targets, detect_many, undetected
 
 import os
 import re
+from typing import Callable
 
 
 # =============================================================================
@@ -31,12 +35,17 @@ class SoftwarePage(QWidget):
         self.state = state
         self._form_cache: dict[tuple[str, str], QWidget] = {}
         self._execution_results: dict[str, bool] = {}
+        self.timed_out_hosts: set[str] = set()
+        self.step_notes: dict[str, str] = {}   # ip -> per-step outcome (composite jobs)
+        self._detect_worker: _DetectWorker | None = None
+        self._detect_next: tuple | None = None   # (callback, targets, re-enable Execute) waiting for the OS probe
         self._build_ui()
         self._controller = SoftwareController(
             log_panel=self.log_panel,
             progress_bar=self.progress_bar,
             execute_btn=self.execute_btn,
             state=self.state,
+            inventory_manager=self.inventory_manager,
         )
         # Hook into controller to receive log lines after execution
         self._controller._on_execution_finished_callback = self._on_execution_done
@@ -162,6 +171,21 @@ class SoftwarePage(QWidget):
         )
         self.execute_btn.clicked.connect(self._on_execute_clicked)
         left_layout.addWidget(self.execute_btn)
+
+        self.schedule_btn = QPushButton("🕒 Schedule…")
+        self.schedule_btn.setObjectName("ScheduleBtn")
+        self.schedule_btn.setCursor(Qt.PointingHandCursor)
+        self.schedule_btn.setToolTip("Run this job later – e.g. in the lab's maintenance window")
+        self.schedule_btn.setStyleSheet(
+            "QPushButton#ScheduleBtn {"
+            "   background: transparent; color: #2563eb; border: 1px solid #bfdbfe;"
+            "   border-radius: 8px; padding: 8px 24px;"
+            "   font-size: 13px; font-weight: 600;"
+            "}"
+            "QPushButton#ScheduleBtn:hover { background: #eff6ff; }"
+        )
+        self.schedule_btn.clicked.connect(self._on_schedule_clicked)
+        left_layout.addWidget(self.schedule_btn)
         left_layout.addStretch()
 
         left_scroll.setWidget(left_panel)
@@ -178,6 +202,7 @@ class SoftwarePage(QWidget):
         self.log_panel = LogPanel()
         rw_layout.addWidget(self.log_panel)
         self.log_panel.retry_btn.clicked.connect(self._on_retry)
+        self.log_panel.cancel_btn.clicked.connect(lambda: self._controller.cancel())
         self.log_panel.new_task_btn.clicked.connect(self._on_new_task)
         self.log_panel.export_btn.clicked.connect(self._on_export_log)
         self.log_panel.view_results_btn.clicked.connect(self._on_view_results)
@@ -292,14 +317,116 @@ class SoftwarePage(QWidget):
             )
             return
         self._execution_results = {}
+        self.timed_out_hosts = set()
+        self.step_notes = {}
         self.log_panel.view_results_btn.setEnabled(True)
         self.progress_bar.set_step("executing")
         self.execute_btn.setEnabled(False)
         self.execute_btn.setText("Executing...")
+
+        self._classify_then(self._execute_groups)
+
+    def _execute_groups(self, groups: dict[str, list[str]]):
+        # Mixed selection: one job per OS, each built from that OS's form
+        if set(groups) != {self.state.target_os}:
+            self._run_split(groups)
+            return
+
         form = self._form_cache.get(self._current_key())
         if form:
             form.submit()
 
+    def _classify_then(self, callback: Callable[[dict], None]):
+        """
+        Group the selection by OS, then call `callback(groups)`. Hosts whose
+        OS was never detected are probed on a worker thread first, and only
+        for actions whose playbooks differ per OS (os_detect.PROBE_ACTIONS).
+        """
+        if self._detect_worker is not None:
+            # Both buttons are disabled while detecting, so this is a stray
+            # click – never leave the Execute button stuck on "Executing..."
+            self.log_panel.append_line("  Still detecting the OS of the selection – try again in a moment.", "dim")
+            if callback == self._execute_groups:
+                self.progress_bar.set_step("configure")
+                self.execute_btn.setText("Execute →")
+            return
+        targets = list(self.state.selected_targets)
+        to_probe = undetected(self.inventory_manager, targets) if self.state.action in PROBE_ACTIONS else []
+        if not to_probe:
+            callback(classify_targets(self.inventory_manager, targets, self.state.target_os))
+            return
+
+        self.log_panel.append_line(f"  Detecting the OS of {len(to_probe)} PC(s)…", "dim")
+        # Schedule must not leave Execute clickable (and vice versa) while the
+        # probe runs; Execute stays disabled when it started the detection
+        restore_execute = self.execute_btn.isEnabled()
+        self.schedule_btn.setEnabled(False)
+        self.execute_btn.setEnabled(False)
+        self._detect_next = (callback, targets, restore_execute)
+        self._detect_worker = _DetectWorker(to_probe)
+        self._detect_worker.done.connect(self._on_os_detected)
+        self._detect_worker.finished.connect(self._on_detect_finished)
+        self._detect_worker.start()
+
+    def _on_os_detected(self, detected: dict):
+        callback, targets, restore_execute = self._detect_next
+        self.schedule_btn.setEnabled(True)
+        self.execute_btn.setEnabled(restore_execute)
+        callback(classify_targets(self.inventory_manager, targets, self.state.target_os, detected))
+
+    def _on_detect_finished(self):
+        self._detect_worker = None
+
+    def _collect_payloads(self, groups: dict[str, list[str]]) -> list[dict]:
+        """One payload per OS group, each from that OS's form. Raises ValidationError."""
+        payloads = []
+        for os_name, hosts in groups.items():
+            form = self._form_cache.get((os_name, self.state.action))
+            if form is None:
+                raise ValidationError(
+                    f"{len(hosts)} {os_name.title()} PC(s) selected – open the "
+                    f"{os_name.title()} form for '{self.state.action}' and fill it in too."
+                )
+            try:
+                form_payload = form.collect()
+            except ValidationError as e:
+                raise ValidationError(f"{os_name.title()}: {e}" if len(groups) > 1 else str(e))
+            payloads.append({
+                "lab":     self.state.current_lab,
+                "targets": hosts,
+                **form_payload,
+            })
+        return payloads
+
+    def _run_split(self, groups: dict[str, list[str]]):
+        try:
+            payloads = self._collect_payloads(groups)
+        except ValidationError as e:
+            self._on_validation_error(str(e))
+            return
+        self._controller.run_many(payloads)
+
+    def _on_schedule_clicked(self):
+        if not self.state.selected_targets:
+            self.log_panel.append_line(
+                "⚠ No PCs selected – go back and choose targets.", "error"
+            )
+            return
+        self._classify_then(self._schedule_groups)
+
+    def _schedule_groups(self, groups: dict[str, list[str]]):
+        try:
+            payloads = self._collect_payloads(groups)
+        except ValidationError as e:
+            self.log_panel.append_line(f"✗ {e}", "error")
+            return
+        dlg = ScheduleDialog(self.window(), self.inventory_manager, self.state.current_lab, payloads)
+        if dlg.exec() and dlg.schedule:
+            self.log_panel.append_line(f"🕒 Scheduled {dlg.schedule.describe()}", "success")
+            self.log_panel.append_line(
+                "  Runs from the headless scheduler: python main.py --scheduler", "dim"
+            )
+
     def _on_payload_ready(self, form_payload: dict):
         payload = {
             "lab":     self.state.current_lab,
@@ -316,6 +443,8 @@ class SoftwarePage(QWidget):
 
     def _on_retry(self):
         self._execution_results = {}
+        self.timed_out_hosts = set()
+        self.step_notes = {}
         self._controller.retry()
 
     def _on_new_task(self):
@@ -325,6 +454,8 @@ class SoftwarePage(QWidget):
         self.log_panel.clear()
         self.log_panel.view_results_btn.setEnabled(False)
         self._execution_results = {}
+        self.timed_out_hosts = set()
+        self.step_notes = {}
         self.progress_bar.set_step("configure")
         self.execute_btn.setEnabled(True)
         self.execute_btn.setText("Execute →")
@@ -349,6 +480,10 @@ class SoftwarePage(QWidget):
     # =========================================================================
     def _on_execution_done(self, ok: bool, log_lines: list[str]):
         results: dict[str, bool] = {}
+        timed_out: set[str] = set()
+        recap_hosts: set[str] = set()
+        deadline_hit = False
+        cancelled = False
         in_recap = False
 
         ansi_re = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
@@ -360,6 +495,11 @@ class SoftwarePage(QWidget):
             r"^(\S+)\s*:\s+.*\bunreachable=(\d+)\b.*\bfailed=(\d+)\b",
             re.IGNORECASE,
         )
+        # Task deadline (ANSIBLE_TASK_TIMEOUT), async deadline, connect timeout
+        timeout_re = re.compile(
+            r"expected time frame|did not complete within|timed out|exceeded timeout",
+            re.IGNORECASE,
+        )
 
         def _norm_host(host: str) -> str:
             h = host.strip().strip("'\"").rstrip(":")
@@ -375,6 +515,14 @@ class SoftwarePage(QWidget):
             if not stripped:
                 continue
 
+            if stripped.startswith(TIMEOUT_MARKER):
+                deadline_hit = True
+                continue
+
+            if stripped.startswith(CANCEL_MARKER):
+                cancelled = True
+                continue
+
             if "PLAY RECAP" in stripped.upper():
                 in_recap = True
                 continue
@@ -386,6 +534,8 @@ class SoftwarePage(QWidget):
                 host = _norm_host(m_state.group(2))
                 if state in ("fatal", "unreachable", "failed"):
                     results[host] = False
+                    if timeout_re.search(stripped):
+                        timed_out.add(host)
                 elif host not in results:
                     results[host] = True
 
@@ -397,6 +547,23 @@ class SoftwarePage(QWidget):
                     unreachable = int(m_recap.group(2))
                     failed = int(m_recap.group(3))
                     results[host] = (failed == 0 and unreachable == 0)
+                    recap_hosts.add(host)
+
+        # Job stopped at its wall-clock deadline: every host that never reached
+        # the recap is reported as timed out rather than as a success.
+        if deadline_hit:
+            for host in self.state.selected_targets:
+                if host and host not in recap_hosts:
+                    results[host] = False
+                    timed_out.add(host)
+
+        # Cancelled: hosts that hadn't failed and never reached the recap are
+        # reported as stopped (amber); what did fail stays failed.
+        if cancelled:
+            for host in self.state.selected_targets:
+                if host and host not in recap_hosts and results.get(host) is not False:
+                    results[host] = False
+                    timed_out.add(host)
 
         # If execution failed before host-level output (e.g., parser/module error),
         # still show the selected targets in View Results instead of "0 targeted".
@@ -406,6 +573,23 @@ class SoftwarePage(QWidget):
                     results[host] = False
 
         self._execution_results = results
+        self.timed_out_hosts = {h for h in timed_out if results.get(h) is False}
+        self.step_notes = dict(self._controller.step_notes)
+
+    def reattach(self, record):
+        """Show a detached job started by an earlier session (core.journal)."""
+        self.on_page_show()
+        self.log_panel.view_results_btn.setEnabled(True)
+        self.progress_bar.set_step("executing")
+        self.execute_btn.setEnabled(False)
+        self.execute_btn.setText("Executing...")
+        self._controller.reattach(record)
+
+    def set_power_mode(self, mode: str):
+        """Preset the Power form (restart / shutdown) opened from the lab page."""
+        form = self._form_cache.get(self._current_key())
+        if hasattr(form, "set_mode"):
+            form.set_mode(mode)
 
     def on_page_show(self):
         key = self._current_key()
@@ -421,6 +605,8 @@ class SoftwarePage(QWidget):
         self.log_panel.clear()
         self.log_panel.view_results_btn.setEnabled(False)
         self._execution_results = {}
+        self.timed_out_hosts = set()
+        self.step_notes = {}
         n = len(self.state.selected_targets)
         target_str = f"{n} PC{'s' if n != 1 else ''} selected" if n else "No PCs selected"
         self.log_panel.append_line(
@@ -453,3 +639,16 @@ class _NoForm(QWidget):
 
     def reset(self):
         pass
+
+
+class _DetectWorker(QThread):
+    """Reads the SSH banners of undetected hosts (core.os_detect) off the GUI thread."""
+
+    done = Signal(dict)   # {ip: "windows" | "linux" | None}
+
+    def __init__(self, ips: list[str]):
+        super().__init__()
+        self.ips = ips
+
+    def run(self):
+        self.done.emit(detect_many(self.ips))
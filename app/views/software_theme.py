@@ -7,7 +7,20 @@ _STEPS = [
     ("done",       "Done"),
 ]
 _STEP_INDEX = {key: i for i, (key, _) in enumerate(_STEPS)}
-_ACTIONS = [("install", "Install"), ("remove", "Remove"), ("update", "Update")]
+_ACTIONS = [
+    ("install",    "Install"),
+    ("remove",     "Remove"),
+    ("update",     "Update"),
+    ("command",    "Command"),
+    ("collect",    "Collect"),
+    ("sync",       "Sync Content"),
+    ("stage",      "Pre-stage"),
+    ("composite",  "Multi-step"),
+    ("transports", "Transports"),
+    ("power",      "Power"),
+    ("health",     "Health"),
+    ("verify",     "Verify"),
+]
 
 LIGHT = {
     "chrome_bg": "#ffffff", "chrome_bdr": "#e2e8f0",
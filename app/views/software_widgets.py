@@ -102,6 +102,14 @@ class LogPanel(QWidget):
         )
         hrow.addWidget(self._title_lbl)
         hrow.addStretch()
+        # Live transfer rate under bandwidth budgets (core.bandwidth)
+        self.rate_lbl = QLabel("")
+        self.rate_lbl.setStyleSheet(
+            f"color: {t['lbl_muted']}; font-size: 11px; font-weight: 600;"
+            " background: transparent; border: none; padding-right: 8px;"
+        )
+        self.rate_lbl.hide()
+        hrow.addWidget(self.rate_lbl)
         self.status_badge = QLabel("")
         self.status_badge.setStyleSheet(
             "font-size: 11px; font-weight: 700; padding: 3px 10px;"
@@ -109,6 +117,16 @@ class LogPanel(QWidget):
         )
         self.status_badge.hide()
         hrow.addWidget(self.status_badge)
+        # Shown by SoftwareController while a job is running
+        self.cancel_btn = QPushButton("■ Cancel")
+        self.cancel_btn.setCursor(Qt.PointingHandCursor)
+        self.cancel_btn.setStyleSheet(
+            f"color: {t['badge_fail_fg']}; background: {t['badge_fail_bg']};"
+            f" border: 1px solid {t['badge_fail_bdr']};"
+            " font-size: 11px; font-weight: 700; padding: 3px 10px; border-radius: 10px;"
+        )
+        self.cancel_btn.hide()
+        hrow.addWidget(self.cancel_btn)
         self._layout.addWidget(self._header)
 
         self._log_view = QTextEdit()
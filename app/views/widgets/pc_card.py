@@ -19,6 +19,15 @@ class PcCard(QFrame):
     ONLINE_COLOR   = "#22c55e"   # Windows → green
     LINUX_COLOR    = "#d4a017"  # Linux → yellow
     OFFLINE_COLOR  = "#ef4444"   # Failed -> red
+    TIMEOUT_COLOR  = "#f59e0b"   # Deadline hit -> amber
+
+    # Health snapshot badge (core.health.assess)
+    HEALTH_COLORS = {
+        "ready":     "#22c55e",
+        "attention": "#f59e0b",
+        "down":      "#ef4444",
+        "stale":     "#94a3b8",
+    }
 
     def __init__(self, name: str, ip: str, icon_rel_path: str = "assets/pc2.png"):
         super().__init__()
@@ -27,7 +36,8 @@ class PcCard(QFrame):
         self.icon_rel_path = icon_rel_path
         self.status_color = None   # None | "green" | "red"
         self.setFixedSize(48, 56)
-        self.setToolTip(f"{name}\n{ip}")
+        self._base_tooltip = f"{name}\n{ip}"
+        self.setToolTip(self._base_tooltip)
         self.setStyleSheet("background: transparent; border: none;")
         self._build_ui(name)
         self._load_icon()
@@ -49,6 +59,11 @@ class PcCard(QFrame):
         layout.addWidget(self.icon, 1)
         layout.addWidget(self.name_lbl)
 
+        # Floats over the icon's top-right corner, outside the layout
+        self.health_badge = QLabel(self)
+        self.health_badge.setFixedSize(10, 10)
+        self.health_badge.hide()
+
     def _load_icon(self):
         self.base_pm = QPixmap(_abs_asset_path(self.icon_rel_path))
         if self.base_pm.isNull():
@@ -85,6 +100,8 @@ class PcCard(QFrame):
             return self.OFFLINE_COLOR
         if self.status_color == "red":
             return self.OFFLINE_COLOR
+        if self.status_color == "timeout":
+            return self.TIMEOUT_COLOR
         return self.NORMAL_COLOR
 
     def _refresh_icon(self):
@@ -123,11 +140,34 @@ class PcCard(QFrame):
         self.status_color = "offline"
         self._refresh_icon()
 
+    def set_status_timeout(self):
+        self.status_color = "timeout"
+        self._refresh_icon()
+
     def clear_status(self):
         """Remove status tint and return to normal / selected color."""
         self.status_color = None
         self._refresh_icon()
 
+    # ── Health overlay ───────────────────────────────────────────────────
+    def set_health(self, state: str, text: str = ""):
+        """Badge for a health snapshot state ("" hides it) and its details as tooltip."""
+        color = self.HEALTH_COLORS.get(state)
+        if not color:
+            self.clear_health()
+            return
+        self.health_badge.setStyleSheet(
+            f"background:{color}; border: 1px solid #ffffff; border-radius: 5px;"
+        )
+        self.health_badge.move(self.width() - 12, 2)
+        self.health_badge.show()
+        self.health_badge.raise_()
+        self.setToolTip(f"{self._base_tooltip}\n\n{text}" if text else self._base_tooltip)
+
+    def clear_health(self):
+        self.health_badge.hide()
+        self.setToolTip(self._base_tooltip)
+
     # ── No paintEvent dot needed anymore ─────────────────────────────────
     def request_delete(self):
         self.delete_requested.emit(self.ip)